@@ -0,0 +1,133 @@
+import time
+import numpy as np
+from utils.dictionary_manipulation import *
+from utils.logging import *
+from utils.script_importing import import_script
+
+# ===========================
+# CONFIGURATION
+# ===========================
+
+DATA_GENERATION_SCRIPT_PATH = "data_generation_scripts/02_data_generation.py"
+DATA_CLEANING_SCRIPT_PATH = "data_analysis_scripts/01_data_cleaning_and_preprocessing.py"
+DATA_GENERATION_CONFIG_DEFAULT_VALUES_CONFIG_PATH = "config/data_generation_config_default_values_config.json"
+
+BENCHMARK_SIZE = 100_000
+BENCHMARK_SEED = 0
+BENCHMARK_REPEATS = 3       # Best of N runs is reported
+MISSING_KEY_EVERY = 100     # Every Nth entry has a metadata key removed so the missing key path is exercised
+
+# ===========================
+# HELPER FUNCTIONS
+# ===========================
+
+def build_benchmark_entries(data_generation_script, expected_data_structure, default_values, size, rng):
+    """Generates `size` raw entries from the default variable configs with the batch generator."""
+    variable_plan = {
+        group: [
+            (key, expected_info["statistical_data_type"], default_values["variables"][expected_info["statistical_data_type"]])
+            for key, expected_info in flatten_vars_in_dict(expected_data_structure[group]).items()
+        ]
+        for group in data_generation_script.VARIABLE_GROUPS
+    }
+    robot_positions = expected_data_structure["metadata"]["robotPosition"]["values"]
+    schedule = [
+        (index // len(robot_positions) + 1, int(team), robot_positions[index % len(robot_positions)])
+        for index, team in enumerate(rng.integers(1, 10_000, size=size))
+    ]
+
+    entries = data_generation_script.generate_entries_batch(schedule, variable_plan, default_values["scouter_names"], rng)
+    for entry in entries[::MISSING_KEY_EVERY]:
+        del entry["metadata"]["robotTeam"]
+    return entries
+
+
+def run_validator(validator, entries, repeats=BENCHMARK_REPEATS):
+    """Runs a validator over every entry `repeats` times and returns (cleaned entries, warnings, voided entries, best elapsed seconds)."""
+    best_elapsed = None
+    for _ in range(repeats):
+        warnings = []
+        voided_entries = []
+        start = time.perf_counter()
+        cleaned_entries = [validator(warnings, voided_entries, entry) for entry in entries]
+        cleaned_entries = [cleaned_entry for cleaned_entry in cleaned_entries if cleaned_entry is not None]
+        elapsed = time.perf_counter() - start
+        best_elapsed = elapsed if best_elapsed is None else min(best_elapsed, elapsed)
+    return cleaned_entries, warnings, voided_entries, best_elapsed
+
+
+def run_columnar_validator(validator, entries, repeats=BENCHMARK_REPEATS):
+    """Runs a columnar validator over all entries `repeats` times and returns (cleaned entries, warnings, voided entries, best elapsed seconds)."""
+    best_elapsed = None
+    for _ in range(repeats):
+        warnings = []
+        voided_entries = []
+        start = time.perf_counter()
+        cleaned_entries, _ = validator(warnings, voided_entries, entries)
+        elapsed = time.perf_counter() - start
+        best_elapsed = elapsed if best_elapsed is None else min(best_elapsed, elapsed)
+    return cleaned_entries, warnings, voided_entries, best_elapsed
+
+
+# ===========================
+# MAIN SCRIPT
+# ===========================
+
+def main():
+
+    # SCRIPT START
+    script_start("[Benchmark] Data Cleaning Validation")
+
+
+
+    # LOAD CONFIG
+    log_header("Load Config")
+
+    log_info(f"Loading 'Data Generation Script' from '{DATA_GENERATION_SCRIPT_PATH}'")
+    data_generation_script = import_script(DATA_GENERATION_SCRIPT_PATH)
+
+    log_info(f"Loading 'Data Cleaning Script' from '{DATA_CLEANING_SCRIPT_PATH}'")
+    data_cleaning_script = import_script(DATA_CLEANING_SCRIPT_PATH)
+
+    log_info(f"Loading 'Data Generation Config Default Values Config' from '{DATA_GENERATION_CONFIG_DEFAULT_VALUES_CONFIG_PATH}'")
+    default_values = retrieve_json(DATA_GENERATION_CONFIG_DEFAULT_VALUES_CONFIG_PATH)
+
+
+
+    # BENCHMARK
+    log_header("Benchmark")
+
+    log_info(f"Generating {BENCHMARK_SIZE:,} entries")
+    entries = build_benchmark_entries(
+        data_generation_script,
+        data_cleaning_script.EXPECTED_DATA_STRUCTURE_DICT,
+        default_values,
+        BENCHMARK_SIZE,
+        np.random.default_rng(BENCHMARK_SEED)
+    )
+
+    recursive_results = run_validator(data_cleaning_script.validate_and_clean_entry, entries)
+    compiled_results = run_validator(data_cleaning_script.COMPILED_ENTRY_VALIDATOR, entries)
+    columnar_results = run_columnar_validator(data_cleaning_script.COMPILED_COLUMNAR_VALIDATOR, entries)
+    benchmark_results = [("recursive", recursive_results), ("compiled", compiled_results), ("columnar", columnar_results)]
+
+    for name, (cleaned_entries, warnings, voided_entries, elapsed) in benchmark_results:
+        log_info(
+            f"{name:<10} {elapsed:8.3f}s | {len(entries) / elapsed:12,.0f} entries/s | "
+            f"{len(warnings):,} warnings | {len(voided_entries):,} voided"
+        )
+
+    for name, results in benchmark_results[1:]:
+        log_info(f"{name} speedup over recursive {recursive_results[3] / results[3]:.1f}x")
+        if results[:3] == recursive_results[:3]:
+            log_success(f"{name.capitalize()} validator output matches the recursive validator")
+        else:
+            log_warning(f"{name.capitalize()} validator output differs from the recursive validator", function_name="main", issue_type="mismatch")
+
+
+
+    # SCRIPT END
+    script_end("[Benchmark] Data Cleaning Validation")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import random
+import time
+import numpy as np
+from utils.dictionary_manipulation import *
+from utils.logging import *
+from utils.script_importing import import_script
+
+# ===========================
+# CONFIGURATION
+# ===========================
+
+DATA_GENERATION_SCRIPT_PATH = "data_generation_scripts/02_data_generation.py"
+DATA_GENERATION_CONFIG_DEFAULT_VALUES_CONFIG_PATH = "config/data_generation_config_default_values_config.json"
+
+BENCHMARK_SIZES = [10_000, 100_000, 1_000_000]
+BENCHMARK_SEED = 0
+
+# ===========================
+# HELPER FUNCTIONS
+# ===========================
+
+def time_call(function, *args):
+    """Returns (result, elapsed seconds) for a single call."""
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def summarize_column(column, data_type):
+    """Returns a short statistical summary of a generated column for equivalence checks."""
+    if data_type == "quantitative":
+        values = np.asarray(column, dtype=float)
+        return f"mean={values.mean():.3f} std={values.std():.3f} zero_rate={np.mean(values == 0):.4f}"
+
+    counts = {}
+    for value in column:
+        counts[str(value)] = counts.get(str(value), 0) + 1
+    return " ".join(f"{value}={count / len(column):.4f}" for value, count in sorted(counts.items()))
+
+
+# ===========================
+# MAIN SCRIPT
+# ===========================
+
+def main():
+
+    # SCRIPT START
+    script_start("[Benchmark] Data Generation Sampling")
+
+
+
+    # LOAD CONFIG
+    log_header("Load Config")
+
+    log_info(f"Loading 'Data Generation Script' from '{DATA_GENERATION_SCRIPT_PATH}'")
+    data_generation_script = import_script(DATA_GENERATION_SCRIPT_PATH)
+
+    log_info(f"Loading 'Data Generation Config Default Values Config' from '{DATA_GENERATION_CONFIG_DEFAULT_VALUES_CONFIG_PATH}'")
+    variable_defaults = retrieve_json(DATA_GENERATION_CONFIG_DEFAULT_VALUES_CONFIG_PATH)["variables"]
+
+
+
+    # BENCHMARK
+    log_header("Benchmark")
+
+    rng = np.random.default_rng(BENCHMARK_SEED)
+    np.random.seed(BENCHMARK_SEED)
+    random.seed(BENCHMARK_SEED)
+
+    for size in BENCHMARK_SIZES:
+        log_subheader(f"{size:,} Entries")
+
+        for data_type in ["quantitative", "categorical", "binary"]:
+            var_config = variable_defaults[data_type]
+            per_value_generator = data_generation_script.VARIABLE_GENERATORS[data_type]
+            column_generator = data_generation_script.COLUMN_GENERATORS[data_type]
+
+            per_value_column, per_value_time = time_call(lambda: [per_value_generator(var_config) for _ in range(size)])
+            batch_column, batch_time = time_call(column_generator, var_config, size, rng)
+
+            log_info(
+                f"{data_type:<12} per-value {per_value_time:8.3f}s | batch {batch_time:8.3f}s | "
+                f"speedup {per_value_time / batch_time:7.1f}x"
+            )
+            log_info(f"{data_type:<12} per-value {summarize_column(per_value_column, data_type)}")
+            log_info(f"{data_type:<12} batch     {summarize_column(batch_column, data_type)}")
+
+
+
+    # SCRIPT END
+    script_end("[Benchmark] Data Generation Sampling")
+
+if __name__ == "__main__":
+    main()
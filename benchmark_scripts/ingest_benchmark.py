@@ -0,0 +1,158 @@
+import os
+import time
+import tempfile
+import numpy as np
+from utils.dictionary_manipulation import *
+from utils.logging import *
+from utils.script_importing import import_script
+
+# ===========================
+# CONFIGURATION
+# ===========================
+
+DATA_GENERATION_SCRIPT_PATH = "data_generation_scripts/02_data_generation.py"
+DATA_CLEANING_SCRIPT_PATH = "data_analysis_scripts/01_data_cleaning_and_preprocessing.py"
+JSON_LIST_STRUCTURE_FIX_SCRIPT_PATH = "data_analysis_preperation/json_list_structure_fix.py"
+JSON_NESTING_STRUCTURE_FIX_SCRIPT_PATH = "data_analysis_preperation/json_nesting_structure_fix.py"
+DATA_GENERATION_CONFIG_DEFAULT_VALUES_CONFIG_PATH = "config/data_generation_config_default_values_config.json"
+
+BENCHMARK_SIZE = 100_000
+BENCHMARK_SEED = 0
+
+# ===========================
+# HELPER FUNCTIONS
+# ===========================
+
+def write_raw_export(json_path, data_generation_script, expected_data_structure, default_values, size, rng):
+    """
+    Writes `size` generated entries as concatenated, indented JSON objects with every variable at the top level,
+    the shape json_list_structure_fix.py and json_nesting_structure_fix.py repair.
+    """
+    variable_plan = {
+        group: [
+            (key, expected_info["statistical_data_type"], default_values["variables"][expected_info["statistical_data_type"]])
+            for key, expected_info in flatten_vars_in_dict(expected_data_structure[group]).items()
+        ]
+        for group in data_generation_script.VARIABLE_GROUPS
+    }
+    robot_positions = expected_data_structure["metadata"]["robotPosition"]["values"]
+    schedule = [
+        (index // len(robot_positions) + 1, int(team), robot_positions[index % len(robot_positions)])
+        for index, team in enumerate(rng.integers(1, 10_000, size=size))
+    ]
+
+    with open(json_path, "w") as json_file:
+        for entry in data_generation_script.generate_entries_batch(schedule, variable_plan, default_values["scouter_names"], rng):
+            raw_entry = {"metadata": entry["metadata"]}
+            for group in data_generation_script.VARIABLE_GROUPS:
+                raw_entry.update(entry[group])
+            json_file.write(json.dumps(raw_entry, indent=4))
+            json_file.write("\n")
+
+
+def run_separate_stages(scripts, data_directory):
+    """Runs the repair, reformat and clean scripts one after another through their files. Returns the files read and written."""
+    raw_path = os.path.join(data_directory, "raw_match_data.json")
+    fixed_path = os.path.join(data_directory, "fixed_match_data.json")
+    formatted_path = os.path.join(data_directory, "formatted_match_data.json")
+    cleaned_path = os.path.join(data_directory, "cleaned_match_data_separate.json")
+
+    scripts["json_list_structure_fix"].save_fixed_json(raw_path, fixed_path)
+
+    expected_structure = scripts["data_cleaning"].EXPECTED_DATA_STRUCTURE_DICT
+    formatted_data = [scripts["json_nesting_structure_fix"].format_entry(entry, expected_structure) for entry in retrieve_json(fixed_path)]
+    save_json(formatted_path, formatted_data)
+    del formatted_data
+
+    cleaning_totals = {"warnings": 0, "voided_entries": 0}
+    cleaned_entries = scripts["data_cleaning"].iterate_cleaned_entries(cleaning_totals, {}, iterate_json_entries(formatted_path))
+    save_json_stream(cleaned_path, cleaned_entries)
+
+    return [raw_path, fixed_path, formatted_path], [fixed_path, formatted_path, cleaned_path]
+
+
+def run_fused_ingest(scripts, data_directory):
+    """Runs the fused ingest pass. Returns the files read and written."""
+    raw_path = os.path.join(data_directory, "raw_match_data.json")
+    cleaned_path = os.path.join(data_directory, "cleaned_match_data_fused.json")
+
+    cleaning_totals = {"warnings": 0, "voided_entries": 0}
+    ingested_entries = scripts["data_cleaning"].iterate_ingested_entries(raw_path, [])
+    save_json_stream(cleaned_path, scripts["data_cleaning"].iterate_cleaned_entries(cleaning_totals, {}, ingested_entries))
+
+    return [raw_path], [cleaned_path]
+
+
+def total_size(paths):
+    """Returns the combined size of files in MB."""
+    return sum(os.path.getsize(path) for path in paths) / 1e6
+
+
+# ===========================
+# MAIN SCRIPT
+# ===========================
+
+def main():
+
+    # SCRIPT START
+    script_start("[Benchmark] Ingest")
+
+
+
+    # LOAD CONFIG
+    log_header("Load Config")
+
+    scripts = {}
+    for name, script_path in [
+        ("data_generation", DATA_GENERATION_SCRIPT_PATH),
+        ("data_cleaning", DATA_CLEANING_SCRIPT_PATH),
+        ("json_list_structure_fix", JSON_LIST_STRUCTURE_FIX_SCRIPT_PATH),
+        ("json_nesting_structure_fix", JSON_NESTING_STRUCTURE_FIX_SCRIPT_PATH)
+    ]:
+        log_info(f"Loading '{name}' from '{script_path}'")
+        scripts[name] = import_script(script_path)
+
+    log_info(f"Loading 'Data Generation Config Default Values Config' from '{DATA_GENERATION_CONFIG_DEFAULT_VALUES_CONFIG_PATH}'")
+    default_values = retrieve_json(DATA_GENERATION_CONFIG_DEFAULT_VALUES_CONFIG_PATH)
+
+
+
+    # BENCHMARK
+    log_header("Benchmark")
+
+    with tempfile.TemporaryDirectory() as data_directory:
+        log_info(f"Writing {BENCHMARK_SIZE:,} raw entries as concatenated JSON objects")
+        write_raw_export(
+            os.path.join(data_directory, "raw_match_data.json"),
+            scripts["data_generation"],
+            scripts["data_cleaning"].EXPECTED_DATA_STRUCTURE_DICT,
+            default_values,
+            BENCHMARK_SIZE,
+            np.random.default_rng(BENCHMARK_SEED)
+        )
+
+        results = {}
+        for name, run_ingest in [("separate", run_separate_stages), ("fused", run_fused_ingest)]:
+            start = time.perf_counter()
+            read_paths, written_paths = run_ingest(scripts, data_directory)
+            elapsed = time.perf_counter() - start
+            results[name] = (elapsed, written_paths[-1])
+            log_info(
+                f"{name:<9} {elapsed:8.3f}s | read {total_size(read_paths):8.1f} MB | "
+                f"written {total_size(written_paths):8.1f} MB | {len(read_paths)} parse(s)"
+            )
+
+        log_info(f"Speedup {results['separate'][0] / results['fused'][0]:.1f}x")
+        with open(results["separate"][1]) as separate_file, open(results["fused"][1]) as fused_file:
+            if separate_file.read() == fused_file.read():
+                log_success("Fused ingest output matches the separate stages")
+            else:
+                log_warning("Fused ingest output differs from the separate stages", function_name="main", issue_type="mismatch")
+
+
+
+    # SCRIPT END
+    script_end("[Benchmark] Ingest")
+
+if __name__ == "__main__":
+    main()
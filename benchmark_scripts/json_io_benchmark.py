@@ -0,0 +1,101 @@
+import os
+import time
+import shutil
+import tempfile
+from utils.dictionary_manipulation import *
+from utils.logging import *
+
+# ===========================
+# CONFIGURATION
+# ===========================
+
+SOURCE_DATA_PATH = "data/processed/cleaned_match_data.json"
+BENCHMARK_COPIES = 4            # The source entries are repeated this many times, so timings are not dominated by overhead
+BENCHMARK_REPEATS = 3           # Best of N runs is reported
+
+INDENT_MODES = {"indent 4": 4, "compact": None}
+FILE_EXTENSIONS = [".json", ".json.gz", ".json.xz"]
+LOAD_MANY_FILES = 2             # Like 06_condense_datasets.py loading the matchapp and superapp data
+
+# ===========================
+# HELPER FUNCTIONS
+# ===========================
+
+def best_time(function, repeats=BENCHMARK_REPEATS):
+    """Runs a function `repeats` times and returns (its last result, best elapsed seconds)."""
+    best_elapsed = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best_elapsed = elapsed if best_elapsed is None else min(best_elapsed, elapsed)
+    return result, best_elapsed
+
+
+# ===========================
+# MAIN SCRIPT
+# ===========================
+
+def main():
+
+    # SCRIPT START
+    script_start("[Benchmark] JSON I/O")
+
+
+
+    # LOAD DATA
+    log_header("Load Data")
+
+    log_info(f"Loading '{SOURCE_DATA_PATH}'")
+    data = retrieve_json(SOURCE_DATA_PATH) * BENCHMARK_COPIES
+    size_mb = len(json_dumps(data)) / 1e6
+    log_info(f"{len(data):,} entries | {size_mb:.1f} MB as indented JSON | backends: {', '.join(JSON_BACKENDS)}")
+
+    benchmark_dir = tempfile.mkdtemp(prefix="json_io_benchmark_")
+    all_round_trips_equal = True
+
+
+
+    # SAVE AND LOAD
+    for backend in JSON_BACKENDS:
+        log_header(f"Backend '{backend}'")
+        for mode_name, indent in INDENT_MODES.items():
+            for extension in FILE_EXTENSIONS:
+                json_path = os.path.join(benchmark_dir, f"{backend}_{indent}{extension}")
+                _, save_elapsed = best_time(lambda: save_json(json_path, data, indent=indent, backend=backend))
+                loaded, load_elapsed = best_time(lambda: retrieve_json(json_path, backend=backend))
+                all_round_trips_equal &= loaded == data
+                log_info(
+                    f"{mode_name:<9} {extension:<9} | {os.path.getsize(json_path) / 1e6:6.2f} MB on disk | "
+                    f"save {save_elapsed:6.3f} s ({size_mb / save_elapsed:6.1f} MB/s) | load {load_elapsed:6.3f} s ({size_mb / load_elapsed:6.1f} MB/s)"
+                )
+
+
+
+    # LOAD MANY
+    log_header(f"Loading {LOAD_MANY_FILES} Files")
+
+    for extension in FILE_EXTENSIONS:
+        json_paths = [os.path.join(benchmark_dir, f"load_many_{index}{extension}") for index in range(LOAD_MANY_FILES)]
+        for json_path in json_paths:
+            save_json(json_path, data, indent=None)
+
+        sequential, sequential_elapsed = best_time(lambda: [retrieve_json(json_path) for json_path in json_paths])
+        parallel, parallel_elapsed = best_time(lambda: load_many(json_paths))
+        all_round_trips_equal &= sequential == parallel
+        log_info(f"{extension:<9} | sequential {sequential_elapsed:.3f} s | load_many {parallel_elapsed:.3f} s | speedup {sequential_elapsed / parallel_elapsed:.2f}x")
+
+    shutil.rmtree(benchmark_dir, ignore_errors=True)
+
+    if all_round_trips_equal:
+        log_success("Every backend, mode and compression loaded back the saved data")
+    else:
+        log_warning("A round trip did not load back the saved data", function_name="main", issue_type="mismatch")
+
+
+
+    # SCRIPT END
+    script_end("[Benchmark] JSON I/O")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import os
+import time
+import shutil
+import logging
+import datetime
+import tempfile
+import contextlib
+from utils.logging import *
+
+# ===========================
+# CONFIGURATION
+# ===========================
+
+WARNING_CALLS = 1_000_000
+
+# ===========================
+# HELPER FUNCTIONS
+# ===========================
+
+def synchronous_logger(log_file_path):
+    """Returns a logger writing to its own file like the original basicConfig setup, without the queued backend."""
+    logger = logging.getLogger("synchronous_logging_benchmark")
+    logger.propagate = False
+    handler = logging.FileHandler(log_file_path)
+    handler.setFormatter(logging.Formatter(FILE_LOG_FORMAT, TIMESTAMP_FORMAT))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    return logger, handler
+
+
+def synchronous_log_warning(logger, message, function_name="N/A", issue_type="N/A", location="N/A"):
+    """The original log_warning: formats a timestamp, prints and writes the file record in the caller."""
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    log_prefix = "[WARNING]"
+    if function_name != "N/A":
+        log_prefix += f" [function={function_name}]"
+    if issue_type != "N/A":
+        log_prefix += f" [issue={issue_type}]"
+    if location != "N/A":
+        log_prefix += f" [location={location}]"
+    log_message = f"{log_prefix} {message} - {timestamp}"
+    print(log_message)
+    logger.warning(log_message)
+
+
+def time_warnings(log_warning_call, flush):
+    """Makes WARNING_CALLS warning calls and returns (seconds spent in the calls, seconds until everything is written)."""
+    start = time.perf_counter()
+    for index in range(WARNING_CALLS):
+        log_warning_call(index)
+    calls_elapsed = time.perf_counter() - start
+    flush()
+    return calls_elapsed, time.perf_counter() - start
+
+
+def report(name, calls_elapsed, total_elapsed, log_file_path):
+    """Logs the timings of one run (to the benchmark's own console, which is not redirected)."""
+    log_info(
+        f"{name:<28} | calls {calls_elapsed:6.2f} s ({calls_elapsed / WARNING_CALLS * 1e6:5.2f} us/call) | "
+        f"written {total_elapsed:6.2f} s | log file {os.path.getsize(log_file_path) / 1e6 if os.path.exists(log_file_path) else 0:6.1f} MB"
+    )
+
+
+# ===========================
+# MAIN SCRIPT
+# ===========================
+
+def main():
+
+    # SCRIPT START
+    script_start("[Benchmark] Logging")
+
+    benchmark_dir = tempfile.mkdtemp(prefix="logging_benchmark_")
+    devnull = open(os.devnull, "w")
+
+
+
+    # SYNCHRONOUS
+    log_header(f"{WARNING_CALLS:,} Warnings, Synchronous (Original)")
+
+    log_file_path = os.path.join(benchmark_dir, "synchronous.log")
+    logger, handler = synchronous_logger(log_file_path)
+    with contextlib.redirect_stdout(devnull):
+        timings = time_warnings(
+            lambda index: synchronous_log_warning(logger, f"Value {index} is out of range.", function_name="validate", issue_type="out_of_range", location="metadata.matchNumber"),
+            handler.flush
+        )
+    handler.close()
+    report("console + file", *timings, log_file_path)
+
+
+
+    # QUEUED
+    log_header(f"{WARNING_CALLS:,} Warnings, Queued")
+
+    original_log_file_path = LOG_STATE["log_file_path"]
+    for index, (name, settings) in enumerate([
+        ("console + file", {"quiet": False, "aggregate_warnings": False}),
+        ("quiet (file only)", {"quiet": True, "aggregate_warnings": False}),
+        ("lazy % args, quiet", {"quiet": True, "aggregate_warnings": False}),
+        ("aggregated (default)", {"quiet": False, "aggregate_warnings": True}),
+        ("below level (WARNING off)", {"quiet": True, "level": logging.ERROR})
+    ]):
+        log_file_path = os.path.join(benchmark_dir, f"queued_{index}.log")
+        configure_logging(log_file_path=log_file_path, console_stream=devnull, **settings)
+        if name.startswith("lazy"):
+            warning_call = lambda index: log_warning("Value %d is out of range.", index, function_name="validate", issue_type="out_of_range", location="metadata.matchNumber")
+        else:
+            warning_call = lambda index: log_warning(f"Value {index} is out of range.", function_name="validate", issue_type="out_of_range", location="metadata.matchNumber")
+        timings = time_warnings(warning_call, flush_logs)
+        WARNING_AGGREGATES.clear()
+        configure_logging(level=logging.INFO, quiet=False, log_file_path=original_log_file_path, console_stream=sys.stdout, aggregate_warnings=LOG_AGGREGATE_WARNINGS)
+        report(name, *timings, log_file_path)
+
+    devnull.close()
+    shutil.rmtree(benchmark_dir, ignore_errors=True)
+
+
+
+    # SCRIPT END
+    script_end("[Benchmark] Logging")
+
+if __name__ == "__main__":
+    main()
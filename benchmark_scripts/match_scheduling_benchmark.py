@@ -0,0 +1,96 @@
+import time
+import numpy as np
+from utils.dictionary_manipulation import *
+from utils.logging import *
+from utils.match_scheduling import build_balanced_match_schedule
+
+# ===========================
+# CONFIGURATION
+# ===========================
+
+EXPECTED_DATA_STRUCTURE_CONFIG_PATH = "config/expected_data_structure.json"
+
+# (number of teams, number of matches per team)
+BENCHMARK_TIERS = [(45, 10), (500, 12), (3000, 12)]
+BENCHMARK_SEED = 0
+
+# ===========================
+# HELPER FUNCTIONS
+# ===========================
+
+def summarize_schedule(schedule, robot_positions):
+    """Returns match-count spread, shortest turnaround and repeat pairing counts of a schedule."""
+    alliance_of_position = {position: position.split("_")[0] for position in robot_positions}
+    matches = {}
+    team_match_numbers = {}
+
+    for match_number, team, position in schedule:
+        matches.setdefault(match_number, []).append((team, alliance_of_position[position]))
+        team_match_numbers.setdefault(team, []).append(match_number)
+
+    partner_pairs = {}
+    opponent_pairs = {}
+    for match_slots in matches.values():
+        for index, (team, alliance) in enumerate(match_slots):
+            for other_team, other_alliance in match_slots[index + 1:]:
+                pairs = partner_pairs if alliance == other_alliance else opponent_pairs
+                pair = (min(team, other_team), max(team, other_team))
+                pairs[pair] = pairs.get(pair, 0) + 1
+
+    match_counts = [len(match_numbers) for match_numbers in team_match_numbers.values()]
+    turnarounds = [later - earlier for match_numbers in team_match_numbers.values() for earlier, later in zip(match_numbers, match_numbers[1:])]
+
+    return {
+        "matches": len(matches),
+        "min_team_matches": min(match_counts),
+        "max_team_matches": max(match_counts),
+        "shortest_turnaround": min(turnarounds) if turnarounds else None,
+        "repeat_partners": sum(count - 1 for count in partner_pairs.values()),
+        "repeat_opponents": sum(count - 1 for count in opponent_pairs.values())
+    }
+
+
+# ===========================
+# MAIN SCRIPT
+# ===========================
+
+def main():
+
+    # SCRIPT START
+    script_start("[Benchmark] Match Scheduling")
+
+
+
+    # LOAD CONFIG
+    log_header("Load Config")
+
+    log_info(f"Loading 'Expected Data Structure Config' from '{EXPECTED_DATA_STRUCTURE_CONFIG_PATH}'")
+    robot_positions = retrieve_json(EXPECTED_DATA_STRUCTURE_CONFIG_PATH)["metadata"]["robotPosition"]["values"]
+
+
+
+    # BENCHMARK
+    log_header("Benchmark")
+
+    for num_teams, num_matches_per_team in BENCHMARK_TIERS:
+        log_subheader(f"{num_teams:,} Teams x {num_matches_per_team} Matches")
+
+        start = time.perf_counter()
+        schedule = build_balanced_match_schedule(
+            teams=list(range(1, num_teams + 1)),
+            num_matches_per_team=num_matches_per_team,
+            robot_positions=robot_positions,
+            rng=np.random.default_rng(BENCHMARK_SEED)
+        )
+        elapsed = time.perf_counter() - start
+
+        log_info(f"Scheduled {len(schedule):,} slots in {elapsed:.3f}s")
+        log_info(f"Schedule summary: {summarize_schedule(schedule, robot_positions)}")
+
+
+
+    # SCRIPT END
+    script_end("[Benchmark] Match Scheduling")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+import os
+import sys
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+import numpy as np
+import pandas as pd
+import matplotlib
+from utils.dictionary_manipulation import *
+from utils.logging import *
+from utils.match_scheduling import build_balanced_match_schedule
+from utils.script_importing import import_script
+from utils.team_columnar_store import *
+
+# ===========================
+# CONFIGURATION
+# ===========================
+
+DATA_GENERATION_SCRIPT_PATH = "data_generation_scripts/02_data_generation.py"
+DATA_CLEANING_SCRIPT_PATH = "data_analysis_scripts/01_data_cleaning_and_preprocessing.py"
+TEAM_BASED_RESTRUCTURING_SCRIPT_PATH = "data_analysis_scripts/02_team_based_match_data_restructuring.py"
+STATISTICS_AGGREGATION_SCRIPT_PATH = "data_analysis_scripts/03_data_analysis_and_statistics_aggregation.py"
+VISUALIZATIONS_SCRIPT_PATH = "data_analysis_scripts/04_visualizations.py"
+EXPECTED_DATA_STRUCTURE_PATH = "config/expected_data_structure.json"
+DATA_GENERATION_CONFIG_DEFAULT_VALUES_CONFIG_PATH = "config/data_generation_config_default_values_config.json"
+
+# Tier name -> (teams, matches per team)
+BENCHMARK_TIERS = {
+    "45x10": (45, 10),
+    "500x12": (500, 12),
+    "5000x12": (5_000, 12),
+    "20000x20": (20_000, 20)
+}
+BENCHMARK_SEED = 0
+BENCHMARK_RESULTS_DIR = "outputs/benchmarks"
+
+# Every tier runs in its own process, so its peak RSS is not inflated by the tiers before it.
+# Stages are timed as run metrics sections (see utils.run_metrics), named after the pipeline stages.
+STAGES = ["clean", "restructure", "aggregate", "visualize"]
+
+# A stage regresses when a measurement grows by more than REGRESSION_THRESHOLD (0.2 = 20%) over the baseline.
+# Timings must also grow by at least MIN_REGRESSION_SECONDS, so small stages on small tiers do not flag on noise.
+REGRESSION_THRESHOLD = 0.2
+MIN_REGRESSION_SECONDS = 0.05
+COMPARED_MEASUREMENTS = ["seconds", "peak_rss_mb", "traced_peak_mb"]
+
+# ===========================
+# HELPER FUNCTIONS
+# ===========================
+
+def generate_tier_entries(data_generation_script, expected_data_structure, default_values, team_count, matches_per_team, seed):
+    """Generates the raw entries of a tier with the data generation script's balanced schedule and batch generator."""
+    seed_sequence = np.random.SeedSequence(seed)
+    schedule_seed_sequence, entries_seed_sequence = seed_sequence.spawn(2)
+    variable_plan = {
+        group: [
+            (key, expected_info["statistical_data_type"], default_values["variables"][expected_info["statistical_data_type"]])
+            for key, expected_info in flatten_vars_in_dict(expected_data_structure[group]).items()
+        ]
+        for group in data_generation_script.VARIABLE_GROUPS
+    }
+    schedule = build_balanced_match_schedule(
+        teams=list(range(1, team_count + 1)),
+        num_matches_per_team=matches_per_team,
+        robot_positions=expected_data_structure["metadata"]["robotPosition"]["values"],
+        teams_per_match=default_values["data_quantity"]["teams_per_match"],
+        rng=np.random.default_rng(schedule_seed_sequence)
+    )
+    return data_generation_script.generate_entries_batch(schedule, variable_plan, default_values["scouter_names"], np.random.default_rng(entries_seed_sequence))
+
+
+def stage_results(metrics):
+    """Picks the stage sections out of a tier's run metrics."""
+    return {
+        row["name"]: {measurement: row[measurement] for measurement in ["seconds", "records", "records_per_second", "peak_rss_mb", "traced_peak_mb"]}
+        for row in metrics["rows"]
+        if row["kind"] == "section" and row["name"] in STAGES
+    }
+
+
+def run_tier_process(tier_name, trace_memory):
+    """Runs one tier in a child process and returns its results."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        metrics_path = os.path.join(temporary_directory, "metrics.json")
+        command = [sys.executable, os.path.abspath(__file__), "tier", tier_name, "--metrics-path", metrics_path]
+        if trace_memory:
+            command.append("--trace-memory")
+        subprocess.run(command, check=True)
+        metrics = retrieve_json(metrics_path)
+
+    team_count, matches_per_team = BENCHMARK_TIERS[tier_name]
+    return {
+        "teams": team_count,
+        "matches_per_team": matches_per_team,
+        "seconds": metrics["seconds"],
+        "stages": stage_results(metrics)
+    }
+
+
+def find_regressions(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """
+    Compares the stages of every tier in both results.
+
+    :param baseline:   Benchmark results to compare against.
+    :param current:    New benchmark results.
+    :param threshold:  Relative growth above which a measurement counts as a regression.
+    :return:           List of (tier, stage, measurement, baseline value, current value, relative change) tuples, regressions only.
+    """
+    regressions = []
+    for tier_name, current_tier in current["tiers"].items():
+        baseline_tier = baseline["tiers"].get(tier_name)
+        if baseline_tier is None:
+            continue
+        for stage, current_stage in current_tier["stages"].items():
+            baseline_stage = baseline_tier["stages"].get(stage)
+            if baseline_stage is None:
+                continue
+            for measurement in COMPARED_MEASUREMENTS:
+                baseline_value, current_value = baseline_stage.get(measurement), current_stage.get(measurement)
+                if not baseline_value or current_value is None:
+                    continue
+                change = current_value / baseline_value - 1
+                if change <= threshold:
+                    continue
+                if measurement == "seconds" and current_value - baseline_value < MIN_REGRESSION_SECONDS:
+                    continue
+                regressions.append((tier_name, stage, measurement, baseline_value, current_value, change))
+    return regressions
+
+
+def log_comparison(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """Logs the stage timings of both results side by side and every regression. Returns the regressions."""
+    for tier_name, current_tier in current["tiers"].items():
+        baseline_tier = baseline["tiers"].get(tier_name)
+        if baseline_tier is None:
+            log_info(f"{tier_name:<9} not in the baseline")
+            continue
+        for stage in STAGES:
+            if stage in current_tier["stages"] and stage in baseline_tier["stages"]:
+                baseline_seconds, current_seconds = baseline_tier["stages"][stage]["seconds"], current_tier["stages"][stage]["seconds"]
+                change = f"{current_seconds / baseline_seconds - 1:+7.1%}" if baseline_seconds else "    n/a"
+                log_info(f"{tier_name:<9} {stage:<12} {baseline_seconds:9.3f} s -> {current_seconds:9.3f} s  {change}")
+
+    regressions = find_regressions(baseline, current, threshold)
+    for tier_name, stage, measurement, baseline_value, current_value, change in regressions:
+        log_warning(
+            f"{tier_name} {stage}: {measurement} {baseline_value:.3f} -> {current_value:.3f} ({change:+.1%}, threshold {threshold:.0%})",
+            function_name="log_comparison", issue_type="regression", location=f"{tier_name}/{stage}"
+        )
+    if not regressions:
+        log_success(f"No stage regressed by more than {threshold:.0%}")
+    return regressions
+
+
+# ===========================
+# COMMANDS
+# ===========================
+
+def run_tier(tier_name, metrics_path, trace_memory=False):
+    """
+    Generates one tier and runs the pipeline stages on it in memory, like run_pipeline.py does.
+    Every stage is a run metrics section, so metrics_path receives its seconds, records/sec and memory.
+    """
+    team_count, matches_per_team = BENCHMARK_TIERS[tier_name]
+    configure_logging(quiet=True)
+    configure_metrics(write=True, trace_memory=trace_memory, metrics_path=metrics_path)
+
+    script_start(f"[Benchmark] Pipeline Scale {tier_name}")
+
+    log_header("Load Stages")
+    scripts = {}
+    for name, script_path in [
+        ("data_generation", DATA_GENERATION_SCRIPT_PATH),
+        ("data_cleaning", DATA_CLEANING_SCRIPT_PATH),
+        ("team_based_restructuring", TEAM_BASED_RESTRUCTURING_SCRIPT_PATH),
+        ("statistics_aggregation", STATISTICS_AGGREGATION_SCRIPT_PATH),
+        ("visualizations", VISUALIZATIONS_SCRIPT_PATH)
+    ]:
+        scripts[name] = import_script(script_path)
+
+    log_header("Generate")
+    entries = generate_tier_entries(
+        scripts["data_generation"],
+        retrieve_json(EXPECTED_DATA_STRUCTURE_PATH),
+        retrieve_json(DATA_GENERATION_CONFIG_DEFAULT_VALUES_CONFIG_PATH),
+        team_count,
+        matches_per_team,
+        BENCHMARK_SEED
+    )
+    count_records(len(entries), "entries")
+
+    log_header("clean")
+    cleaned_data = list(scripts["data_cleaning"].clean_entries({"warnings": 0, "voided_entries": 0}, {}, entries))
+    del entries
+    count_records(len(cleaned_data), "entries")
+
+    log_header("restructure")
+    team_store = build_team_columnar_store(scripts["team_based_restructuring"].group_matches_by_team(cleaned_data))
+    del cleaned_data
+    count_records(int(team_store["team_offsets"][-1]), "matches")
+
+    log_header("aggregate")
+    team_performance_data = scripts["statistics_aggregation"].aggregate_team_performance_data(team_store, incremental=False, online=False)
+    count_records(len(team_performance_data), "teams")
+
+    log_header("visualize")
+    with tempfile.TemporaryDirectory() as visualizations_dir:
+        saved_paths = scripts["visualizations"].render_visualizations(team_performance_data, team_store, visualizations_dir=visualizations_dir)
+    count_records(len(saved_paths), "charts")
+
+    script_end(f"[Benchmark] Pipeline Scale {tier_name}")
+
+
+def run_benchmark(tier_names, output_path=None, trace_memory=False, baseline_path=None, threshold=REGRESSION_THRESHOLD):
+    """
+    Runs every selected tier, saves the results and optionally compares them with a baseline.
+
+    :return:  The number of regressions found (0 without a baseline).
+    """
+    script_start("[Benchmark] Pipeline Scale")
+
+    log_header("Environment")
+    results = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "matplotlib": matplotlib.__version__,
+            "json_backend": JSON_BACKEND
+        },
+        "seed": BENCHMARK_SEED,
+        "trace_memory": trace_memory,
+        "tiers": {}
+    }
+    for name, value in results["environment"].items():
+        log_info(f"{name:<12} {value}")
+
+    for tier_name in tier_names:
+        team_count, matches_per_team = BENCHMARK_TIERS[tier_name]
+        log_header(f"{team_count:,} Teams x {matches_per_team} Matches")
+        flush_logs()
+        tier = run_tier_process(tier_name, trace_memory)
+        results["tiers"][tier_name] = tier
+        for stage in STAGES:
+            stage_result = tier["stages"][stage]
+            rates = ", ".join(f"{rate:,.0f} {name}/s" if rate >= 100 else f"{rate:.2f} {name}/s" for name, rate in stage_result["records_per_second"].items() if rate is not None)
+            traced = f" | traced {stage_result['traced_peak_mb']:8.1f} MB" if stage_result["traced_peak_mb"] is not None else ""
+            peak_rss = f"{stage_result['peak_rss_mb']:8.1f} MB" if stage_result["peak_rss_mb"] is not None else "     n/a"
+            log_info(f"{stage:<12} {stage_result['seconds']:9.3f} s | peak RSS {peak_rss}{traced} | {rates}")
+
+    log_header("Save Results")
+    output_path = output_path or os.path.join(BENCHMARK_RESULTS_DIR, f"pipeline_scale_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    if os.path.dirname(output_path):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    save_json(output_path, results)
+    log_success(f"Saved results to '{output_path}'")
+
+    regressions = []
+    if baseline_path:
+        log_header("Compare With Baseline")
+        log_info(f"Baseline '{baseline_path}'")
+        regressions = log_comparison(retrieve_json(baseline_path), results, threshold)
+
+    script_end("[Benchmark] Pipeline Scale")
+    return len(regressions)
+
+
+def compare_results(baseline_path, current_path, threshold=REGRESSION_THRESHOLD):
+    """Compares two saved benchmark results. Returns the number of regressions."""
+    script_start("[Benchmark] Pipeline Scale Comparison")
+
+    log_header("Compare")
+    log_info(f"Baseline '{baseline_path}'")
+    log_info(f"Current  '{current_path}'")
+    regressions = log_comparison(retrieve_json(baseline_path), retrieve_json(current_path), threshold)
+
+    script_end("[Benchmark] Pipeline Scale Comparison")
+    return len(regressions)
+
+# ===========================
+# MAIN SCRIPT
+# ===========================
+
+def parse_arguments():
+    """Parses the command line options of the pipeline scale benchmark."""
+    parser = argparse.ArgumentParser(description="Time and memory-profile the pipeline stages on standard dataset tiers.")
+    commands = parser.add_subparsers(dest="command")
+
+    run_parser = commands.add_parser("run", help="Run the tiers and save the results (default).")
+    run_parser.add_argument("--tiers", nargs="+", choices=list(BENCHMARK_TIERS), default=list(BENCHMARK_TIERS), help="Tiers to run (default: all).")
+    run_parser.add_argument("--output", default=None, help=f"Results path (default: {BENCHMARK_RESULTS_DIR}/pipeline_scale_<timestamp>.json).")
+    run_parser.add_argument("--trace-memory", action="store_true", help="Also record the tracemalloc peak of every stage (slower).")
+    run_parser.add_argument("--baseline", default=None, help="Results to compare the new results with.")
+    run_parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="Relative growth that counts as a regression (default: %(default)s).")
+
+    compare_parser = commands.add_parser("compare", help="Flag stage regressions between two saved results.")
+    compare_parser.add_argument("baseline", help="Baseline results.")
+    compare_parser.add_argument("current", help="Results to check.")
+    compare_parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="Relative growth that counts as a regression (default: %(default)s).")
+
+    tier_parser = commands.add_parser("tier", help="Run one tier in this process (used by run).")
+    tier_parser.add_argument("tier", choices=list(BENCHMARK_TIERS))
+    tier_parser.add_argument("--metrics-path", required=True)
+    tier_parser.add_argument("--trace-memory", action="store_true")
+
+    arguments = parser.parse_args()
+    if arguments.command is None:
+        arguments = parser.parse_args(["run"] + sys.argv[1:])
+    return arguments
+
+def main():
+    arguments = parse_arguments()
+    if arguments.command == "tier":
+        run_tier(arguments.tier, arguments.metrics_path, arguments.trace_memory)
+        return 0
+    if arguments.command == "compare":
+        regressions = compare_results(arguments.baseline, arguments.current, arguments.threshold)
+    else:
+        regressions = run_benchmark(arguments.tiers, arguments.output, arguments.trace_memory, arguments.baseline, arguments.threshold)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
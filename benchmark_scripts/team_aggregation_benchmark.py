@@ -0,0 +1,146 @@
+import sys
+import time
+import numpy as np
+from utils.dictionary_manipulation import *
+from utils.logging import *
+from utils.script_importing import import_script
+from utils.team_columnar_store import build_team_columnar_store, team_data_from_store
+
+# ===========================
+# CONFIGURATION
+# ===========================
+
+DATA_GENERATION_SCRIPT_PATH = "data_generation_scripts/02_data_generation.py"
+DATA_CLEANING_SCRIPT_PATH = "data_analysis_scripts/01_data_cleaning_and_preprocessing.py"
+TEAM_BASED_RESTRUCTURING_SCRIPT_PATH = "data_analysis_scripts/02_team_based_match_data_restructuring.py"
+STATISTICS_AGGREGATION_SCRIPT_PATH = "data_analysis_scripts/03_data_analysis_and_statistics_aggregation.py"
+EXPECTED_DATA_STRUCTURE_PATH = "config/expected_data_structure.json"
+DATA_GENERATION_CONFIG_DEFAULT_VALUES_CONFIG_PATH = "config/data_generation_config_default_values_config.json"
+
+BENCHMARK_TEAM_COUNTS = [50, 500, 5_000]
+MATCHES_PER_TEAM = 12
+BENCHMARK_SEED = 0
+BENCHMARK_REPEATS = 3       # Best of N runs is reported
+
+# ===========================
+# HELPER FUNCTIONS
+# ===========================
+
+def build_team_data(scripts, expected_data_structure, default_values, team_count, rng):
+    """Generates MATCHES_PER_TEAM matches for each of `team_count` teams, then cleans and groups them like the pipeline does."""
+    data_generation_script = scripts["data_generation"]
+    variable_plan = {
+        group: [
+            (key, expected_info["statistical_data_type"], default_values["variables"][expected_info["statistical_data_type"]])
+            for key, expected_info in flatten_vars_in_dict(expected_data_structure[group]).items()
+        ]
+        for group in data_generation_script.VARIABLE_GROUPS
+    }
+    robot_positions = expected_data_structure["metadata"]["robotPosition"]["values"]
+    teams = rng.permutation(np.repeat(np.arange(1, team_count + 1), MATCHES_PER_TEAM))
+    schedule = [
+        (index // len(robot_positions) + 1, int(team), robot_positions[index % len(robot_positions)])
+        for index, team in enumerate(teams)
+    ]
+
+    entries = data_generation_script.generate_entries_batch(schedule, variable_plan, default_values["scouter_names"], rng)
+    cleaned_entries = list(scripts["data_cleaning"].clean_entries({"warnings": 0, "voided_entries": 0}, {}, entries))
+    team_data = scripts["team_based_restructuring"].group_matches_by_team(cleaned_entries)
+    return {str(team): data for team, data in team_data.items()}     # Team keys are strings once saved as JSON
+
+
+def time_engine(engine, team_store, repeats=BENCHMARK_REPEATS):
+    """Runs an aggregation engine on a team store `repeats` times and returns (serializable result, best elapsed seconds)."""
+    best_elapsed = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = engine(team_store)
+        elapsed = time.perf_counter() - start
+        best_elapsed = elapsed if best_elapsed is None else min(best_elapsed, elapsed)
+    return result, best_elapsed
+
+
+def result_differences(expected, actual):
+    """Returns the (team, key) pairs where two team performance results differ in schema, type or value (floats bit for bit)."""
+    if list(expected) != list(actual):
+        return [("<teams>", "team order")]
+
+    differences = []
+    for team, expected_performance in expected.items():
+        if list(expected_performance) != list(actual[team]):
+            differences.append((team, "key order"))
+            continue
+        for key, expected_value in expected_performance.items():
+            actual_value = actual[team][key]
+            if type(expected_value) is not type(actual_value) or repr(expected_value) != repr(actual_value):
+                differences.append((team, key))
+    return differences
+
+
+# ===========================
+# MAIN SCRIPT
+# ===========================
+
+def main():
+
+    # SCRIPT START
+    script_start("[Benchmark] Team Aggregation")
+
+
+
+    # LOAD CONFIG
+    log_header("Load Config")
+
+    scripts = {}
+    for name, script_path in [
+        ("data_generation", DATA_GENERATION_SCRIPT_PATH),
+        ("data_cleaning", DATA_CLEANING_SCRIPT_PATH),
+        ("team_based_restructuring", TEAM_BASED_RESTRUCTURING_SCRIPT_PATH),
+        ("statistics_aggregation", STATISTICS_AGGREGATION_SCRIPT_PATH)
+    ]:
+        log_info(f"Loading '{name}' from '{script_path}'")
+        scripts[name] = import_script(script_path)
+    statistics_aggregation = scripts["statistics_aggregation"]
+
+    expected_data_structure = retrieve_json(EXPECTED_DATA_STRUCTURE_PATH)
+    default_values = retrieve_json(DATA_GENERATION_CONFIG_DEFAULT_VALUES_CONFIG_PATH)
+
+    engines = {
+        "per-team loop": lambda team_store: statistics_aggregation.convert_to_serializable(statistics_aggregation.calculate_team_performance_data(team_data_from_store(team_store))),
+        "vectorized": lambda team_store: statistics_aggregation.convert_to_serializable(statistics_aggregation.calculate_team_performance_data_vectorized(team_store))
+    }
+
+
+
+    # BENCHMARK
+    rng = np.random.default_rng(BENCHMARK_SEED)
+    all_identical = True
+
+    for team_count in BENCHMARK_TEAM_COUNTS:
+        log_header(f"{team_count:,} Teams x {MATCHES_PER_TEAM} Matches")
+        team_store = build_team_columnar_store(build_team_data(scripts, expected_data_structure, default_values, team_count, rng))
+
+        results = {}
+        timings = {}
+        for engine_name, engine in engines.items():
+            results[engine_name], timings[engine_name] = time_engine(engine, team_store)
+            log_info(f"{engine_name:<15} {timings[engine_name]:8.3f} s  ({team_count / timings[engine_name]:,.0f} teams/s)")
+
+        differences = result_differences(results["per-team loop"], results["vectorized"])
+        all_identical &= not differences
+        if differences:
+            log_warning(f"Vectorized result differs from the per-team loop at {len(differences)} keys, e.g. {differences[:5]}", function_name="main", issue_type="mismatch")
+        else:
+            log_success(f"Identical schema and values | speedup {timings['per-team loop'] / timings['vectorized']:.1f}x")
+
+    if all_identical:
+        log_success("The vectorized engine matched the per-team loop at every size")
+
+
+
+    # SCRIPT END
+    script_end("[Benchmark] Team Aggregation")
+    return 0 if all_identical else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
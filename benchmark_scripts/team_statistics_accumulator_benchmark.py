@@ -0,0 +1,153 @@
+import sys
+import json
+import time
+import numpy as np
+import pandas as pd
+from utils.logging import *
+from utils.team_statistics import RunningStatistics
+
+# ===========================
+# CONFIGURATION
+# ===========================
+
+BENCHMARK_SEED = 0
+BENCHMARK_TEAMS = 100
+MATCH_COUNTS = [3, 12, 80, 1_000, 5_000]    # Values per team; beyond TDIGEST_BUFFER_SIZE the quartiles are sketched
+UPDATE_BATCHES = 4                      # Values are fed in this many batches with a save/load round trip in between
+
+# Maximum error of the t-digest quartiles, as a fraction of each team's value range. Mean, std dev and range must match pandas to 1e-9.
+QUANTILE_ERROR_BOUND = 0.05
+EXACT_TOLERANCE = 1e-9
+
+# Value distributions typical of scouting data
+DISTRIBUTIONS = {
+    "normal": lambda rng, size: rng.normal(20, 5, size),
+    "skewed": lambda rng, size: rng.exponential(4, size),
+    "integer counts": lambda rng, size: rng.poisson(6, size).astype(float),
+    "bimodal": lambda rng, size: np.where(rng.random(size) < 0.3, rng.normal(5, 1, size), rng.normal(25, 3, size))
+}
+
+# ===========================
+# HELPER FUNCTIONS
+# ===========================
+
+def accumulate_in_batches(values, batches=UPDATE_BATCHES):
+    """Feeds values to a RunningStatistics in batches, saving and restoring it as JSON between batches like live runs do."""
+    state = RunningStatistics().to_dict()
+    for batch in np.array_split(values, batches):
+        statistics = RunningStatistics.from_dict(json.loads(json.dumps(state)))
+        statistics.update_many(batch.tolist())
+        state = statistics.to_dict()
+    return RunningStatistics.from_dict(state)
+
+
+def pandas_summary(values):
+    """Computes the statistics of the aggregation stage's exact mode with pandas."""
+    series = pd.Series(values)
+    return {
+        "mean": series.mean(),
+        "std_dev": series.std(),
+        "range": series.max() - series.min(),
+        "median": series.median(),
+        "q1": series.quantile(0.25),
+        "q3": series.quantile(0.75),
+        "iqr": series.quantile(0.75) - series.quantile(0.25),
+        "min": series.min(),
+        "max": series.max()
+    }
+
+
+def summary_errors(summary, expected_summary, value_range):
+    """Returns the absolute error of every statistic, with quartile errors as a fraction of the value range."""
+    errors = {}
+    for statistic, expected in expected_summary.items():
+        actual = summary[statistic]
+        if actual is None or pd.isna(expected):
+            errors[statistic] = 0.0 if actual is None and pd.isna(expected) else float("inf")
+            continue
+        error = abs(actual - expected)
+        if statistic in ("median", "q1", "q3", "iqr"):
+            error = error / value_range if value_range else error
+        errors[statistic] = error
+    return errors
+
+
+# ===========================
+# MAIN SCRIPT
+# ===========================
+
+def main():
+
+    # SCRIPT START
+    script_start("[Benchmark] Team Statistics Accumulators")
+
+    rng = np.random.default_rng(BENCHMARK_SEED)
+    within_bounds = True
+
+
+
+    # ACCURACY
+    log_header("Accuracy Against pandas")
+
+    for distribution_name, distribution in DISTRIBUTIONS.items():
+        for match_count in MATCH_COUNTS:
+            max_quantile_error = 0.0
+            max_exact_error = 0.0
+            batches_match_single_pass = True
+
+            for _ in range(BENCHMARK_TEAMS):
+                values = distribution(rng, match_count)
+                statistics = accumulate_in_batches(values)
+
+                single_pass = RunningStatistics()
+                single_pass.update_many(values.tolist())
+                batches_match_single_pass &= single_pass.summary() == statistics.summary()
+
+                errors = summary_errors(statistics.summary(), pandas_summary(values), values.max() - values.min())
+                max_exact_error = max(max_exact_error, errors["mean"], errors["std_dev"], errors["range"])
+                max_quantile_error = max(max_quantile_error, errors["median"], errors["q1"], errors["q3"], errors["iqr"])
+
+            passed = max_exact_error <= EXACT_TOLERANCE and max_quantile_error <= QUANTILE_ERROR_BOUND and batches_match_single_pass
+            within_bounds &= passed
+            log_info(
+                f"{distribution_name:<15} {match_count:>6,} matches | max mean/std/range error {max_exact_error:.1e} | "
+                f"max quartile error {max_quantile_error:6.2%} of range | batched == single pass: {batches_match_single_pass}"
+            )
+
+    if within_bounds:
+        log_success(f"Every statistic is within bounds (quartiles within {QUANTILE_ERROR_BOUND:.0%} of the value range)")
+    else:
+        log_warning("A statistic is outside its error bound (exit status 1)", function_name="main", issue_type="accuracy")
+
+
+
+    # UPDATE COST
+    log_header("Update Cost")
+
+    history = DISTRIBUTIONS["normal"](rng, 100_000).tolist()
+    new_values = DISTRIBUTIONS["normal"](rng, 10).tolist()
+
+    statistics = RunningStatistics()
+    statistics.update_many(history)
+    state = json.dumps(statistics.to_dict())
+
+    start = time.perf_counter()
+    statistics = RunningStatistics.from_dict(json.loads(state))
+    statistics.update_many(new_values)
+    statistics.summary()
+    online_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pandas_summary(history + new_values)
+    exact_elapsed = time.perf_counter() - start
+
+    log_info(f"Adding {len(new_values)} values to a {len(history):,} value history: online {online_elapsed * 1e3:.3f} ms ({len(state)} byte state) | pandas rescan {exact_elapsed * 1e3:.3f} ms")
+
+
+
+    # SCRIPT END
+    script_end("[Benchmark] Team Statistics Accumulators")
+    return 0 if within_bounds else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
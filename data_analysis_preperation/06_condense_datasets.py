@@ -30,11 +30,8 @@ def main():
     # LOAD DATA
     log_header("Load Data")
     
-    log_info(f"Extracting 'Matchapp Data' from '{FORMATTED_MATCHAPP_DATA_PATH}'")
-    matchapp_data = retrieve_json(FORMATTED_MATCHAPP_DATA_PATH)
-
-    log_info(f"Extracting 'Superapp Data' from '{FORMATTED_SUPERAPP_DATA_PATH}'")
-    superapp_data = retrieve_json(FORMATTED_SUPERAPP_DATA_PATH)
+    log_info(f"Extracting 'Matchapp Data' from '{FORMATTED_MATCHAPP_DATA_PATH}' and 'Superapp Data' from '{FORMATTED_SUPERAPP_DATA_PATH}'")
+    matchapp_data, superapp_data = load_many([FORMATTED_MATCHAPP_DATA_PATH, FORMATTED_SUPERAPP_DATA_PATH])
     
     
     # Cross-check Data
@@ -1,37 +1,34 @@
-import json
 import os
 import traceback
+from utils.dictionary_manipulation import iterate_json_entries, save_json_stream
 
 def fix_json_structure(filepath):
     """
     Fixes improperly formatted JSON files where multiple root objects exist
-    without being enclosed in a list.
+    without being enclosed in a list. JSON arrays and NDJSON files (optionally gzipped) are read as they are.
+    Malformed objects are skipped and reported with their byte offsets instead of failing the whole file.
     """
-    with open(filepath, "r") as infile:
-        content = infile.read().strip()
-        
-        # Ensure the content is formatted as a JSON array
-        if not content.startswith("["):
-            content = "[" + content.replace("}\n{", "},{") + "]"
-        
-        try:
-            json_data = json.loads(content)
-            return json_data
-        except json.JSONDecodeError as e:
-            print(f"[ERROR] JSON Fix Failed: {e}")
-            return None
+    malformed_entries = []
+    json_data = list(iterate_json_entries(filepath, malformed_entries=malformed_entries))
+    report_malformed_entries(filepath, malformed_entries)
+    return json_data
+
+def report_malformed_entries(filepath, malformed_entries):
+    """Prints the byte offset and decode error of every malformed object that was skipped."""
+    for malformed_entry in malformed_entries:
+        print(f"[WARNING] Skipped malformed object in {filepath} at byte {malformed_entry['byte_offset']}: {malformed_entry['error']}")
 
 def save_fixed_json(filepath, output_path):
-    """Reads, fixes, and saves the reformatted JSON."""
+    """
+    Streams the fixed JSON from filepath to output_path one object at a time, so memory stays bounded.
+    Writes a JSON array, or NDJSON if output_path ends in '.ndjson'/'.jsonl'.
+    """
     try:
-        fixed_json = fix_json_structure(filepath)
-        if fixed_json is None:
-            raise ValueError("Failed to fix JSON file.")
-
+        malformed_entries = []
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        with open(output_path, "w") as outfile:
-            json.dump(fixed_json, outfile, indent=4)
-        print(f"[INFO] Fixed JSON saved to {output_path}")
+        entry_count = save_json_stream(output_path, iterate_json_entries(filepath, malformed_entries=malformed_entries))
+        report_malformed_entries(filepath, malformed_entries)
+        print(f"[INFO] Fixed JSON with {entry_count} entries saved to {output_path} ({len(malformed_entries)} malformed objects skipped)")
     except Exception as e:
         print(f"[ERROR] Unexpected error: {e}")
         print(traceback.format_exc())
@@ -39,5 +36,5 @@ def save_fixed_json(filepath, output_path):
 if __name__ == "__main__":
     INPUT_JSON_PATH = "data/raw/raw_match_data.json"  # Input JSON file
     OUTPUT_JSON_PATH = "data/raw/fixed_match_data.json"  # Output fixed JSON file
-    
+
     save_fixed_json(INPUT_JSON_PATH, OUTPUT_JSON_PATH)
@@ -1,39 +1,45 @@
-import json
+from utils.dictionary_manipulation import retrieve_json, save_json
 
-# Load the expected data structure to identify valid keys
-with open("config/expected_data_structure.json", "r") as f:
-    expected_structure = json.load(f)
+EXPECTED_DATA_STRUCTURE_PATH = "config/expected_data_structure.json"
+FIXED_MATCH_DATA_PATH = "data/raw/fixed_match_data.json"
+FORMATTED_MATCH_DATA_PATH = "data/raw/formatted_match_data.json"
 
-metadata_keys = set(expected_structure["metadata"].keys())
-variable_keys = set(expected_structure["variables"].keys())
+def get_variable_sections(expected_structure):
+    """Returns every section of the expected structure that holds variables (everything except metadata)."""
+    return [section for section in expected_structure if section != "metadata"]
 
-# Load the input JSON data
-with open("data/raw/fixed_match_data.json", "r") as f:
-    input_data = json.load(f)
-
-# Process each entry in the input data
-formatted_data = []
-for entry in input_data:
-    formatted_entry = {"metadata": {}, "variables": {}}
+def format_entry(entry, expected_structure):
+    """
+    Groups an entry's fields into the sections of the expected structure.
+    Variables may sit at the top level of the entry or already be grouped under their section.
+    """
+    formatted_entry = {"metadata": {}}
 
     # Extract metadata fields
-    for key in metadata_keys:
-        if key in entry["metadata"]:
+    for key in expected_structure["metadata"]:
+        if key in entry.get("metadata", {}):
             formatted_entry["metadata"][key] = entry["metadata"][key]
 
-    # Extract variable fields and group them under "variables"
-    for key in variable_keys:
-        if key in entry:
-            formatted_entry["variables"][key] = entry[key]
+    # Extract variable fields and group them under their section
+    for section in get_variable_sections(expected_structure):
+        source = entry[section] if isinstance(entry.get(section), dict) else entry
+        formatted_entry[section] = {key: source[key] for key in expected_structure[section] if key in source}
 
     # Preserve `_id` if needed
     if "_id" in entry:
         formatted_entry["_id"] = entry["_id"]
 
-    formatted_data.append(formatted_entry)
+    return formatted_entry
+
+if __name__ == "__main__":
+    # Load the expected data structure to identify valid keys
+    expected_structure = retrieve_json(EXPECTED_DATA_STRUCTURE_PATH)
+
+    # Load the input JSON data and process each entry
+    input_data = retrieve_json(FIXED_MATCH_DATA_PATH)
+    formatted_data = [format_entry(entry, expected_structure) for entry in input_data]
 
-# Save the transformed data to a new JSON file
-with open("data/raw/formatted_match_data.json", "w") as f:
-    json.dump(formatted_data, f, indent=4)
+    # Save the transformed data to a new JSON file
+    save_json(FORMATTED_MATCH_DATA_PATH, formatted_data)
 
-print("Conversion complete! The formatted data is saved in 'formatted_match_data.json'.")
+    print("Conversion complete! The formatted data is saved in 'formatted_match_data.json'.")
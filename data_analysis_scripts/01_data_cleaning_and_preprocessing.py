@@ -1,9 +1,13 @@
 import json
 import os
-import traceback
-from utils.seperation_bars import seperation_bar, small_seperation_bar
+import argparse
+import numpy as np
 from utils.dictionary_manipulation import *
-from utils.logging import log_message
+from utils.logging import *
+from utils.script_importing import import_script
+from utils.schema_validation import compile_entry_validator, section_void_reason
+from utils.schema_validation import expected_python_type as get_expected_type
+from utils.columnar_validation import compile_columnar_validator
 
 # ===========================
 # CONFIGURATION
@@ -14,43 +18,59 @@ EXPECTED_DATA_STRUCTURE_PATH = 'config/expected_data_structure.json'
 RAW_MATCH_DATA_PATH = "data/raw/formatted_match_data.json"
 CLEANED_MATCH_DATA_PATH = "data/processed/cleaned_match_data.json"
 
+# Fused ingest inputs and the intermediate files it replaces
+UNFIXED_RAW_MATCH_DATA_PATH = "data/raw/raw_match_data.json"
+FIXED_MATCH_DATA_PATH = "data/raw/fixed_match_data.json"
+JSON_NESTING_STRUCTURE_FIX_SCRIPT_PATH = "data_analysis_preperation/json_nesting_structure_fix.py"
+
 # Load Expected Data Structure
 EXPECTED_DATA_STRUCTURE_DICT = retrieve_json(EXPECTED_DATA_STRUCTURE_PATH)
 
+# Every section other than metadata holds variables (e.g. 'matchapp_variables', 'superapp_variables')
+VARIABLE_SECTIONS = [section for section in EXPECTED_DATA_STRUCTURE_DICT if section != "metadata"]
+
 # Flatten expected variable structure for easy validation
-FLATTENED_EXPECTED_VARIABLES = flatten_vars_in_dict(EXPECTED_DATA_STRUCTURE_DICT["variables"])
+FLATTENED_EXPECTED_VARIABLES = {section: flatten_vars_in_dict(EXPECTED_DATA_STRUCTURE_DICT[section]) for section in VARIABLE_SECTIONS}
 
 # Configurable options
 SHOW_WARNINGS = True
 VOID_MISSING_ENTRIES = True
 
+# Columnar validation checks whole fields across all entries with NumPy/pandas masks instead of entry by entry
+COLUMNAR_VALIDATION = False
+
+# Fused ingest repairs, reformats and cleans raw_match_data.json in one streaming pass, replacing
+# json_list_structure_fix.py and json_nesting_structure_fix.py. Intermediate files are only written for debugging.
+FUSED_INGEST = False
+WRITE_INTERMEDIATE_FILES = False
+
+# Expected data structure compiled once into per-field checks, used by the cleaning loop
+COMPILED_ENTRY_VALIDATOR = compile_entry_validator(EXPECTED_DATA_STRUCTURE_DICT, VOID_MISSING_ENTRIES)
+COMPILED_COLUMNAR_VALIDATOR = compile_columnar_validator(EXPECTED_DATA_STRUCTURE_DICT, VOID_MISSING_ENTRIES)
+
 
 # ===========================
 # HELPER FUNCTIONS
 # ===========================
 
-def log_warning(warnings, scouter_warnings, message, scouter=None):
+def record_warning(warnings, scouter_warnings, message, scouter=None):
     """Logs a warning and associates it with the scouter."""
     warnings.append(message)
     if scouter:
         scouter_warnings[scouter] += 1
 
+def get_entry_scouter(entry):
+    """Returns the scouter name of an entry, or 'Unknown' if it has none."""
+    return entry.get("metadata", {}).get("scouterName", "Unknown")
+
 def log_voided_entry(voided_entries, entry, reason):
     """Logs voided entries when missing or incorrect keys are found."""
     voided_entries.append({"entry": entry, "reason": reason})
 
-def get_expected_type(data_type):
-    """Returns the corresponding Python type for a given statistical data type."""
-    type_mapping = {
-        "quantitative": (int, float),
-        "categorical": str,
-        "binary": bool
-    }
-    return type_mapping.get(data_type, str)  # Default to str if unknown
-
 def validate_value(warnings, key, value, expected_info, scouter, path=""):
     """
     Validates a single value based on its expected type or predefined values.
+    Reference implementation of the checks compiled by utils.schema_validation.compile_value_check.
     """
     expected_type = expected_info.get("statistical_data_type")
     expected_python_type = get_expected_type(expected_type)
@@ -64,21 +84,21 @@ def validate_value(warnings, key, value, expected_info, scouter, path=""):
             elif value.lower() == "false":
                 value = False
             else:
-                log_warning(warnings, scouter, f"[WARNING] Invalid binary value '{value}' for '{full_key_path}'. Expected 'true' or 'false'.")
+                record_warning(warnings, scouter, f"[WARNING] Invalid binary value '{value}' for '{full_key_path}'. Expected 'true' or 'false'.")
                 return None
         elif not isinstance(value, bool):
-            log_warning(warnings, scouter, f"[WARNING] Incorrect type for '{full_key_path}'. Expected binary (True/False), got {type(value).__name__}.")
+            record_warning(warnings, scouter, f"[WARNING] Incorrect type for '{full_key_path}'. Expected binary (True/False), got {type(value).__name__}.")
             return None
 
     # Validate predefined categorical values
     if expected_type == "categorical" and "values" in expected_info:
         if value not in expected_info["values"]:
-            log_warning(warnings, scouter, f"[WARNING] Invalid value '{value}' for '{full_key_path}'. Expected one of {expected_info['values']}.")
+            record_warning(warnings, scouter, f"[WARNING] Invalid value '{value}' for '{full_key_path}'. Expected one of {expected_info['values']}.")
             return None
 
     # Type validation
     if not isinstance(value, expected_python_type):
-        log_warning(warnings, scouter, f"[WARNING] Incorrect type for '{full_key_path}'. Expected {expected_python_type}, got {type(value).__name__}.")
+        record_warning(warnings, scouter, f"[WARNING] Incorrect type for '{full_key_path}'. Expected {expected_python_type}, got {type(value).__name__}.")
         return None
 
     return value
@@ -96,7 +116,7 @@ def validate_structure(warnings, data, expected_structure, scouter, path=""):
         full_key_path = f"{path}.{key}" if path else key
 
         if key not in data:
-            log_warning(warnings, scouter, f"[WARNING] Missing key '{full_key_path}'.")
+            record_warning(warnings, scouter, f"[WARNING] Missing key '{full_key_path}'.")
             missing_or_invalid_keys = True
             continue
 
@@ -120,11 +140,12 @@ def validate_structure(warnings, data, expected_structure, scouter, path=""):
 
 def validate_and_clean_entry(warnings, voided_entries, entry):
     """
-    Validates and cleans a single entry.
+    Validates and cleans a single entry by walking the expected structure recursively.
+    The cleaning loop uses COMPILED_ENTRY_VALIDATOR instead, which gives the same result.
     
     - If VOID_MISSING_ENTRIES is True, **ANY** missing or incorrect key voids the entry.
     """
-    scouter = entry.get("metadata", {}).get("scouterName", "Unknown")
+    scouter = get_entry_scouter(entry)
 
     validated_entry = {}
 
@@ -132,68 +153,190 @@ def validate_and_clean_entry(warnings, voided_entries, entry):
     if "metadata" in entry:
         validated_metadata = validate_structure(warnings, entry["metadata"], EXPECTED_DATA_STRUCTURE_DICT.get("metadata", {}), scouter)
         if validated_metadata is None:
-            log_voided_entry(voided_entries, entry, "Metadata contained missing or incorrect keys.")
+            log_voided_entry(voided_entries, entry, section_void_reason("metadata"))
             return None  # Entry is voided
         validated_entry["metadata"] = validated_metadata
 
     # Flatten Variables and Validate
-    if "variables" in entry:
-        flat_variables = flatten_vars_in_dict(entry["variables"])
-        validated_variables = validate_structure(warnings, flat_variables, FLATTENED_EXPECTED_VARIABLES, scouter)
+    for section in VARIABLE_SECTIONS:
+        if section not in entry:
+            continue
+        flat_variables = flatten_vars_in_dict(entry[section])
+        validated_variables = validate_structure(warnings, flat_variables, FLATTENED_EXPECTED_VARIABLES[section], scouter)
 
         if validated_variables is None:
-            log_voided_entry(voided_entries, entry, "Variables contained missing or incorrect keys.")
+            log_voided_entry(voided_entries, entry, section_void_reason(section))
             return None  # Entry is voided
 
-        validated_entry["variables"] = validated_variables
+        validated_entry[section] = validated_variables
 
     return validated_entry
 
+def iterate_ingested_entries(json_path, malformed_entries, fixed_data_path=None, formatted_data_path=None):
+    """
+    Repairs and reformats raw entries in one streaming pass, doing the work of json_list_structure_fix.py and
+    json_nesting_structure_fix.py without writing and re-reading their output files.
+    Each intermediate file is still written alongside the stream when its path is given.
+    """
+    json_nesting_structure_fix = import_script(JSON_NESTING_STRUCTURE_FIX_SCRIPT_PATH)
+
+    entries = iterate_json_entries(json_path, malformed_entries=malformed_entries)
+    if fixed_data_path:
+        entries = tee_json_stream(fixed_data_path, entries)
+
+    entries = (json_nesting_structure_fix.format_entry(entry, EXPECTED_DATA_STRUCTURE_DICT) for entry in entries)
+    if formatted_data_path:
+        entries = tee_json_stream(formatted_data_path, entries)
+
+    return entries
+
+def count_entry_warnings(cleaning_totals, scouter_warnings, entry, warning_count):
+    """Adds an entry's warnings to the running totals and to its scouter's count."""
+    cleaning_totals["warnings"] += warning_count
+    scouter = get_entry_scouter(entry)
+    scouter_warnings[scouter] = scouter_warnings.get(scouter, 0) + warning_count
+
+def iterate_cleaned_entries(cleaning_totals, scouter_warnings, entries):
+    """
+    Cleans entries one at a time with the compiled entry validator and yields the cleaned entries.
+    Only warning and voided entry counts are kept, so a stream of entries is cleaned in constant memory.
+    """
+    for entry in entries:
+        warnings = []
+        voided_entries = []
+        cleaned_entry = COMPILED_ENTRY_VALIDATOR(warnings, voided_entries, entry)
+        if warnings:
+            count_entry_warnings(cleaning_totals, scouter_warnings, entry, len(warnings))
+        cleaning_totals["voided_entries"] += len(voided_entries)
+        if cleaned_entry is not None:
+            yield cleaned_entry
+
+def clean_entries_columnar(cleaning_totals, scouter_warnings, entries):
+    """Cleans all entries at once with the columnar validator. Gives the same result as iterate_cleaned_entries."""
+    voided_entries = []
+    cleaned_data, row_warning_counts = COMPILED_COLUMNAR_VALIDATOR([], voided_entries, entries)
+    for row in np.flatnonzero(row_warning_counts).tolist():
+        count_entry_warnings(cleaning_totals, scouter_warnings, entries[row], int(row_warning_counts[row]))
+    cleaning_totals["voided_entries"] += len(voided_entries)
+    return cleaned_data
+
+def load_raw_entries(malformed_entries, fused_ingest=FUSED_INGEST, write_intermediate_files=WRITE_INTERMEDIATE_FILES):
+    """
+    Returns an iterator over the raw entries to clean.
+
+    Args:
+        malformed_entries (list): Receives the malformed objects skipped during fused ingest.
+        fused_ingest (bool): Read raw_match_data.json and repair and reformat it while streaming.
+        write_intermediate_files (bool): Also write the fixed and formatted intermediate files during fused ingest.
+
+    Returns:
+        iterator: The raw entries.
+    """
+    if fused_ingest:
+        log_info(f"Streaming raw data from: {UNFIXED_RAW_MATCH_DATA_PATH} (fused repair, reformat and clean)")
+        if write_intermediate_files:
+            log_info(f"Writing intermediate files to: {FIXED_MATCH_DATA_PATH}, {RAW_MATCH_DATA_PATH}")
+            return iterate_ingested_entries(UNFIXED_RAW_MATCH_DATA_PATH, malformed_entries, FIXED_MATCH_DATA_PATH, RAW_MATCH_DATA_PATH)
+        return iterate_ingested_entries(UNFIXED_RAW_MATCH_DATA_PATH, malformed_entries)
+
+    log_info(f"Streaming raw data from: {RAW_MATCH_DATA_PATH}")
+
+    # Accepts JSON arrays, NDJSON and concatenated JSON objects, optionally gzipped
+    return iterate_json_entries(RAW_MATCH_DATA_PATH)
+
+def clean_entries(cleaning_totals, scouter_warnings, raw_entries):
+    """Cleans raw entries with the configured validator. Returns a list in columnar mode and a generator otherwise."""
+    if COLUMNAR_VALIDATION:
+        log_info("Validating entries in columnar mode (loads every entry into memory)")
+        return clean_entries_columnar(cleaning_totals, scouter_warnings, list(raw_entries))
+    return iterate_cleaned_entries(cleaning_totals, scouter_warnings, raw_entries)
+
+def log_cleaning_summary(cleaned_entry_count, cleaning_totals, scouter_warnings, malformed_entries):
+    """Logs the skipped malformed objects and the warning and voided entry totals of a cleaning run."""
+    for malformed_entry in malformed_entries:
+        log_warning(
+            f"Skipped malformed object: {malformed_entry['error']}",
+            function_name="iterate_ingested_entries",
+            issue_type="malformed_json",
+            location=f"byte {malformed_entry['byte_offset']}"
+        )
+
+    log_info(f"Cleaned Entries: {cleaned_entry_count}")
+    log_info(f"Total warnings/errors: {cleaning_totals['warnings']}")
+    log_info(f"Voided Entries: {cleaning_totals['voided_entries']}")
+    log_info(f"Warnings per scouter: {json.dumps(scouter_warnings, indent=4)}")
+
+def clean_match_data(fused_ingest=FUSED_INGEST, write_intermediate_files=WRITE_INTERMEDIATE_FILES):
+    """
+    Loads and cleans the raw match data in memory, for callers that pass the cleaned entries on directly
+    instead of reading them back from CLEANED_MATCH_DATA_PATH.
+
+    Args:
+        fused_ingest (bool): Read raw_match_data.json and repair, reformat and clean it in one streaming pass.
+        write_intermediate_files (bool): Also write the fixed and formatted intermediate files during fused ingest.
+
+    Returns:
+        list: The cleaned entries.
+    """
+    cleaning_totals = {"warnings": 0, "voided_entries": 0}
+    scouter_warnings = {}
+    malformed_entries = []
+
+    raw_entries = load_raw_entries(malformed_entries, fused_ingest, write_intermediate_files)
+    cleaned_data = list(clean_entries(cleaning_totals, scouter_warnings, raw_entries))
+    log_cleaning_summary(len(cleaned_data), cleaning_totals, scouter_warnings, malformed_entries)
+    return cleaned_data
+
 
 # ===========================
 # MAIN SCRIPT
 # ===========================
 
-def main():
-    warnings = []
-    voided_entries = []
+def parse_arguments():
+    """Parses the command line options for data cleaning."""
+    parser = argparse.ArgumentParser(description="Clean and validate raw match data.")
+    parser.add_argument("--fused", action="store_true", default=FUSED_INGEST, help="Repair, reformat and clean raw_match_data.json in one pass.")
+    parser.add_argument("--write-intermediate-files", action="store_true", default=WRITE_INTERMEDIATE_FILES, help="Also write the fixed and formatted intermediate files during fused ingest.")
+    return parser.parse_args()
 
-    seperation_bar()
-    log_message("INFO", "Script 01: Data Cleaning and Preprocessing Started")
+def main(fused_ingest=FUSED_INGEST, write_intermediate_files=WRITE_INTERMEDIATE_FILES):
+    """
+    Cleans the raw match data.
 
-    try:
-        small_seperation_bar("LOAD DATA")
-        log_message("INFO", f"Loading raw data from: {RAW_MATCH_DATA_PATH}")
+    Args:
+        fused_ingest (bool): Read raw_match_data.json and repair, reformat and clean it in one streaming pass.
+        write_intermediate_files (bool): Also write the fixed and formatted intermediate files during fused ingest.
+    """
+    cleaning_totals = {"warnings": 0, "voided_entries": 0}
+    scouter_warnings = {}
+    malformed_entries = []
 
-        with open(RAW_MATCH_DATA_PATH, "r") as infile:
-            raw_data = json.load(infile)
+    script_start("[Data Analysis] 01 - Data Cleaning and Preprocessing")
 
-        if not isinstance(raw_data, list):
-            raise ValueError("Raw data must be a list of matches.")
+    try:
+        log_header("Load Data")
+        raw_entries = load_raw_entries(malformed_entries, fused_ingest, write_intermediate_files)
 
-        cleaned_data = []
-        for entry in raw_data:
-            cleaned_entry = validate_and_clean_entry(warnings, voided_entries, entry)
-            if cleaned_entry is not None:
-                cleaned_data.append(cleaned_entry)
+        log_header("Data Cleaning")
+        # Entries are read, cleaned and written one at a time while the cleaned data is saved
+        cleaned_data = clean_entries(cleaning_totals, scouter_warnings, raw_entries)
 
-        small_seperation_bar("SAVE CLEANED DATA")
-        log_message("INFO", f"Saving cleaned data to: {CLEANED_MATCH_DATA_PATH}")
+        log_header("Save Cleaned Data")
+        log_info(f"Saving cleaned data to: {CLEANED_MATCH_DATA_PATH}")
         os.makedirs(os.path.dirname(CLEANED_MATCH_DATA_PATH), exist_ok=True)
-        with open(CLEANED_MATCH_DATA_PATH, "w") as outfile:
-            json.dump(cleaned_data, outfile, indent=4)
+        cleaned_entry_count = save_json_stream(CLEANED_MATCH_DATA_PATH, cleaned_data)
+        count_records(cleaned_entry_count, "entries")
 
-        log_message("INFO", f"Total warnings/errors: {len(warnings)}")
-        log_message("INFO", f"Voided Entries: {len(voided_entries)}")
-        log_message("INFO", "Script 01: Completed Successfully")
+        log_cleaning_summary(cleaned_entry_count, cleaning_totals, scouter_warnings, malformed_entries)
+        log_success("Script 01: Completed Successfully")
 
     except Exception as e:
-        log_message("ERROR", f"An unexpected error occurred: {e}")
-        print(traceback.format_exc())
-        log_message("ERROR", "Script 01: Failed")
+        log_warning(f"An unexpected error occurred: {e}", function_name="main", issue_type="unexpected_error")
+        log_traceback()
 
-    seperation_bar()
+    script_end("[Data Analysis] 01 - Data Cleaning and Preprocessing")
 
 
 if __name__ == "__main__":
-    main()
+    arguments = parse_arguments()
+    main(fused_ingest=arguments.fused, write_intermediate_files=arguments.write_intermediate_files)
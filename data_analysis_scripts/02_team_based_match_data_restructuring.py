@@ -1,8 +1,7 @@
 import os
-import json
-import traceback
-from utils.seperation_bars import seperation_bar, small_seperation_bar
-from utils.logging import log_message
+from utils.dictionary_manipulation import *
+from utils.logging import *
+from utils.team_columnar_store import build_team_columnar_store, save_team_columnar_store
 
 # ===========================
 # CONFIGURATION
@@ -10,70 +9,89 @@ from utils.logging import log_message
 
 # File paths (Modify these as needed)
 CLEANED_MATCH_DATA_PATH = "data/processed/cleaned_match_data.json"  # Input: Cleaned match-level data
-TEAM_BASED_MATCH_DATA_PATH = "data/processed/team_based_match_data.json"  # Output: Team-based data
+TEAM_BASED_MATCH_STORE_PATH = "data/processed/team_based_match_data"  # Output: Team-based columnar store (directory of .npy files)
+TEAM_BASED_MATCH_DATA_PATH = "data/processed/team_based_match_data.json"  # Optional output: Team-based JSON export
+
+# The team-based data is saved as a columnar store: one flat array per variable sorted by team, with team offsets
+# (see utils/team_columnar_store.py). Set to True to also export the nested JSON (every match dict under its team).
+EXPORT_TEAM_BASED_JSON = False
 
 
 # ===========================
 # HELPER FUNCTIONS
 # ===========================
 
-def restructure_to_team_based(cleaned_file_path, team_file_path):
+def group_matches_by_team(cleaned_data):
     """
-    Restructures cleaned match data into a team-based format with advanced statistics.
+    Restructures cleaned match data into a team-based format.
 
-    :param cleaned_file_path: Path to the cleaned JSON file.
-    :param team_file_path: Path to save the team-based JSON file.
+    Args:
+        cleaned_data (list): Cleaned match entries.
+
+    Returns:
+        dict: Team number -> {"matches": [match entries of that team]}.
     """
-    try:
-        # Load cleaned data
-        small_seperation_bar("LOAD DATA")
-        log_message("INFO", f"Loading cleaned data from: {cleaned_file_path}")
+    if not isinstance(cleaned_data, list):
+        raise ValueError("Cleaned data must be a list of matches.")
 
-        with open(cleaned_file_path, 'r') as infile:
-            cleaned_data = json.load(infile)
+    # Group matches by team
+    team_data = {}
 
-        small_seperation_bar("CONVERT TO TEAM-BASED")
-        if not isinstance(cleaned_data, list):
-            raise ValueError("Cleaned data must be a list of matches.")
+    for match in cleaned_data:
+        team = match["metadata"]["robotTeam"]
 
-        # Group matches by team
-        team_data = {}
-        total_matches = 0
+        if team not in team_data:
+            team_data[team] = {"matches": []}
 
-        for match in cleaned_data:
-            total_matches += 1
-            team = match["metadata"]["robotTeam"]
+        team_data[team]["matches"].append(match)
 
-            if team not in team_data:
-                team_data[team] = {"matches": []}
+    log_info(f"Total matches processed: {len(cleaned_data)}")
+    log_info(f"Total unique teams identified: {len(team_data)}")
 
-            team_data[team]["matches"].append(match)
+    # Placeholder for advanced statistics calculations
+    for team, data in team_data.items():
+        for match in data["matches"]:
+            # Example: Add any advanced calculations here
+            pass  # Placeholder for custom metrics
 
-        log_message("INFO", f"Total matches processed: {total_matches}")
-        log_message("INFO", f"Total unique teams identified: {len(team_data)}")
+    return team_data
 
-        # Placeholder for advanced statistics calculations
-        for team, data in team_data.items():
-            for match in data["matches"]:
-                # Example: Add any advanced calculations here
-                pass  # Placeholder for custom metrics
+def restructure_to_team_based(cleaned_file_path, team_store_path, team_file_path=None):
+    """
+    Restructures the cleaned match data file into a team-based columnar store.
+
+    :param cleaned_file_path: Path to the cleaned JSON file.
+    :param team_store_path: Directory to save the team-based columnar store to.
+    :param team_file_path: Path to also export the team-based JSON to, or None.
+    """
+    try:
+        # Load cleaned data
+        log_header("Load Data")
+        log_info(f"Loading cleaned data from: {cleaned_file_path}")
+        cleaned_data = retrieve_json(cleaned_file_path)
+
+        log_header("Convert to Team-Based")
+        team_data = group_matches_by_team(cleaned_data)
+        count_records(len(cleaned_data), "matches")
 
         # Save team-based data
-        small_seperation_bar("SAVE DATA")
-        log_message("INFO", f"Saving team-based match data to: {team_file_path}")
+        log_header("Save Data")
+        log_info(f"Saving team-based columnar store to: {team_store_path}")
+        save_team_columnar_store(team_store_path, build_team_columnar_store(team_data))
 
-        with open(team_file_path, 'w') as outfile:
-            json.dump(team_data, outfile, indent=4)
+        if team_file_path is not None:
+            log_info(f"Exporting team-based match data to: {team_file_path}")
+            save_json(team_file_path, team_data)
 
-        log_message("INFO", "Data restructuring completed successfully.")
+        log_success("Data restructuring completed successfully.")
 
     except FileNotFoundError as e:
-        log_message("ERROR", f"Cleaned data file not found: {e}")
+        log_warning(f"Cleaned data file not found: {e}", function_name="restructure_to_team_based", issue_type="missing_file")
     except json.JSONDecodeError as e:
-        log_message("ERROR", f"Failed to decode JSON: {e}")
+        log_warning(f"Failed to decode JSON: {e}", function_name="restructure_to_team_based", issue_type="invalid_json")
     except Exception as e:
-        log_message("ERROR", f"An unexpected error occurred during restructuring: {e}")
-        print(traceback.format_exc())
+        log_warning(f"An unexpected error occurred during restructuring: {e}", function_name="restructure_to_team_based", issue_type="unexpected_error")
+        log_traceback()
 
 
 # ===========================
@@ -82,25 +100,21 @@ def restructure_to_team_based(cleaned_file_path, team_file_path):
 
 def main():
     """Main function to execute the team-based match data restructuring."""
-    seperation_bar()
-    log_message("INFO", "Script 02: Team-based Match Data Restructuring Started")
+    script_start("[Data Analysis] 02 - Team-based Match Data Restructuring")
 
     try:
         # Ensure the output directory exists
-        os.makedirs(os.path.dirname(TEAM_BASED_MATCH_DATA_PATH), exist_ok=True)
+        os.makedirs(os.path.dirname(TEAM_BASED_MATCH_STORE_PATH), exist_ok=True)
 
         # Restructure data to team-based format
-        restructure_to_team_based(CLEANED_MATCH_DATA_PATH, TEAM_BASED_MATCH_DATA_PATH)
-
-        log_message("INFO", "Script 02: Completed Successfully")
+        restructure_to_team_based(CLEANED_MATCH_DATA_PATH, TEAM_BASED_MATCH_STORE_PATH, TEAM_BASED_MATCH_DATA_PATH if EXPORT_TEAM_BASED_JSON else None)
 
     except Exception as e:
-        log_message("ERROR", f"An unexpected error occurred: {e}")
-        print(traceback.format_exc())
-        log_message("ERROR", "Script 02: Failed")
+        log_warning(f"An unexpected error occurred: {e}", function_name="main", issue_type="unexpected_error")
+        log_traceback()
 
-    seperation_bar()
+    script_end("[Data Analysis] 02 - Team-based Match Data Restructuring")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
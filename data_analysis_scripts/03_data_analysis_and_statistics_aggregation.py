@@ -1,11 +1,15 @@
 import os
 import csv
-import json
-import traceback
+import argparse
 import pandas as pd
 import numpy as np
-from utils.seperation_bars import seperation_bar, small_seperation_bar
-from utils.logging import log_message
+from utils.dictionary_manipulation import *
+from utils.logging import *
+from utils.stage_cache import file_fingerprint
+from utils import team_statistics
+from utils.team_statistics import RunningStatistics
+from utils import team_columnar_store
+from utils.team_columnar_store import *
 
 # ===========================
 # CONFIGURATION
@@ -13,13 +17,38 @@ from utils.logging import log_message
 
 # File Paths
 EXPECTED_DATA_STRUCTURE_PATH = "config/expected_data_structure.json"
-TEAM_BASED_MATCH_DATA_PATH = "data/processed/team_based_match_data.json"
+TEAM_BASED_MATCH_STORE_PATH = "data/processed/team_based_match_data"
+TEAM_BASED_MATCH_DATA_PATH = "data/processed/team_based_match_data.json"   # Read when there is no columnar store
 TEAM_PERFORMANCE_DATA_PATH_JSON = "outputs/team_data/team_performance_data.json"
 TEAM_PERFORMANCE_DATA_PATH_CSV = "outputs/team_data/team_performance_data.csv"
+TEAM_AGGREGATION_STATE_PATH = "data/processed/team_aggregation_state.json"
+
+# Incremental aggregation keeps a digest of every team's matches and its statistics in TEAM_AGGREGATION_STATE_PATH,
+# and only recomputes the teams whose matches were added, changed or removed since the previous run.
+INCREMENTAL_AGGREGATION = False
+
+# Every column's raw match values (`{column}_values`) are left out of the summary JSON/CSV; boxplots read them from the
+# team-based columnar store instead. Set to True to also store them in the summary as quoted, comma-separated strings.
+INCLUDE_VALUE_LISTS = False
+
+# The vectorized engine computes every team's statistics from the team store's column arrays: one sort of each column by
+# team and value for the min, max, median and quartiles, and sums over each team's slice for the mean and std dev, so the
+# output is bit-identical to the per-team loop. Set to False to use the reference per-team DataFrame loop (calculate_team_performance_data) instead.
+VECTORIZED_AGGREGATION = True
+
+# Online statistics keep a RunningStatistics accumulator (Welford mean/variance, min/max, t-digest quartiles) per team and
+# quantitative variable in TEAM_STATISTICS_STATE_PATH, and update it with each team's new matches only, so live updates
+# never rescan history. Only the quantitative statistics are produced; custom metrics (and `_values` lists) need the
+# full match history of the default (exact) mode.
+ONLINE_STATISTICS = False
+TEAM_STATISTICS_STATE_PATH = "data/processed/team_statistics_state.json"
+QUANTITATIVE_STATISTICS = ["mean", "std_dev", "range", "median", "q1", "q3", "iqr", "min", "max"]
 
 # Load Expected Data Structure
-with open(EXPECTED_DATA_STRUCTURE_PATH, "r") as f:
-    EXPECTED_DATA_STRUCTURE_DICT = json.load(f)
+EXPECTED_DATA_STRUCTURE_DICT = retrieve_json(EXPECTED_DATA_STRUCTURE_PATH)
+
+# Every section other than metadata holds variables (e.g. 'matchapp_variables', 'superapp_variables')
+VARIABLE_SECTIONS = [section for section in EXPECTED_DATA_STRUCTURE_DICT if section != "metadata"]
 
 # ===========================
 # CUSTOM METRICS CLASS
@@ -75,7 +104,9 @@ def flatten_expected_vars(dictionary, return_dict=None, prefix=""):
 
     return return_dict
 
-FLATTENED_EXPECTED_VARIABLES = flatten_expected_vars(EXPECTED_DATA_STRUCTURE_DICT.get("variables", {}))
+FLATTENED_EXPECTED_VARIABLES = {}
+for section in VARIABLE_SECTIONS:
+    flatten_expected_vars(EXPECTED_DATA_STRUCTURE_DICT[section], FLATTENED_EXPECTED_VARIABLES)
 
 def convert_to_serializable(obj):
     """Converts NumPy and Pandas types to standard Python types for JSON serialization."""
@@ -93,15 +124,23 @@ def convert_to_serializable(obj):
         return '"' + ", ".join(map(str, obj)) + '"'  # Ensure CSV stores as a single cell
     return obj
 
+def flatten_match_variables(match):
+    """Flattens the variables of every variable section of a match into a single dict."""
+    flat_variables = {}
+    for section in VARIABLE_SECTIONS:
+        flatten_expected_vars(match.get(section, {}), flat_variables)
+    return flat_variables
+
 def determine_statistical_type(variable_name):
     """Returns the statistical data type (quantitative, categorical, binary) based on the expected structure."""
     return FLATTENED_EXPECTED_VARIABLES.get(variable_name, {}).get("statistical_data_type", "unknown")
 
-def calculate_team_performance_data(team_data):
+def calculate_team_performance_data(team_data, include_values=True):
     """
     Computes performance metrics and applies custom metrics per team.
 
     :param team_data: Dictionary containing match data for each team.
+    :param include_values: Store every column's raw match values as `{column}_values`.
     :return: A dictionary with aggregated team statistics.
     """
     all_team_performance_data = {}
@@ -112,15 +151,16 @@ def calculate_team_performance_data(team_data):
             all_team_performance_data[team] = {"number_of_matches": 0}
             continue
 
-        flat_data = [{k: v for k, v in flatten_expected_vars(match["variables"]).items()} for match in matches]
+        flat_data = [flatten_match_variables(match) for match in matches]
         df = pd.DataFrame(flat_data)
         df.dropna(axis=1, how="all", inplace=True)
 
         team_performance = {"number_of_matches": len(df)}
 
         # Store raw match values
-        for column in df.columns:
-            team_performance[f"{column}_values"] = convert_to_serializable(df[column].tolist())
+        if include_values:
+            for column in df.columns:
+                team_performance[f"{column}_values"] = convert_to_serializable(df[column].tolist())
 
         # Compute statistics
         for column in df.columns:
@@ -139,6 +179,10 @@ def calculate_team_performance_data(team_data):
                 team_performance[f"{column}_q3"] = convert_to_serializable(df[column].quantile(0.75))
                 team_performance[f"{column}_iqr"] = convert_to_serializable(df[column].quantile(0.75) - df[column].quantile(0.25))
 
+                # Whisker ends of the summary boxplots
+                team_performance[f"{column}_min"] = convert_to_serializable(df[column].min())
+                team_performance[f"{column}_max"] = convert_to_serializable(df[column].max())
+
         # Apply Custom Metrics
         for metric_name in dir(CustomMetrics):
             if not metric_name.startswith("_") and callable(getattr(CustomMetrics, metric_name)):
@@ -149,57 +193,520 @@ def calculate_team_performance_data(team_data):
     return all_team_performance_data
 
 
-# ===========================
-# MAIN SCRIPT
-# ===========================
+def store_variable_columns(team_store):
+    """
+    Returns the team store's columns of the variable sections by variable name, in the order flatten_match_variables
+    gives the variables of matches rebuilt from the store. Variable names are unique across sections, as
+    FLATTENED_EXPECTED_VARIABLES assumes.
+    """
+    return {
+        column["key"]: column for section in VARIABLE_SECTIONS
+        for column in team_store["columns"] if column["section"] == section
+    }
+
+def column_present(column):
+    """Returns a bool array of the rows whose match has the variable."""
+    if column["missing"] is None:
+        return np.ones(len(column["values"]), dtype=bool)
+    return ~np.asarray(column["missing"])
+
+def column_frame_values(column):
+    """
+    Returns a store column's values as pd.DataFrame would hold them in a frame of the rebuilt matches' variables:
+    NaN where the match does not have the variable, and the same inferred dtype (int64 only if every value is an int).
+    """
+    has_missing = column["missing"] is not None and np.asarray(column["missing"]).any()
+    if column["kind"] == "number":
+        if not has_missing and column["integer"] is not None and np.asarray(column["integer"]).all():
+            return np.asarray(column["values"]).astype(np.int64)
+        return np.array(column["values"], dtype=np.float64)
+    if column["kind"] == "bool" and not has_missing:
+        return np.array(column["values"], dtype=bool)
+    return [np.nan if is_missing else value for value, is_missing in zip(decode_column(column), (~column_present(column)).tolist())]
+
+def team_column_orders(columns, offsets):
+    """
+    Returns the column order of every team's frame in calculate_team_performance_data: the order in which the
+    team's matches first use each variable (a rebuilt match lists its variables in column order), so variables
+    are ordered by their first row in the team, then by column. Shared by every team when every match has every variable.
+    """
+    if all(column["missing"] is None or not np.asarray(column["missing"]).any() for column in columns.values()):
+        return None
+    row_count = offsets[-1]
+    rows = np.arange(row_count)
+    first_rows = np.array([
+        team_reduce(np.minimum, np.where(column_present(column), rows, row_count), offsets, empty_value=row_count)
+        for column in columns.values()
+    ])
+    keys = list(columns)
+    column_orders = np.argsort(first_rows, axis=0, kind="stable").T.tolist()
+    return [
+        [keys[position] for position in column_order if first_rows[position, index] < row_count]
+        for index, column_order in enumerate(column_orders)
+    ]
+
+def team_value_lists(frame, column, store_column, offsets):
+    """
+    Returns every team's list of values of a column, as tolist() of the team's own frame column would return them.
+    Slices of the shared column are used where the team's dtype is the same, so most teams need no pandas call.
+    """
+    values = frame[column].tolist()
+    team_slices = [values[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
 
-def main():
-    seperation_bar()
-    log_message("INFO", "Script 03: Data Analysis & Statistics Aggregation Started")
+    if frame[column].dtype == np.float64:
+        # A team whose values are all ints (and none missing) gets an int64 column of its own
+        if store_column["kind"] == "number":
+            integer = np.asarray(store_column["integer"]) if store_column["integer"] is not None else np.zeros(len(values), dtype=bool)
+        else:
+            # A json column of a subset of teams (see select_teams) can hold only numbers
+            integer = np.array([type(value) is int for value in decode_column(store_column)], dtype=bool)
+        integer_teams = team_reduce(np.logical_and, integer, offsets, empty_value=True).tolist()
+        return [
+            [int(value) for value in team_slice] if is_integer else team_slice
+            for team_slice, is_integer in zip(team_slices, integer_teams)
+        ]
+    return team_slices
+
+def team_column_series(frame, column, offsets):
+    """
+    Builds every team's own Series of a mixed object column (e.g. bools and strings, or bools and None),
+    so that each team's dtype is inferred from its own values, as with a frame per team.
+    """
+    values = frame[column].tolist()
+    return [pd.Series(values[start:end], index=range(start, end)) for start, end in zip(offsets[:-1], offsets[1:])]
 
-    try:
-        small_seperation_bar("LOAD DATA")
-        log_message("INFO", "Loading team-based match data.")
+def team_means_and_std_devs(values, offsets):
+    """
+    Returns every team's mean and std dev of a numeric column, computed the way pandas' Series.mean and Series.std
+    compute them on the team's own column (NaN set to 0, NumPy's pairwise sum, two-pass variance with ddof=1), so the
+    results are bit-identical to the per-team loop. A grouped sum adds the values in a different order.
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    missing = np.isnan(values)
+    filled_values = np.where(missing, 0.0, values)
+    means = np.full(len(offsets) - 1, np.nan)
+    std_devs = np.full(len(offsets) - 1, np.nan)
+
+    for index, (start, end) in enumerate(zip(offsets[:-1], offsets[1:])):
+        team_values = filled_values[start:end]
+        count = end - start - int(np.count_nonzero(missing[start:end]))
+        if not count:
+            continue
+        means[index] = team_values.sum() / count
+        if count > 1:
+            squared_differences = (means[index] - team_values) ** 2
+            squared_differences[missing[start:end]] = 0.0
+            std_devs[index] = np.sqrt(squared_differences.sum() / (count - 1))
+
+    return means, std_devs
+
+def team_quantiles(sorted_values, starts, counts, probability):
+    """
+    Returns every team's quantile of a column sorted by team and value (missing values last), with the index and
+    linear interpolation formulas of np.quantile, which Series.quantile uses, so the results are bit-identical.
+    """
+    virtual_indexes = (counts - 1) * probability
+    previous_indexes = np.floor(virtual_indexes)
+    next_indexes = np.minimum(previous_indexes + 1, counts - 1)
+    gamma = virtual_indexes - previous_indexes
+    previous = sorted_values[starts + previous_indexes.astype(np.int64)]
+    following = sorted_values[starts + next_indexes.astype(np.int64)]
+    difference = following - previous
+    return np.where(gamma >= 0.5, following - difference * (1 - gamma), previous + difference * gamma)
+
+def team_sorted_statistics(values, team_codes, offsets):
+    """
+    Returns every team's min, max, quartiles and median of a numeric column from one sort of the column by team and
+    value, as {"min", "max", 0.25, 0.5, 0.75: array with one value per team (NaN for teams without values)}.
+    The median is the mean of the middle values, like np.median (and Series.median), not an interpolated quantile.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    sorted_values = np.append(values[np.lexsort((values, team_codes))], np.nan)
+    counts = np.asarray(team_reduce(np.add, (~np.isnan(values)).astype(np.int64), np.asarray(offsets, dtype=np.int64)))
+    starts = np.where(counts > 0, np.asarray(offsets[:-1], dtype=np.int64), len(values))     # Teams without values read the NaN pad
+    counts = np.maximum(counts, 1)
+
+    lower_middle = sorted_values[starts + (counts - 1) // 2]
+    upper_middle = sorted_values[starts + counts // 2]
+    return {
+        "min": sorted_values[starts],
+        "max": sorted_values[starts + counts - 1],
+        0.25: team_quantiles(sorted_values, starts, counts, 0.25),
+        0.5: np.where(counts % 2 == 1, lower_middle, (lower_middle + upper_middle) / 2),
+        0.75: team_quantiles(sorted_values, starts, counts, 0.75)
+    }
+
+def calculate_team_performance_data_vectorized(team_store, include_values=True):
+    """
+    Computes the same performance metrics as calculate_team_performance_data from the team store's column arrays,
+    without rebuilding any match. The min, max, median and quartiles of every team and variable come from one sort of
+    each column by team (so q1/q3 are computed once), and the mean and std dev from sums over each team's slice of the
+    column, with the formulas pandas uses on a team's own column, so every statistic is bit-identical to the per-team
+    loop. Only those sums and the custom metrics run per team, on slices of the shared frame.
+
+    :param team_store: Team-based columnar store (see utils/team_columnar_store.py).
+    :param include_values: Store every column's raw match values as `{column}_values`.
+    :return: A dictionary with aggregated team statistics, with the same keys in the same order.
+    """
+    teams = team_store["teams"]
+    match_counts = team_match_counts(team_store)
+    offsets = np.asarray(team_store["team_offsets"], dtype=np.int64).tolist()
+
+    if not offsets[-1]:
+        return {team: {"number_of_matches": 0} for team in teams}
+    columns = store_variable_columns(team_store)
+    frame = pd.DataFrame({column: column_frame_values(store_column) for column, store_column in columns.items()}, index=range(offsets[-1]))
+    team_codes = np.repeat(np.arange(len(teams)), match_counts)
+
+    # Columns every team keeps after dropping its all-missing columns, in its own column order
+    present_columns = {column: team_reduce(np.logical_or, frame[column].notna().to_numpy(), offsets, empty_value=False) for column in frame.columns}
+    column_orders = team_column_orders(columns, offsets)
+    mixed_columns = {
+        column: team_column_series(frame, column, offsets) for column in frame.columns
+        if frame[column].dtype == object and not all(isinstance(value, str) for value in frame[column].tolist())
+    }
+    value_lists = {
+        column: [series.tolist() for series in mixed_columns[column]] if column in mixed_columns else team_value_lists(frame, column, columns[column], offsets)
+        for column in frame.columns
+    }
+
+    # Quantitative statistics of every team and variable, one sort per variable
+    quantitative_columns = [column for column in frame.columns if determine_statistical_type(column) == "quantitative"]
+    numeric_frame = frame[quantitative_columns].apply(pd.to_numeric, errors="coerce")
+    statistics = {}
+    for column in quantitative_columns:
+        values = numeric_frame[column].to_numpy(dtype=np.float64)
+        statistics.update({(column, key): team_values for key, team_values in team_sorted_statistics(values, team_codes, offsets).items()})
+        statistics[(column, "mean")], statistics[(column, "std")] = team_means_and_std_devs(values, offsets)
+
+    # The range, min and max stay ints where the team's coerced column is int64
+    integer_columns = {
+        column: [
+            pd.to_numeric(pd.Series(value_list), errors="coerce").dtype == np.int64 if frame[column].dtype == object
+            else all(type(value) is int for value in value_list)
+            for value_list in value_lists[column]
+        ]
+        for column in quantitative_columns
+    }
+
+    # Custom metrics see the same dtypes as with a frame per team
+    metrics_frame = frame.copy()
+    metrics_frame[quantitative_columns] = numeric_frame
+    mixed_metric_columns = [column for column in mixed_columns if column not in quantitative_columns]
+    custom_metrics = [
+        (metric_name, getattr(CustomMetrics, metric_name)) for metric_name in dir(CustomMetrics)
+        if not metric_name.startswith("_") and callable(getattr(CustomMetrics, metric_name))
+    ]
+
+    all_team_performance_data = {}
+
+    for index, team in enumerate(teams):
+        if not match_counts[index]:
+            all_team_performance_data[team] = {"number_of_matches": 0}
+            continue
+
+        team_columns = frame.columns if column_orders is None else column_orders[index]
+        team_columns = [column for column in team_columns if present_columns[column][index]]
+
+        team_performance = {"number_of_matches": int(match_counts[index])}
+
+        # Store raw match values
+        if include_values:
+            for column in team_columns:
+                team_performance[f"{column}_values"] = convert_to_serializable(value_lists[column][index])
+
+        # Statistics
+        for column in team_columns:
+            if determine_statistical_type(column) != "quantitative":
+                continue
+            minimum, maximum = statistics[(column, "min")][index], statistics[(column, "max")][index]
+            q1, q3 = statistics[(column, 0.25)][index], statistics[(column, 0.75)][index]
+
+            team_performance[f"{column}_mean"] = convert_to_serializable(statistics[(column, "mean")][index])
+            team_performance[f"{column}_std_dev"] = convert_to_serializable(statistics[(column, "std")][index])
+            team_performance[f"{column}_range"] = convert_to_serializable(int(maximum - minimum) if integer_columns[column][index] else maximum - minimum)
+            team_performance[f"{column}_median"] = convert_to_serializable(statistics[(column, 0.5)][index])
+            team_performance[f"{column}_q1"] = convert_to_serializable(q1)
+            team_performance[f"{column}_q3"] = convert_to_serializable(q3)
+            team_performance[f"{column}_iqr"] = convert_to_serializable(q3 - q1)
+            team_performance[f"{column}_min"] = convert_to_serializable(int(minimum) if integer_columns[column][index] else minimum)
+            team_performance[f"{column}_max"] = convert_to_serializable(int(maximum) if integer_columns[column][index] else maximum)
+
+        # Apply Custom Metrics
+        team_frame = metrics_frame.iloc[offsets[index]:offsets[index + 1]]
+        if list(team_frame.columns) != team_columns:
+            team_frame = team_frame[team_columns]
+        if mixed_metric_columns:
+            team_frame = team_frame.assign(**{column: mixed_columns[column][index] for column in mixed_metric_columns if column in team_columns})
+        for metric_name, metric in custom_metrics:
+            team_performance[metric_name] = metric(team_frame)
+
+        all_team_performance_data[str(team)] = team_performance  # Ensure team key is a string
+
+    return all_team_performance_data
+
+
+def aggregation_code_fingerprint():
+    """Fingerprints this script, the store format and the expected data structure. Saved statistics are only reused while all are unchanged."""
+    return file_fingerprint(__file__) + file_fingerprint(team_columnar_store.__file__) + file_fingerprint(EXPECTED_DATA_STRUCTURE_PATH)
+
+def load_aggregation_state(state_path=TEAM_AGGREGATION_STATE_PATH):
+    """Loads the saved per-team digests and statistics of the previous incremental run, or None if there is none."""
+    if not os.path.exists(state_path):
+        return None
+    return retrieve_json(state_path)
+
+def calculate_team_performance_data_incremental(team_store, aggregation_state, vectorized=VECTORIZED_AGGREGATION):
+    """
+    Computes the serializable team performance data, recomputing only the teams whose matches changed since the
+    run that saved aggregation_state. Every team's statistics depend only on its own matches, so the result is
+    identical to a full recompute, with teams in the same order.
+
+    :param team_store: Team-based columnar store (see utils/team_columnar_store.py).
+    :param aggregation_state: Output of a previous run (see load_aggregation_state), or None to compute every team.
+    :param vectorized: Recompute the affected teams with the vectorized engine.
+    :return: (serializable team performance data, new aggregation state, list of recomputed teams, list of removed teams).
+    """
+    code_fingerprint = aggregation_code_fingerprint()
+    if aggregation_state is None or aggregation_state.get("code_fingerprint") != code_fingerprint:
+        aggregation_state = {"teams": {}}
+    previous_teams = aggregation_state["teams"]
+
+    teams = [str(team) for team in team_store["teams"]]
+    digests = dict(zip(teams, team_digests(team_store)))
+    affected_store = select_teams(team_store, [index for index, team in enumerate(teams) if previous_teams.get(team, {}).get("digest") != digests[team]])
+    if vectorized:
+        recomputed = convert_to_serializable(calculate_team_performance_data_vectorized(affected_store, INCLUDE_VALUE_LISTS))
+    else:
+        recomputed = convert_to_serializable(calculate_team_performance_data(team_data_from_store(affected_store), INCLUDE_VALUE_LISTS))
+
+    team_performance_data = {}
+    for team in teams:
+        team_performance_data[team] = recomputed[team] if team in recomputed else previous_teams[team]["performance"]
+
+    new_aggregation_state = {
+        "code_fingerprint": code_fingerprint,
+        "teams": {team: {"digest": digests[team], "performance": performance} for team, performance in team_performance_data.items()}
+    }
+    removed_teams = [team for team in previous_teams if team not in team_performance_data]
+
+    return team_performance_data, new_aggregation_state, list(recomputed), removed_teams
+
+def update_team_statistics(team_statistics_state, team_store):
+    """
+    Updates the saved per-team accumulators with the matches added since the run that saved them.
+    Matches are appended to each team's list in cleaned data order, so a team's new matches are the ones after the
+    saved match count. If the counted matches no longer match their saved digest (a match was edited, removed or
+    reordered), the team's history changed and its accumulators are rebuilt from all of its matches.
+
+    :param team_statistics_state: Output of a previous run (see load_aggregation_state), or None to start empty.
+    :param team_store: Team-based columnar store (see utils/team_columnar_store.py).
+    :return: (new team statistics state, list of updated teams, list of rebuilt teams).
+    """
+    code_fingerprint = aggregation_code_fingerprint() + file_fingerprint(team_statistics.__file__)
+    if team_statistics_state is None or team_statistics_state.get("code_fingerprint") != code_fingerprint:
+        team_statistics_state = {"teams": {}}
+    previous_teams = team_statistics_state["teams"]
+
+    team_names = [str(team) for team in team_store["teams"]]
+    offsets = np.asarray(team_store["team_offsets"], dtype=np.int64).tolist()
+    match_counts = team_match_counts(team_store)
+    quantitative_columns = [column for key, column in store_variable_columns(team_store).items() if determine_statistical_type(key) == "quantitative"]
+
+    # Digests of every team's matches, and of the matches counted by the previous run
+    counted_match_counts = [previous_teams[team]["match_count"] if team in previous_teams else 0 for team in team_names]
+    digests = team_digests(team_store)
+    counted_digests = team_digests(team_store, np.minimum(counted_match_counts, match_counts))
+
+    teams = {}
+    updated_teams = []
+    rebuilt_teams = []
+
+    for index, team in enumerate(team_names):
+        match_count = int(match_counts[index])
+        team_state = previous_teams.get(team)
+        counted_matches = counted_match_counts[index]
+        history_unchanged = team_state is not None and counted_matches <= match_count and counted_digests[index] == team_state["matches_digest"]
+
+        if history_unchanged and counted_matches == match_count:
+            teams[team] = team_state
+            continue
+
+        if not history_unchanged:
+            if team_state is not None:
+                rebuilt_teams.append(team)
+            counted_matches = 0
+            accumulators = {}
+        else:
+            accumulators = {column: RunningStatistics.from_dict(state) for column, state in team_state["variables"].items()}
+
+        # New variables get their accumulator in the order the new matches first have a value for them
+        new_values = {}
+        for column in quantitative_columns:
+            decoded = decode_column(column, offsets[index] + counted_matches, offsets[index + 1])
+            first_row = next((row for row, value in enumerate(decoded) if value is not None), None)
+            if first_row is not None:
+                new_values[column["key"]] = (first_row, [value for value in decoded if value is not None])
+        for column in sorted(new_values, key=lambda column: new_values[column][0]):
+            accumulators.setdefault(column, RunningStatistics()).update_many(new_values[column][1])
+
+        teams[team] = {
+            "match_count": match_count,
+            "matches_digest": digests[index],
+            "variables": {column: accumulator.to_dict() for column, accumulator in accumulators.items()}
+        }
+        updated_teams.append(team)
+
+    return {"code_fingerprint": code_fingerprint, "teams": teams}, updated_teams, rebuilt_teams
+
+def summarize_team_statistics(team_statistics_state):
+    """
+    Builds the serializable team performance data from the per-team accumulators.
+
+    :param team_statistics_state: Output of update_team_statistics.
+    :return: Team -> {"number_of_matches", "<column>_<statistic>" for every quantitative statistic}.
+    """
+    team_performance_data = {}
+
+    for team, team_state in team_statistics_state["teams"].items():
+        team_performance = {"number_of_matches": team_state["match_count"]}
+        for column, state in team_state["variables"].items():
+            summary = RunningStatistics.from_dict(state).summary()
+            for statistic in QUANTITATIVE_STATISTICS:
+                team_performance[f"{column}_{statistic}"] = summary[statistic]
+        team_performance_data[team] = team_performance
+
+    return convert_to_serializable(team_performance_data)
+
+def aggregate_team_statistics_online(team_store):
+    """
+    Updates the saved per-team accumulators with new matches and returns the serializable team performance data.
+
+    :param team_store: Team-based columnar store (see utils/team_columnar_store.py).
+    :return: The serializable quantitative team statistics.
+    """
+    team_statistics_state = load_aggregation_state(TEAM_STATISTICS_STATE_PATH)
+    team_statistics_state, updated_teams, rebuilt_teams = update_team_statistics(team_statistics_state, team_store)
 
-        with open(TEAM_BASED_MATCH_DATA_PATH, 'r') as infile:
-            team_data = json.load(infile)
+    log_info(f"Updated {len(updated_teams)} of {len(team_statistics_state['teams'])} teams ({len(rebuilt_teams)} rebuilt from their full history)")
+    log_info(f"Saving team statistics state to: {TEAM_STATISTICS_STATE_PATH}")
+    os.makedirs(os.path.dirname(TEAM_STATISTICS_STATE_PATH), exist_ok=True)
+    save_json(TEAM_STATISTICS_STATE_PATH, team_statistics_state, indent=None)
 
-        team_performance_data = calculate_team_performance_data(team_data)
+    return summarize_team_statistics(team_statistics_state)
 
-        small_seperation_bar("SAVE DATA")
-        
-        # Save JSON
-        log_message("INFO", f"Saving JSON team performance data to: {TEAM_PERFORMANCE_DATA_PATH_JSON}")
-        os.makedirs(os.path.dirname(TEAM_PERFORMANCE_DATA_PATH_JSON), exist_ok=True)
-        with open(TEAM_PERFORMANCE_DATA_PATH_JSON, 'w') as json_file:
-            json.dump(convert_to_serializable(team_performance_data), json_file, indent=4)
+def aggregate_team_performance_data(team_store, incremental=INCREMENTAL_AGGREGATION, online=ONLINE_STATISTICS, vectorized=VECTORIZED_AGGREGATION):
+    """
+    Computes the team performance data and converts it to the JSON-serializable form that is saved to disk.
+
+    :param team_store: Team-based columnar store (see utils/team_columnar_store.py).
+    :param incremental: Only recompute the teams whose matches changed since the previous incremental run.
+    :param online: Update persisted per-team accumulators with new matches only (quantitative statistics only).
+    :param vectorized: Use the vectorized engine instead of the per-team DataFrame loop.
+    :return: The serializable team performance data, as it would be loaded back from the JSON output.
+    """
+    if online:
+        team_performance_data = aggregate_team_statistics_online(team_store)
+    elif incremental:
+        aggregation_state = load_aggregation_state()
+        team_performance_data, aggregation_state, recomputed_teams, removed_teams = calculate_team_performance_data_incremental(team_store, aggregation_state, vectorized)
+
+        log_info(f"Recomputed {len(recomputed_teams)} of {len(team_performance_data)} teams, removed {len(removed_teams)} teams")
+        log_info(f"Saving team aggregation state to: {TEAM_AGGREGATION_STATE_PATH}")
+        os.makedirs(os.path.dirname(TEAM_AGGREGATION_STATE_PATH), exist_ok=True)
+        save_json(TEAM_AGGREGATION_STATE_PATH, aggregation_state, indent=None)
+    elif vectorized:
+        team_performance_data = convert_to_serializable(calculate_team_performance_data_vectorized(team_store, INCLUDE_VALUE_LISTS))
+    else:
+        team_performance_data = convert_to_serializable(calculate_team_performance_data(team_data_from_store(team_store), INCLUDE_VALUE_LISTS))
+
+    log_info(f"Total teams processed: {len(team_performance_data)}")
+    return team_performance_data
+
+def load_team_based_match_data(store_path=TEAM_BASED_MATCH_STORE_PATH, json_path=TEAM_BASED_MATCH_DATA_PATH):
+    """
+    Loads the team-based match data from the columnar store written by script 02, or from the JSON export if there is no store.
+
+    :param store_path: Directory of the team-based columnar store.
+    :param json_path: Path of the team-based JSON export.
+    :return: Team-based columnar store.
+    """
+    if os.path.isdir(store_path):
+        log_info(f"Loading team-based match data from: {store_path}")
+        return load_team_columnar_store(store_path)
+    log_info(f"Loading team-based match data from: {json_path}")
+    return build_team_columnar_store(retrieve_json(json_path))
+
+def save_team_performance_data(json_path, team_performance_data, csv_path=TEAM_PERFORMANCE_DATA_PATH_CSV):
+    """
+    Saves the team performance data as JSON and as a CSV with one row per team.
+
+    :param json_path: Path to save the JSON team performance data.
+    :param team_performance_data: Output of aggregate_team_performance_data.
+    :param csv_path: Path to save the CSV team performance data.
+    """
+    # Save JSON
+    log_info(f"Saving JSON team performance data to: {json_path}")
+    os.makedirs(os.path.dirname(json_path), exist_ok=True)
+    save_json(json_path, convert_to_serializable(team_performance_data))
+
+    # Save CSV
+    log_info(f"Saving CSV team performance data to: {csv_path}")
+    os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+
+    with open(csv_path, 'w', newline='') as csv_file:
+        csv_writer = csv.writer(csv_file)
 
-        # Save CSV
-        log_message("INFO", f"Saving CSV team performance data to: {TEAM_PERFORMANCE_DATA_PATH_CSV}")
-        os.makedirs(os.path.dirname(TEAM_PERFORMANCE_DATA_PATH_CSV), exist_ok=True)
+        all_headers = sorted({key for team in team_performance_data.values() for key in team.keys()})
+        all_headers.insert(0, "team")
+        csv_writer.writerow(all_headers)
 
-        with open(TEAM_PERFORMANCE_DATA_PATH_CSV, 'w', newline='') as csv_file:
-            csv_writer = csv.writer(csv_file)
+        for team, metrics in team_performance_data.items():
+            row = [team] + [convert_to_serializable(metrics.get(k, "")) for k in all_headers[1:]]
+            csv_writer.writerow(row)
 
-            all_headers = sorted({key for team in team_performance_data.values() for key in team.keys()})
-            all_headers.insert(0, "team")
-            csv_writer.writerow(all_headers)
 
-            for team, metrics in team_performance_data.items():
-                row = [team] + [convert_to_serializable(metrics.get(k, "")) for k in all_headers[1:]]
-                csv_writer.writerow(row)
+# ===========================
+# MAIN SCRIPT
+# ===========================
+
+def parse_arguments():
+    """Parses the command line options for statistics aggregation."""
+    parser = argparse.ArgumentParser(description="Aggregate team performance statistics.")
+    parser.add_argument("--incremental", action="store_true", default=INCREMENTAL_AGGREGATION, help="Only recompute teams whose matches changed since the previous incremental run.")
+    parser.add_argument("--online", action="store_true", default=ONLINE_STATISTICS, help="Update persisted per-team accumulators with new matches only (approximate quartiles, quantitative statistics only).")
+    return parser.parse_args()
+
+def main(incremental=INCREMENTAL_AGGREGATION, online=ONLINE_STATISTICS):
+    """
+    Aggregates the team-based match data into team performance statistics.
+
+    Args:
+        incremental (bool): Only recompute teams whose matches changed since the previous incremental run.
+        online (bool): Update persisted per-team accumulators with new matches only.
+    """
+    script_start("[Data Analysis] 03 - Data Analysis & Statistics Aggregation")
+
+    try:
+        log_header("Load Data")
+        team_store = load_team_based_match_data()
+
+        log_header("Aggregate Statistics")
+        team_performance_data = aggregate_team_performance_data(team_store, incremental, online)
+        count_records(len(team_performance_data), "teams")
 
-        small_seperation_bar("SUMMARY")
-        log_message("INFO", f"Total teams processed: {len(team_performance_data)}")
+        log_header("Save Data")
+        save_team_performance_data(TEAM_PERFORMANCE_DATA_PATH_JSON, team_performance_data)
 
-        log_message("INFO", "Script 03: Completed Successfully")
+        log_success("Script 03: Completed Successfully")
 
     except Exception as e:
-        log_message("ERROR", f"An unexpected error occurred: {e}")
-        print(traceback.format_exc())
+        log_warning(f"An unexpected error occurred: {e}", function_name="main", issue_type="unexpected_error")
+        log_traceback()
 
-    seperation_bar()
+    script_end("[Data Analysis] 03 - Data Analysis & Statistics Aggregation")
 
 
 if __name__ == "__main__":
-    main()
+    arguments = parse_arguments()
+    main(incremental=arguments.incremental, online=arguments.online)
@@ -1,16 +1,20 @@
 import os
-import json
-import traceback
+import argparse
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from pandas.plotting import parallel_coordinates
-from utils.logging import log_message
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from utils.dictionary_manipulation import *
+from utils.logging import *
+from utils.chart_rendering import *
+from utils.team_columnar_store import find_column, load_team_columnar_store, team_match_counts
 
 # ===========================
 # CONFIGURATION SECTION
 # ===========================
 
 TEAM_PERFORMANCE_DATA_PATH_JSON = "outputs/team_data/team_performance_data.json"
+TEAM_MATCH_VALUES_PATH = "data/processed/team_based_match_data"  # Team-based columnar store with every match's raw values (raw value boxplots only)
 VISUALIZATIONS_DIR = "outputs/visualizations"
 
 # Bar Chart Configuration
@@ -28,6 +32,20 @@ BOXPLOT_CONFIG = {
     "Boxplot for Variable 2 and 3": ["var2"]
 }
 
+# Boxplots are drawn with Axes.bxp from every team's summary statistics (<variable>_median, _q1, _q3, _min and _max
+# in the team performance data), so their cost depends on the number of teams only; whiskers span each team's min to max,
+# and the chart title says so, since these boxes are not comparable to 1.5 IQR boxes. Set to True to compute them from every match's raw values in the team columnar store instead (1.5 IQR whiskers and outliers).
+BOXPLOT_FROM_RAW_VALUES = False
+BOXPLOT_LISTED_TEAMS = 10       # Teams named in the warning about teams left out of a summary boxplot
+
+# Rendering: every chart is a self-contained job (chart kind, title, frame key, metric columns, save path), rendered by
+# utils/chart_rendering.py. With RENDER_WORKERS > 1 the jobs run on a process pool with the Agg backend, and the chart
+# frames are sent to each worker once, when it starts. If a worker dies, the charts are rendered in this process instead.
+# Both modes render with the same code and settings, so they save identical files.
+RENDER_WORKERS = 1
+CHART_DPI = "figure"            # Saved resolution; "figure" keeps each figure's own DPI (100)
+PNG_COMPRESSION_LEVEL = 6       # zlib level of the saved PNGs, 0 (fastest, largest) to 9 (slowest, smallest); 6 is Pillow's default
+
 # ===========================
 # HELPER FUNCTIONS
 # ===========================
@@ -35,181 +53,233 @@ BOXPLOT_CONFIG = {
 def load_team_performance_data():
     """Loads the team performance JSON data."""
     if not os.path.exists(TEAM_PERFORMANCE_DATA_PATH_JSON):
-        log_message("ERROR", f"Team performance data file not found: {TEAM_PERFORMANCE_DATA_PATH_JSON}")
+        log_warning(f"Team performance data file not found: {TEAM_PERFORMANCE_DATA_PATH_JSON}", function_name="load_team_performance_data", issue_type="missing_file")
+        return None
+
+    return retrieve_json(TEAM_PERFORMANCE_DATA_PATH_JSON)
+
+def load_team_match_values():
+    """Opens the team-based columnar store holding every match's raw values. Its arrays are memory-mapped, so only the boxplotted columns are read."""
+    if not os.path.isdir(TEAM_MATCH_VALUES_PATH):
+        log_warning(f"Team match values not found: {TEAM_MATCH_VALUES_PATH}", function_name="load_team_match_values", issue_type="missing_file")
         return None
 
-    with open(TEAM_PERFORMANCE_DATA_PATH_JSON, "r") as infile:
-        return json.load(infile)
+    return load_team_columnar_store(TEAM_MATCH_VALUES_PATH)
 
 def ensure_directory_exists(directory):
     """Ensures that a directory exists."""
     os.makedirs(directory, exist_ok=True)
 
-def extract_metric_data(team_data, metric_list):
+def build_metric_frame(team_performance_data):
     """
-    Extracts relevant metrics from the team data.
+    Loads the team performance data into one wide frame (teams x metrics), which every bar chart selects its columns from.
+    Columns keep their numeric dtypes; metrics a team does not have are NaN.
 
-    :param team_data: The dictionary containing team statistics.
-    :param metric_list: List of metric names to extract.
-    :return: A DataFrame containing the extracted metrics.
+    :param team_performance_data: The dictionary containing team statistics.
+    :return: A DataFrame indexed by team, with one column per metric.
     """
-    extracted_data = []
-
-    for team, stats in team_data.items():
-        row = {"team": team}
-        for metric in metric_list:
-            row[metric] = stats.get(metric, 0)  # Default to 0 if metric is missing
-        extracted_data.append(row)
+    metric_frame = pd.DataFrame.from_dict(team_performance_data, orient="index")
+    metric_frame.index.name = "team"
+    for column in metric_frame.columns[metric_frame.dtypes == object]:
+        try:
+            metric_frame[column] = pd.to_numeric(metric_frame[column])
+        except (ValueError, TypeError):
+            pass    # Text metrics (e.g. a categorical mode) stay as they are
+    return metric_frame
+
+def add_missing_metrics(metric_frame, metric_titles):
+    """
+    Reports every requested metric that is missing from the team performance data, once, and adds absent ones as NaN columns.
 
-    return pd.DataFrame(extracted_data)
+    :param metric_frame: Output of build_metric_frame.
+    :param metric_titles: Dict of requested metric -> titles of the charts using it.
+    :return: The metric frame with a column for every requested metric.
+    """
+    absent_metrics = [metric for metric in metric_titles if metric not in metric_frame.columns]
+    for metric in absent_metrics:
+        log_warning(
+            f"Metric '{metric}' is not in the team performance data; plotted as NaN in {', '.join(metric_titles[metric])}",
+            function_name="add_missing_metrics", issue_type="missing_metric", location=metric
+        )
+
+    missing_counts = metric_frame[[metric for metric in metric_titles if metric in metric_frame.columns]].isna().sum()
+    for metric, missing_count in missing_counts[missing_counts > 0].items():
+        log_warning(
+            f"Metric '{metric}' has no value for {missing_count} of {len(metric_frame)} teams; plotted as NaN",
+            function_name="add_missing_metrics", issue_type="missing_metric", location=metric
+        )
+
+    return metric_frame.reindex(columns=[*metric_frame.columns, *absent_metrics]) if absent_metrics else metric_frame
+
+def extract_match_values(team_match_values, variable, teams):
+    """
+    Extracts every team's raw match values of a variable from the team columnar store.
 
-# ===========================
-# BAR CHART VISUALIZATION FUNCTIONS
-# ===========================
+    :param team_match_values: Team-based columnar store (see utils/team_columnar_store.py).
+    :param variable: Variable name.
+    :param teams: Teams to include, as in the team performance data.
+    :return: A long DataFrame with one row per non-missing match value (columns: team, variable).
+    """
+    try:
+        column = find_column(team_match_values, variable)
+    except KeyError:
+        return pd.DataFrame(columns=["team", variable])
+    if column["kind"] != "number":
+        return pd.DataFrame(columns=["team", variable])
 
-def generate_bar_chart(df, title, save_path):
-    """Generates a simple bar chart for a single metric comparison."""
-    metric = df.columns[1]  # Assuming "team" is the first column
-    df.set_index("team")[metric].plot(kind="bar", figsize=(10, 5), color="skyblue", edgecolor="black")
-
-    plt.title(title)
-    plt.xlabel("Teams")
-    plt.ylabel(metric)
-    plt.xticks(rotation=45, ha="right")
-    plt.grid(axis="y", linestyle="--", alpha=0.7)
-
-    plt.savefig(save_path, bbox_inches="tight")
-    plt.close()
-    log_message("INFO", f"Bar Chart saved: {save_path}")
-
-def generate_grouped_bar_chart(df, title, save_path):
-    """Generates a grouped bar chart comparing teams for each variable metric."""
-    df.set_index("team").plot(kind="bar", figsize=(12, 6), colormap="viridis")
-
-    plt.title(title)
-    plt.xlabel("Teams")
-    plt.ylabel("Values")
-    plt.xticks(rotation=45, ha="right")
-    plt.legend(title="Metrics")
-    plt.grid(axis="y", linestyle="--", alpha=0.7)
-
-    plt.savefig(save_path, bbox_inches="tight")
-    plt.close()
-    log_message("INFO", f"Grouped Bar Chart saved: {save_path}")
-
-def generate_stacked_bar_chart(df, title, save_path):
-    """Generates a stacked bar chart comparing teams across multiple metrics."""
-    df.set_index("team").plot(kind="bar", stacked=True, figsize=(12, 6), colormap="plasma")
-
-    plt.title(title)
-    plt.xlabel("Teams")
-    plt.ylabel("Values")
-    plt.xticks(rotation=45, ha="right")
-    plt.legend(title="Metrics")
-    plt.grid(axis="y", linestyle="--", alpha=0.7)
-
-    plt.savefig(save_path, bbox_inches="tight")
-    plt.close()
-    log_message("INFO", f"Stacked Bar Chart saved: {save_path}")
-
-def generate_parallel_coordinates_plot(df, title, save_path):
-    """Generates a parallel coordinates plot to compare multiple metrics per team."""
-    df_normalized = df.copy()
-    df_normalized[df.columns[1:]] = df_normalized[df.columns[1:]].apply(lambda x: (x - x.min()) / (x.max() - x.min()))
-
-    plt.figure(figsize=(12, 6))
-    parallel_coordinates(df_normalized, class_column="team", colormap=plt.get_cmap("tab10"), linewidth=2)
-
-    plt.title(title)
-    plt.xticks(rotation=45, ha="right")
-    plt.xlabel("Metrics")
-    plt.ylabel("Normalized Values (0-1)")
-    plt.legend(title="Teams", bbox_to_anchor=(1.05, 1), loc="upper left")
-
-    plt.savefig(save_path, bbox_inches="tight")
-    plt.close()
-    log_message("INFO", f"Parallel Coordinates Plot saved: {save_path}")
+    values = np.asarray(column["values"])
+    row_teams = np.repeat(np.array([str(team) for team in team_match_values["teams"]], dtype=object), team_match_counts(team_match_values))
+    keep = ~np.isnan(values) & np.isin(row_teams, list(teams))
+    return pd.DataFrame({"team": row_teams[keep], variable: values[keep]})
 
 # ===========================
-# BOXPLOT VISUALIZATION FUNCTION
+# RENDERING
 # ===========================
 
-def generate_boxplot(team_data, variable, save_path):
+def chart_jobs(team_performance_data, team_match_values, visualizations_dir, boxplot_raw_values=BOXPLOT_FROM_RAW_VALUES):
     """
-    Generates a boxplot for a single variable across teams.
+    Builds the wide metric frame (and raw value frames for raw value boxplots) once, and lists the charts to render from them.
 
-    :param team_data: Dictionary containing team performance data.
-    :param variable: Variable name for the boxplot.
-    :param save_path: Path to save the plot.
+    :param team_performance_data: Dictionary containing team performance data.
+    :param team_match_values: Team-based columnar store with every match's raw values, only read for raw value boxplots.
+    :param visualizations_dir: Directory to save the plots in.
+    :param boxplot_raw_values: Compute the boxplots from the raw match values instead of the team summary statistics.
+    :return: (dict of frame key -> DataFrame, list of (chart kind, title, frame key, metric columns or None, save path) jobs in render order).
     """
-    df = extract_metric_data(team_data, [variable])
-
-    if df.empty:
-        log_message("WARNING", f"No valid data for {variable}, skipping boxplot.")
-        return
-
-    plt.figure(figsize=(10, 6))
-    df.boxplot(column=variable, by="team", grid=False)
-
-    plt.title(f"Boxplot for {variable} across Teams")
-    plt.xlabel("Teams")
-    plt.ylabel(variable.replace("_", " ").title())
-    plt.xticks(rotation=45, ha="right")
+    metric_frame = build_metric_frame(team_performance_data)
+    frames = {"metrics": metric_frame}
+    jobs = []
+
+    # Process bar charts
+    if metric_frame.empty and BAR_CHART_CONFIG:
+        log_warning("No team performance data, skipping bar charts.", function_name="chart_jobs", issue_type="missing_data")
+    else:
+        metric_titles = {}
+        for title, config in BAR_CHART_CONFIG.items():
+            for metric in config["variable_metrics"]:
+                metric_titles.setdefault(metric, []).append(title)
+        frames["metrics"] = add_missing_metrics(metric_frame, metric_titles)
 
-    plt.savefig(save_path, bbox_inches="tight")
-    plt.close()
-    log_message("INFO", f"Boxplot saved: {save_path}")
+        for title, config in BAR_CHART_CONFIG.items():
+            variable_metrics = config["variable_metrics"]
+            log_info(f"Processing {title}: {variable_metrics}")
+
+            for vis in config["visualizations"]:
+                single_metric_chart = vis == "bar_chart" and len(variable_metrics) == 1
+                multi_metric_chart = vis in ("grouped_bar_chart", "stacked_bar_chart", "parallel_coordinates_plot") and len(variable_metrics) > 1
+                if single_metric_chart or multi_metric_chart:
+                    jobs.append((vis, title, "metrics", variable_metrics, os.path.join(visualizations_dir, f"{title}_{vis}.png")))
+
+    # Process boxplots
+    if boxplot_raw_values and team_match_values is None and BOXPLOT_CONFIG:
+        log_warning("No team match values, skipping boxplots.", function_name="chart_jobs", issue_type="missing_data")
+        return frames, jobs
+
+    for title, variables in BOXPLOT_CONFIG.items():
+        for variable in variables:
+            log_info(f"Generating boxplot for {variable}")
+            save_path = os.path.join(visualizations_dir, f"{variable}_boxplot.png")
+
+            if boxplot_raw_values:
+                df = extract_match_values(team_match_values, variable, metric_frame.index)
+                has_data = not df.empty
+            else:
+                summary_columns = [f"{variable}_{statistic}" for statistic in BOXPLOT_SUMMARY_STATISTICS]
+                has_data = all(column in metric_frame.columns for column in summary_columns) and metric_frame[summary_columns].notna().all(axis=1).any()
+
+            if not has_data:
+                log_warning(f"No valid data for {variable}, skipping boxplot.", function_name="chart_jobs", issue_type="missing_data", location=variable)
+                continue
+            if not boxplot_raw_values:
+                incomplete_teams = metric_frame.index[metric_frame[summary_columns].isna().any(axis=1)].tolist()
+                if incomplete_teams:
+                    log_warning(
+                        f"{len(incomplete_teams)} teams without every {variable} summary statistic are left out of its boxplot: "
+                        f"{', '.join(map(str, incomplete_teams[:BOXPLOT_LISTED_TEAMS]))}{', ...' if len(incomplete_teams) > BOXPLOT_LISTED_TEAMS else ''}",
+                        function_name="chart_jobs", issue_type="missing_data", location=variable
+                    )
+            if boxplot_raw_values:
+                frames[("match_values", variable)] = df
+                jobs.append(("boxplot", variable, ("match_values", variable), None, save_path))
+            else:
+                jobs.append(("boxplot", variable, "metrics", summary_columns, save_path))
+
+    return frames, jobs
+
+def render_visualizations(team_performance_data, team_match_values=None, visualizations_dir=VISUALIZATIONS_DIR, workers=RENDER_WORKERS, boxplot_raw_values=BOXPLOT_FROM_RAW_VALUES):
+    """
+    Renders every configured bar chart and boxplot.
+
+    :param team_performance_data: Dictionary containing team performance data.
+    :param team_match_values: Team-based columnar store with every match's raw values, only read for raw value boxplots.
+    :param visualizations_dir: Directory to save the plots in.
+    :param workers: Number of rendering processes. 1 renders every chart in the current process.
+    :param boxplot_raw_values: Compute the boxplots from the raw match values instead of the team summary statistics.
+    :return: List of the saved plot paths.
+    """
+    ensure_directory_exists(visualizations_dir)
+    frames, jobs = chart_jobs(team_performance_data, team_match_values, visualizations_dir, boxplot_raw_values)
+
+    workers = min(workers, len(jobs))
+    saved_paths = None
+    if workers > 1:
+        log_info(f"Rendering {len(jobs)} charts on {workers} worker processes")
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_render_worker, initargs=(frames, CHART_DPI, PNG_COMPRESSION_LEVEL)) as executor:
+                saved_paths = list(executor.map(render_chart_job, jobs))
+        except BrokenProcessPool as e:
+            log_warning(f"A rendering process died ({e}); rendering the charts in this process instead", function_name="render_visualizations", issue_type="broken_process_pool")
+    if saved_paths is None:
+        RENDER_STATE.update(frames=frames, dpi=CHART_DPI, compress_level=PNG_COMPRESSION_LEVEL)
+        try:
+            saved_paths = [render_chart_job(job) for job in jobs]
+        finally:
+            RENDER_STATE["frames"] = {}
+
+    for (kind, _, _, _, _), save_path in zip(jobs, saved_paths):
+        log_info(f"{CHART_RENDERERS[kind][1]} saved: {save_path}")
+
+    return saved_paths
 
 # ===========================
 # MAIN FUNCTION
 # ===========================
 
-def main():
-    log_message("INFO", "Script 04: Visualizations Started")
+def parse_arguments():
+    """Parses the command line options for the visualizations."""
+    parser = argparse.ArgumentParser(description="Render the team performance charts.")
+    parser.add_argument("--workers", type=int, default=RENDER_WORKERS, help=f"Number of rendering processes (default: {RENDER_WORKERS}).")
+    parser.add_argument("--raw-boxplots", action="store_true", default=BOXPLOT_FROM_RAW_VALUES, help="Compute the boxplots from every match's raw values instead of the team summary statistics.")
+    return parser.parse_args()
+
+def main(workers=RENDER_WORKERS, boxplot_raw_values=BOXPLOT_FROM_RAW_VALUES):
+    """
+    Renders the configured charts.
+
+    Args:
+        workers (int): Number of rendering processes. 1 renders every chart in the main process.
+        boxplot_raw_values (bool): Compute the boxplots from every match's raw values instead of the team summary statistics.
+    """
+    script_start("[Data Analysis] 04 - Visualizations")
 
     try:
         team_performance_data = load_team_performance_data()
         if team_performance_data is None:
             raise ValueError("No team performance data available.")
 
-        ensure_directory_exists(VISUALIZATIONS_DIR)
+        team_match_values = load_team_match_values() if BOXPLOT_CONFIG and boxplot_raw_values else None
 
-        # Process bar charts
-        for title, config in BAR_CHART_CONFIG.items():
-            variable_metrics = config["variable_metrics"]
-            visualizations = config["visualizations"]
-
-            log_message("INFO", f"Processing {title}: {variable_metrics}")
-
-            df = extract_metric_data(team_performance_data, variable_metrics)
-            if df.empty:
-                log_message("WARNING", f"No data found for {title}. Skipping...")
-                continue
+        saved_paths = render_visualizations(team_performance_data, team_match_values, workers=workers, boxplot_raw_values=boxplot_raw_values)
+        count_records(len(saved_paths), "charts")
 
-            for vis in visualizations:
-                save_path = os.path.join(VISUALIZATIONS_DIR, f"{title}_{vis}.png")
-
-                if vis == "bar_chart" and len(variable_metrics) == 1:
-                    generate_bar_chart(df, title, save_path)
-                elif vis == "grouped_bar_chart" and len(variable_metrics) > 1:
-                    generate_grouped_bar_chart(df, title, save_path)
-                elif vis == "stacked_bar_chart" and len(variable_metrics) > 1:
-                    generate_stacked_bar_chart(df, title, save_path)
-                elif vis == "parallel_coordinates_plot" and len(variable_metrics) > 1:
-                    generate_parallel_coordinates_plot(df, title, save_path)
-
-        # Process boxplots
-        for title, variables in BOXPLOT_CONFIG.items():
-            for variable in variables:
-                log_message("INFO", f"Generating boxplot for {variable}")
-                save_path = os.path.join(VISUALIZATIONS_DIR, f"{variable}_boxplot.png")
-                generate_boxplot(team_performance_data, variable, save_path)
-
-        log_message("INFO", "Script 04: Completed Successfully")
+        log_success(f"Script 04: Completed Successfully ({len(saved_paths)} plots saved)")
 
     except Exception as e:
-        log_message("ERROR", f"Unexpected error: {e}")
-        print(traceback.format_exc())
+        log_warning(f"Unexpected error: {e}", function_name="main", issue_type="unexpected_error")
+        log_traceback()
+
+    script_end("[Data Analysis] 04 - Visualizations")
 
 if __name__ == "__main__":
-    main()
+    arguments = parse_arguments()
+    main(workers=arguments.workers, boxplot_raw_values=arguments.raw_boxplots)
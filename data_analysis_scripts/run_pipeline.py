@@ -0,0 +1,246 @@
+import argparse
+import matplotlib
+import pandas as pd
+from utils.dictionary_manipulation import *
+from utils.logging import *
+from utils.pipeline import run_pipeline
+from utils.script_importing import import_script
+from utils.stage_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_CACHE_SIZE_BYTES
+from utils.team_columnar_store import *
+
+# ===========================
+# CONFIGURATION
+# ===========================
+
+DATA_CLEANING_SCRIPT_PATH = "data_analysis_scripts/01_data_cleaning_and_preprocessing.py"
+TEAM_BASED_RESTRUCTURING_SCRIPT_PATH = "data_analysis_scripts/02_team_based_match_data_restructuring.py"
+STATISTICS_AGGREGATION_SCRIPT_PATH = "data_analysis_scripts/03_data_analysis_and_statistics_aggregation.py"
+VISUALIZATIONS_SCRIPT_PATH = "data_analysis_scripts/04_visualizations.py"
+JSON_NESTING_STRUCTURE_FIX_SCRIPT_PATH = "data_analysis_preperation/json_nesting_structure_fix.py"
+EXPECTED_DATA_STRUCTURE_PATH = "config/expected_data_structure.json"
+
+# The pipeline repairs, reformats and cleans data/raw/raw_match_data.json in one streaming pass by default.
+# Set to False to read the output of json_nesting_structure_fix.py (data/raw/formatted_match_data.json) instead.
+FUSED_INGEST = True
+
+# Stages whose inputs, config, code and parameters are unchanged since a cached run are skipped
+# and their artifacts restored from the cache. Use --force to rerun them anyway.
+STAGE_CACHE = True
+STAGE_CACHE_DIR = DEFAULT_CACHE_DIR
+MAX_STAGE_CACHE_SIZE_BYTES = DEFAULT_MAX_CACHE_SIZE_BYTES
+
+# ===========================
+# HELPER FUNCTIONS
+# ===========================
+
+def load_stage_scripts():
+    """Imports every stage script once. Each one loads its config when it is imported."""
+    scripts = {}
+    for name, script_path in [
+        ("data_cleaning", DATA_CLEANING_SCRIPT_PATH),
+        ("team_based_restructuring", TEAM_BASED_RESTRUCTURING_SCRIPT_PATH),
+        ("statistics_aggregation", STATISTICS_AGGREGATION_SCRIPT_PATH),
+        ("visualizations", VISUALIZATIONS_SCRIPT_PATH)
+    ]:
+        log_info(f"Loading '{name}' from '{script_path}'")
+        scripts[name] = import_script(script_path)
+    return scripts
+
+
+def build_pipeline(scripts, fused_ingest=FUSED_INGEST, incremental=False, online=False, render_workers=1):
+    """
+    Declares the stages of the data analysis pipeline and the artifacts they hand to each other.
+
+    Args:
+        scripts (dict): Output of load_stage_scripts.
+        fused_ingest (bool): Clean data/raw/raw_match_data.json directly instead of formatted_match_data.json.
+        incremental (bool): Only recompute the team statistics of teams whose matches changed since the previous incremental run.
+        online (bool): Update persisted per-team accumulators with new matches only (quantitative statistics only).
+        render_workers (int): Number of processes rendering the charts.
+
+    Returns:
+        tuple: (list of stage dicts, dict of artifact name -> artifact dict), see utils.pipeline.
+    """
+    data_cleaning = scripts["data_cleaning"]
+    team_based_restructuring = scripts["team_based_restructuring"]
+    statistics_aggregation = scripts["statistics_aggregation"]
+    visualizations = scripts["visualizations"]
+
+    stages = [
+        {
+            "name": "clean",
+            "inputs": [],
+            "output": "cleaned_match_data",
+            "run": lambda: data_cleaning.clean_match_data(fused_ingest=fused_ingest),
+            "records": ("entries", len),
+            "fingerprint": {
+                "files": [
+                    data_cleaning.UNFIXED_RAW_MATCH_DATA_PATH if fused_ingest else data_cleaning.RAW_MATCH_DATA_PATH,
+                    EXPECTED_DATA_STRUCTURE_PATH
+                ],
+                "code": [
+                    DATA_CLEANING_SCRIPT_PATH,
+                    JSON_NESTING_STRUCTURE_FIX_SCRIPT_PATH,
+                    "utils/schema_validation.py",
+                    "utils/columnar_validation.py",
+                    "utils/dictionary_manipulation.py"
+                ],
+                "params": {"fused_ingest": fused_ingest, "void_missing_entries": data_cleaning.VOID_MISSING_ENTRIES}
+            }
+        },
+        {
+            "name": "restructure",
+            "inputs": ["cleaned_match_data"],
+            "output": "team_based_match_data",
+            "run": lambda cleaned_data: build_team_columnar_store(team_based_restructuring.group_matches_by_team(cleaned_data)),
+            "records": ("matches", lambda team_store: int(team_store["team_offsets"][-1])),
+            "fingerprint": {"code": [TEAM_BASED_RESTRUCTURING_SCRIPT_PATH, "utils/team_columnar_store.py"]}
+        },
+        {
+            "name": "aggregate",
+            "inputs": ["team_based_match_data"],
+            "output": "team_performance_data",
+            "run": lambda team_store: statistics_aggregation.aggregate_team_performance_data(team_store, incremental, online),
+            "records": ("teams", len),
+            "fingerprint": {
+                "files": [EXPECTED_DATA_STRUCTURE_PATH],
+                "code": [STATISTICS_AGGREGATION_SCRIPT_PATH, "utils/team_statistics.py", "utils/team_columnar_store.py"],
+                "params": {"pandas": pd.__version__, "online": online}
+            }
+        },
+        {
+            "name": "visualize",
+            "inputs": ["team_performance_data", "team_based_match_data"],
+            "output": "visualizations",
+            "run": lambda team_performance_data, team_store: visualizations.render_visualizations(team_performance_data, team_store, workers=render_workers),
+            "records": ("charts", len),
+            "fingerprint": {
+                "code": [VISUALIZATIONS_SCRIPT_PATH, "utils/chart_rendering.py"],
+                "params": {
+                    "bar_chart_config": visualizations.BAR_CHART_CONFIG,
+                    "boxplot_config": visualizations.BOXPLOT_CONFIG,
+                    "boxplot_from_raw_values": visualizations.BOXPLOT_FROM_RAW_VALUES,
+                    "visualizations_dir": visualizations.VISUALIZATIONS_DIR,
+                    "chart_dpi": visualizations.CHART_DPI,
+                    "png_compression_level": visualizations.PNG_COMPRESSION_LEVEL,
+                    "matplotlib": matplotlib.__version__
+                }
+            }
+        }
+    ]
+
+    artifacts = {
+        "cleaned_match_data": {
+            "path": data_cleaning.CLEANED_MATCH_DATA_PATH,
+            "load": retrieve_json,
+            "save": save_json_stream,
+            "write": True
+        },
+        "team_based_match_data": {
+            "path": team_based_restructuring.TEAM_BASED_MATCH_STORE_PATH,
+            "load": load_team_columnar_store,
+            "save": save_team_columnar_store,
+            "write": True,      # Holds the raw match values that raw value boxplots read
+            "files": lambda team_store: store_files(team_based_restructuring.TEAM_BASED_MATCH_STORE_PATH)
+        },
+        "team_performance_data": {
+            "path": statistics_aggregation.TEAM_PERFORMANCE_DATA_PATH_JSON,
+            "load": retrieve_json,
+            "save": statistics_aggregation.save_team_performance_data,
+            "write": True,
+            "files": [statistics_aggregation.TEAM_PERFORMANCE_DATA_PATH_JSON, statistics_aggregation.TEAM_PERFORMANCE_DATA_PATH_CSV]
+        },
+        "visualizations": {
+            "path": visualizations.VISUALIZATIONS_DIR,     # Written by the stage itself
+            "load": None,
+            "save": None,
+            "write": True,
+            "files": lambda saved_paths: saved_paths
+        }
+    }
+
+    return stages, artifacts
+
+
+# ===========================
+# MAIN SCRIPT
+# ===========================
+
+def parse_arguments():
+    """Parses the command line options for the pipeline runner."""
+    parser = argparse.ArgumentParser(description="Run the data analysis scripts as one in-process pipeline.")
+    parser.add_argument("--from", dest="from_stage", default=None, help="First stage to run (clean, restructure, aggregate, visualize).")
+    parser.add_argument("--to", dest="to_stage", default=None, help="Last stage to run (clean, restructure, aggregate, visualize).")
+    parser.add_argument("--write", nargs="+", default=None, metavar="ARTIFACT", help="Artifacts to write to disk (default: cleaned_match_data, team_performance_data, visualizations).")
+    parser.add_argument("--formatted-input", action="store_true", help="Clean data/raw/formatted_match_data.json instead of repairing raw_match_data.json in the same pass.")
+    parser.add_argument("--incremental", action="store_true", help="Only recompute the statistics of teams whose matches changed since the previous incremental run.")
+    parser.add_argument("--online", action="store_true", help="Update persisted per-team statistics accumulators with new matches only.")
+    parser.add_argument("--render-workers", type=int, default=1, help="Number of processes rendering the charts (default: 1).")
+    parser.add_argument("--no-cache", action="store_true", help="Run every stage without reading or writing the stage cache.")
+    parser.add_argument("--force", action="store_true", help="Run every stage even if it is cached, and refresh the cache.")
+    parser.add_argument("--quiet", action="store_true", help="Only write the log file, without console output.")
+    parser.add_argument("--trace-memory", action="store_true", help="Record the tracemalloc peak of every stage in the run metrics (slower).")
+    parser.add_argument("--profile", choices=["cprofile", "sample"], default=None, help="Profile every stage to outputs/profiles/ and report the hot functions (also set with SCOUTING_PROFILE).")
+    return parser.parse_args()
+
+def main(from_stage=None, to_stage=None, write_artifacts=None, fused_ingest=FUSED_INGEST, incremental=False, online=False, render_workers=1, stage_cache=STAGE_CACHE, force=False):
+    """
+    Runs the data analysis pipeline in one process.
+
+    Args:
+        from_stage (str): First stage to run, or None to start at 'clean'.
+        to_stage (str): Last stage to run, or None to run to 'visualize'.
+        write_artifacts (list): Artifacts to write to disk, or None for the declared defaults.
+        fused_ingest (bool): Clean data/raw/raw_match_data.json directly instead of formatted_match_data.json.
+        incremental (bool): Only recompute the team statistics of teams whose matches changed since the previous incremental run.
+        online (bool): Update persisted per-team statistics accumulators with new matches only.
+        render_workers (int): Number of processes rendering the charts.
+        stage_cache (bool): Skip stages whose fingerprint matches a cached run and restore their artifacts.
+        force (bool): Run every stage even if it is cached, and refresh the cache.
+    """
+    script_start("[Data Analysis] Pipeline")
+
+    try:
+        log_header("Load Stages")
+        scripts = load_stage_scripts()
+        stages, artifacts = build_pipeline(scripts, fused_ingest, incremental, online, render_workers)
+
+        run_pipeline(
+            stages,
+            artifacts,
+            from_stage,
+            to_stage,
+            write_artifacts,
+            cache_dir=STAGE_CACHE_DIR if stage_cache else None,
+            force=force,
+            max_cache_size_bytes=MAX_STAGE_CACHE_SIZE_BYTES
+        )
+
+        log_success("Pipeline: Completed Successfully")
+
+    except Exception as e:
+        log_warning(f"An unexpected error occurred: {e}", function_name="main", issue_type="unexpected_error")
+        log_traceback()
+
+    script_end("[Data Analysis] Pipeline")
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+    if arguments.quiet:
+        configure_logging(quiet=True)
+    if arguments.trace_memory:
+        configure_metrics(trace_memory=True)
+    if arguments.profile:
+        configure_profiling(mode=arguments.profile)
+    main(
+        from_stage=arguments.from_stage,
+        to_stage=arguments.to_stage,
+        write_artifacts=arguments.write,
+        fused_ingest=not arguments.formatted_input,
+        incremental=arguments.incremental,
+        online=arguments.online,
+        render_workers=arguments.render_workers,
+        stage_cache=not arguments.no_cache,
+        force=arguments.force
+    )
@@ -1,9 +1,14 @@
 import json
 import copy
 import random
+import argparse
 import numpy as np
+from functools import partial
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from utils.logging import *
 from utils.dictionary_manipulation import *
+from utils.match_scheduling import build_balanced_match_schedule
 
 # ===========================
 # CONFIGURATION SECTION
@@ -13,37 +18,29 @@ DATA_GENERATION_CONFIG_PATH = 'config/data_generation_config.json'
 EXPECTED_DATA_STRUCTURE_CONFIG_PATH = 'config/expected_data_structure.json'
 
 GENERATED_RAW_DATA_PATH = 'data/raw/generated_raw_data.json'
+GENERATED_RAW_DATA_NDJSON_PATH = 'data/raw/generated_raw_data.ndjson'
 
-# ===========================
-# HELPER FUNCTIONS SECTION
-# ===========================
-
-def find_lowest_teams_list(matches_per_team, teams_per_match):
-    """
-    Returns a list of teams_per_match count of the lowest number of matches played.
+# Streaming output writes each entry as one NDJSON line as soon as it is generated (constant memory)
+STREAM_OUTPUT = False
+GZIP_OUTPUT = False
 
-    Args:
-        matches_per_team (dict): Dictionary where keys are team numbers and values are match counts.
-        teams_per_match (int): Number of teams to return.
+# Batch generation draws each variable's whole column with one numpy.random.Generator call per batch
+BATCH_GENERATION = True
+BATCH_SIZE = 10000
 
-    Returns:
-        list: A list of team numbers with the lowest match count, limited to teams_per_match.
-    """
-    if teams_per_match > len(matches_per_team):
-        print(f"[MAJOR ERROR] teams_per_match ({teams_per_match}) cannot be greater than total teams ({len(matches_per_team)}).")
-        return []
+# Schedule slots per worker chunk. Chunks always end on a match boundary and do not depend on the
+# worker count, so a given seed produces identical output for any number of workers.
+CHUNK_SIZE = 10000
 
-    if not matches_per_team:
-        return []
-
-    # Find the minimum number of matches played
-    min_matches = min(matches_per_team.values())
+# ===========================
+# CONSTANTS SECTION
+# ===========================
 
-    # Get all teams with the minimum matches
-    lowest_teams = [team for team, count in matches_per_team.items() if count == min_matches]
+VARIABLE_GROUPS = ['matchapp_variables', 'superapp_variables']
 
-    # Return exactly `teams_per_match` teams, choosing randomly if needed
-    return random.sample(lowest_teams, min(len(lowest_teams), teams_per_match))
+# ===========================
+# HELPER FUNCTIONS SECTION
+# ===========================
 
 def generate_quantitative_variable(var_config):
     """
@@ -121,11 +118,343 @@ def generate_binary_variable(var_config):
     return random.choices(choices, probabilities)[0]  # Select based on unfair distribution
 
 
+def generate_string_variable(var_config):
+    """
+    Generates a single string variable value based on the given variable configuration.
+    
+    Args:
+        var_config (dict): The configuration dictionary.
+
+    Returns:
+        str: The generated value.
+    """
+    return var_config["text"]
+
+
+VARIABLE_GENERATORS = {
+    "quantitative": generate_quantitative_variable,
+    "categorical": generate_categorical_variable,
+    "binary": generate_binary_variable,
+    "string": generate_string_variable
+}
+
+# ===========================
+# BATCH GENERATION SECTION
+# ===========================
+
+def fill_missing_values(values, missing_mask, missing_filler):
+    """
+    Converts a generated column to a list of Python values and replaces masked entries with the missing filler.
+
+    Args:
+        values (np.ndarray): The generated column.
+        missing_mask (np.ndarray): Boolean mask of entries that should be missing.
+        missing_filler: The value used for missing entries.
+
+    Returns:
+        list: The column as JSON-serializable Python values.
+    """
+    column = values.tolist()
+    for index in np.flatnonzero(missing_mask).tolist():
+        column[index] = missing_filler
+    return column
+
+
+def generate_quantitative_column(var_config, size, rng):
+    """
+    Generates a whole column of quantitative values, statistically equivalent to calling
+    generate_quantitative_variable `size` times.
+    
+    Args:
+        var_config (dict): The variable configuration dictionary.
+        size (int): Number of values to generate.
+        rng (np.random.Generator): Random generator used for every draw.
+
+    Returns:
+        list: The generated values.
+    """
+    mean = var_config["data_deviation"][0]["mean"]
+    std_dev = var_config["data_deviation"][0]["standard_deviation"]
+    outlier_std_dev_multiplier = var_config["positive_outliers_amount_of_std_devs"]
+
+    # Base values, then missing and outlier masks from a single uniform draw
+    values = rng.normal(loc=mean, scale=std_dev, size=size)
+    uniform_draws = rng.random((2, size))
+    missing_mask = uniform_draws[0] < var_config["missing_values_chance"]
+    outlier_mask = uniform_draws[1] < var_config["positive_outliers_chance"]
+
+    values[outlier_mask] += outlier_std_dev_multiplier * std_dev
+
+    return fill_missing_values(values, missing_mask, var_config["missing_values_filler"])
+
+
+def generate_distribution_column(var_config, size, rng):
+    """
+    Generates a whole column of values drawn from the variable's unfair distribution
+    using a cumulative-probability lookup. Shared by categorical and binary variables.
+    
+    Args:
+        var_config (dict): The configuration dictionary.
+        size (int): Number of values to generate.
+        rng (np.random.Generator): Random generator used for every draw.
+
+    Returns:
+        list: The generated values.
+    """
+    distribution = var_config["unfair_distribution"][0]
+    choices = np.array(list(distribution.keys()), dtype=object)
+    cumulative_probabilities = np.cumsum(list(distribution.values()), dtype=float)
+
+    # Missing mask and category draws from a single uniform draw
+    uniform_draws = rng.random((2, size))
+    missing_mask = uniform_draws[0] < var_config["missing_values_chance"]
+    choice_indices = np.searchsorted(cumulative_probabilities, uniform_draws[1] * cumulative_probabilities[-1], side="right")
+    choice_indices = np.minimum(choice_indices, len(choices) - 1)
+
+    return fill_missing_values(choices[choice_indices], missing_mask, var_config["missing_values_filler"])
+
+
+def generate_string_column(var_config, size, rng):
+    """
+    Generates a whole column of string values.
+    
+    Args:
+        var_config (dict): The configuration dictionary.
+        size (int): Number of values to generate.
+        rng (np.random.Generator): Unused, kept so every column generator shares a signature.
+
+    Returns:
+        list: The generated values.
+    """
+    return [var_config["text"]] * size
+
+
+COLUMN_GENERATORS = {
+    "quantitative": generate_quantitative_column,
+    "categorical": generate_distribution_column,
+    "binary": generate_distribution_column,
+    "string": generate_string_column
+}
+
+# ===========================
+# ENTRY SECTION
+# ===========================
+
+def build_variable_plan(expected_data_structure, data_generation):
+    """
+    Pairs every flattened expected variable with its statistical data type and generation config.
+
+    Args:
+        expected_data_structure (dict): The expected data structure config.
+        data_generation (dict): The data generation config.
+
+    Returns:
+        dict: Variable group name -> list of (flattened key, statistical data type, variable config) tuples.
+    """
+    variable_plan = {}
+
+    for group in VARIABLE_GROUPS:
+        expected_variables = flatten_vars_in_dict(expected_data_structure.get(group, {}))
+        variable_plan[group] = [
+            (key, expected_info["statistical_data_type"], data_generation[group][key])
+            for key, expected_info in expected_variables.items()
+            if key in data_generation.get(group, {})
+        ]
+
+    return variable_plan
+
+
+def build_entry(match_number, team, position, scouter, variables):
+    """Builds a single raw data entry in the shape of the expected data structure."""
+    entry = {
+        "metadata": {
+            "scouterName": scouter,
+            "matchNumber": match_number,
+            "robotTeam": team,
+            "robotPosition": position
+        }
+    }
+    for group, group_variables in variables.items():
+        entry[group] = unflatten_vars_in_dict(group_variables)
+    return entry
+
+
+def generate_entries(schedule, variable_plan, scouters):
+    """
+    Generates one entry per scheduled slot, drawing every value separately.
+
+    Args:
+        schedule (list): (match number, team, robot position) tuples.
+        variable_plan (dict): Output of build_variable_plan.
+        scouters (list): Scouter names to pick from.
+
+    Returns:
+        list: The generated entries.
+    """
+    entries = []
+
+    for match_number, team, position in schedule:
+        variables = {
+            group: {key: VARIABLE_GENERATORS[data_type](var_config) for key, data_type, var_config in group_plan}
+            for group, group_plan in variable_plan.items()
+        }
+        entries.append(build_entry(match_number, team, position, random.choice(scouters), variables))
+
+    return entries
+
+
+def generate_entries_batch(schedule, variable_plan, scouters, rng, batch_size=BATCH_SIZE):
+    """
+    Generates one entry per scheduled slot, drawing each variable's column for a whole batch at once.
+
+    Args:
+        schedule (list): (match number, team, robot position) tuples.
+        variable_plan (dict): Output of build_variable_plan.
+        scouters (list): Scouter names to pick from.
+        rng (np.random.Generator): Random generator used for every draw.
+        batch_size (int): Number of slots generated per batch.
+
+    Returns:
+        list: The generated entries.
+    """
+    entries = []
+
+    for batch_start in range(0, len(schedule), batch_size):
+        batch = schedule[batch_start:batch_start + batch_size]
+        size = len(batch)
+
+        scouter_column = rng.integers(0, len(scouters), size=size).tolist()
+        columns = {
+            group: [(key, COLUMN_GENERATORS[data_type](var_config, size, rng)) for key, data_type, var_config in group_plan]
+            for group, group_plan in variable_plan.items()
+        }
+
+        for row, (match_number, team, position) in enumerate(batch):
+            variables = {
+                group: {key: column[row] for key, column in group_columns}
+                for group, group_columns in columns.items()
+            }
+            entries.append(build_entry(match_number, team, position, scouters[scouter_column[row]], variables))
+
+    return entries
+
+
+# ===========================
+# PARALLEL GENERATION SECTION
+# ===========================
+
+def split_schedule_into_chunks(schedule, chunk_size=CHUNK_SIZE):
+    """
+    Splits the schedule into consecutive chunks of roughly chunk_size slots, never splitting a match.
+
+    Args:
+        schedule (list): (match number, team, robot position) tuples in match order.
+        chunk_size (int): Target number of slots per chunk.
+
+    Returns:
+        list: A list of schedule chunks in match order.
+    """
+    chunks = []
+    current_chunk = []
+
+    for index, slot in enumerate(schedule):
+        current_chunk.append(slot)
+        is_match_end = index + 1 == len(schedule) or schedule[index + 1][0] != slot[0]
+        if is_match_end and len(current_chunk) >= chunk_size:
+            chunks.append(current_chunk)
+            current_chunk = []
+
+    if current_chunk:
+        chunks.append(current_chunk)
+
+    return chunks
+
+
+def generate_chunk(chunk, seed_sequence, variable_plan, scouters, batch_generation=BATCH_GENERATION):
+    """
+    Generates the entries of one schedule chunk from its own child seed stream. Runs inside worker processes.
+
+    Args:
+        chunk (list): (match number, team, robot position) tuples.
+        seed_sequence (np.random.SeedSequence): Child seed sequence reserved for this chunk.
+        variable_plan (dict): Output of build_variable_plan.
+        scouters (list): Scouter names to pick from.
+        batch_generation (bool): Whether to use batch column sampling or per-value sampling.
+
+    Returns:
+        list: The generated entries for the chunk.
+    """
+    if batch_generation:
+        return generate_entries_batch(chunk, variable_plan, scouters, np.random.default_rng(seed_sequence))
+
+    # Per-value generators draw from the global random states, so seed them from the chunk stream
+    random_state = seed_sequence.generate_state(2)
+    random.seed(int(random_state[0]))
+    np.random.seed(int(random_state[1]))
+    return generate_entries(chunk, variable_plan, scouters)
+
+
+def iterate_generated_entries(schedule, variable_plan, scouters, seed_sequence, workers=1):
+    """
+    Generates all entries chunk by chunk, each chunk on its own SeedSequence.spawn child stream,
+    and yields them back in match order. At most two chunks per worker are in flight at a time,
+    so memory stays bounded however large the schedule is.
+
+    Args:
+        schedule (list): (match number, team, robot position) tuples in match order.
+        variable_plan (dict): Output of build_variable_plan.
+        scouters (list): Scouter names to pick from.
+        seed_sequence (np.random.SeedSequence): Parent seed sequence for the run.
+        workers (int): Number of worker processes. 1 runs every chunk in the current process.
+
+    Yields:
+        dict: The generated entries, in match order.
+    """
+    chunks = split_schedule_into_chunks(schedule)
+    chunk_seed_sequences = seed_sequence.spawn(len(chunks))
+    log_info(f"Split schedule into {len(chunks)} chunks across {workers} worker(s)")
+
+    chunk_generator = partial(generate_chunk, variable_plan=variable_plan, scouters=scouters, batch_generation=BATCH_GENERATION)
+
+    if workers <= 1:
+        for chunk, chunk_seed_sequence in zip(chunks, chunk_seed_sequences):
+            yield from chunk_generator(chunk, chunk_seed_sequence)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending_chunks = deque()
+        for chunk, chunk_seed_sequence in zip(chunks, chunk_seed_sequences):
+            pending_chunks.append(executor.submit(chunk_generator, chunk, chunk_seed_sequence))
+            if len(pending_chunks) >= 2 * workers:
+                yield from pending_chunks.popleft().result()
+        while pending_chunks:
+            yield from pending_chunks.popleft().result()
+
+
+def parse_arguments():
+    """Parses the command line options for data generation."""
+    parser = argparse.ArgumentParser(description="Generate a simulated raw match dataset.")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes (default: 1).")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for a reproducible dataset (default: random).")
+    parser.add_argument("--stream", action="store_true", default=STREAM_OUTPUT, help="Stream entries to an NDJSON file as they are generated.")
+    parser.add_argument("--gzip", action="store_true", default=GZIP_OUTPUT, help="Gzip the streamed NDJSON file.")
+    return parser.parse_args()
+
+
 # ===========================
 # MAIN SCRIPT SECTION
 # ===========================
 
-def main():
+def main(workers=1, seed=None, stream_output=STREAM_OUTPUT, gzip_output=GZIP_OUTPUT):
+    """
+    Generates the simulated dataset.
+
+    Args:
+        workers (int): Number of worker processes used for generation.
+        seed (int): Seed for the run. The same seed produces identical output for any worker count.
+        stream_output (bool): Write entries to an NDJSON file as they are generated instead of one JSON list.
+        gzip_output (bool): Gzip the streamed NDJSON file.
+    """
     
     # SCRIPT START
     script_start("[Data Generation] 04 - Data Generation")
@@ -167,30 +496,63 @@ def main():
         "num_matches_per_team": data_generation['data_quantity']['number_of_matches_per_team'],
         "teams_per_match": data_generation['data_quantity']['teams_per_match'],
         "scouters": data_generation['scouter_names'],
-        "data_generation_superapp_variables": data_generation['matchapp_variables'],
-        "data_generation_matchapp_variables": data_generation['superapp_variables']
+        "data_generation_matchapp_variables": data_generation['matchapp_variables'],
+        "data_generation_superapp_variables": data_generation['superapp_variables']
     }
 
 
     # Simulation Setup Vars
     log_subheader("Simulation Setup Variables")
     output_data_list = []  # Initializing output JSON as a list
-    team_matches_dict = {}
+    output_data_path = GENERATED_RAW_DATA_NDJSON_PATH + (".gz" if gzip_output else "") if stream_output else GENERATED_RAW_DATA_PATH
+    variable_plan = build_variable_plan(expected_data_structure, data_generation)
     
     # DATA GENERATION
     log_header("Data Generation")
     
     if data_generation_settings["running_data_generation"]:
         
-        while lowest_match_count < data_generation_settings["num_matches_per_team"]:
-            
-            lowest_match_count_teams = find_lowest_match_count_teams(team_matches_dict)
+        # Spawn the schedule stream first so chunk streams stay fixed for a given seed
+        seed_sequence = np.random.SeedSequence(seed)
+        log_info(f"Using seed {seed_sequence.entropy}")
+        schedule_seed_sequence = seed_sequence.spawn(1)[0]
+        
+        schedule = build_balanced_match_schedule(
+            teams=list(range(1, data_generation_settings["num_teams"] + 1)),
+            num_matches_per_team=data_generation_settings["num_matches_per_team"],
+            robot_positions=expected_data_structure['metadata']['robotPosition']['values'],
+            teams_per_match=data_generation_settings["teams_per_match"],
+            rng=np.random.default_rng(schedule_seed_sequence)
+        )
+        log_info(f"Scheduled {len(schedule)} team slots across {schedule[-1][0] if schedule else 0} matches")
+        
+        if BATCH_GENERATION:
+            log_info(f"Generating entries in batch mode (chunk size {CHUNK_SIZE})")
+        else:
+            log_info("Generating entries one value at a time")
+        output_data_list = iterate_generated_entries(schedule, variable_plan, data_generation_settings["scouters"], seed_sequence, workers)
+        
+        if stream_output:
+            log_info(f"Streaming 'Generated Raw Data' to '{output_data_path}'")
+            entry_count = save_ndjson(output_data_path, output_data_list)
+        else:
+            output_data_list = list(output_data_list)
+            entry_count = len(output_data_list)
+        
+        log_info(f"Generated {entry_count} entries")
     
     # SAVE DATA
-    save_json(GENERATED_RAW_DATA_PATH, output_data_list)
+    log_header("Save Data")
+    
+    if stream_output and data_generation_settings["running_data_generation"]:
+        log_info(f"'Generated Raw Data' already streamed to '{output_data_path}'")
+    else:
+        log_info(f"Saving 'Generated Raw Data' to '{output_data_path}'")
+        save_json(output_data_path, output_data_list)
 
     # SCRIPT END
     script_end("[Data Generation] 04 - Data Generation")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    arguments = parse_arguments()
+    main(workers=arguments.workers, seed=arguments.seed, stream_output=arguments.stream, gzip_output=arguments.gzip)
\ No newline at end of file
@@ -0,0 +1,86 @@
+import copy
+import random
+from utils.script_importing import import_script
+
+DATA_CLEANING_SCRIPT_PATH = "data_analysis_scripts/01_data_cleaning_and_preprocessing.py"
+
+VALID_ENTRY = {
+    "metadata": {"scouterName": "a", "matchNumber": 1, "robotTeam": 5, "robotPosition": "red_1"},
+    "matchapp_variables": {"var1": 3, "var2": 2.5, "var3": True, "var4": {"var1": "value1", "var2": "value2"}},
+    "superapp_variables": {"var_a": "true", "var_b": "value3", "var_c": {"var_a": 1, "var_b": 2}}
+}
+
+# Values messy entries put anywhere below a section, including dicts that would or would not be flattened further
+MESSY_VALUES = [
+    None, 1, 2.5, True, False, "x", "true", "FALSE", "value1", "red_2", [], [1],
+    {}, {"a": 1}, {"statistical_data_type": "quantitative"}, {"var1": "value1"}
+]
+
+# ===========================
+# HELPER FUNCTIONS
+# ===========================
+
+def key_paths(data, path=()):
+    """Yields the path of every key of a nested dict."""
+    for key, value in data.items():
+        yield path + (key,)
+        if isinstance(value, dict):
+            yield from key_paths(value, path + (key,))
+
+
+def messy_entry(rng):
+    """Returns a copy of VALID_ENTRY with one to three keys removed, replaced by a messy value or added."""
+    entry = copy.deepcopy(VALID_ENTRY)
+    for _ in range(rng.randint(1, 3)):
+        path = rng.choice([path for path in key_paths(entry) if len(path) > 1])
+        parent = entry
+        for key in path[:-1]:
+            parent = parent[key]
+        choice = rng.random()
+        if choice < 0.3:
+            del parent[path[-1]]
+        elif choice < 0.9:
+            parent[path[-1]] = copy.deepcopy(rng.choice(MESSY_VALUES))
+        else:
+            parent["extra"] = 1
+    if rng.random() < 0.05:
+        del entry[rng.choice(list(entry))]
+    return entry
+
+
+def row_wise_results(validator, entries):
+    """Runs a row-wise validator over every entry and returns (cleaned entries, warnings, voided entries)."""
+    warnings = []
+    voided_entries = []
+    cleaned_entries = [validator(warnings, voided_entries, entry) for entry in entries]
+    return [cleaned_entry for cleaned_entry in cleaned_entries if cleaned_entry is not None], warnings, voided_entries
+
+# ===========================
+# TESTS
+# ===========================
+
+def test_columnar_validator_matches_row_wise_validators_on_messy_entries():
+    data_cleaning = import_script(DATA_CLEANING_SCRIPT_PATH)
+    rng = random.Random(0)
+    entries = [messy_entry(rng) for _ in range(3_000)] + [copy.deepcopy(VALID_ENTRY)]
+
+    recursive_results = row_wise_results(data_cleaning.validate_and_clean_entry, entries)
+    compiled_results = row_wise_results(data_cleaning.COMPILED_ENTRY_VALIDATOR, entries)
+    warnings, voided_entries = [], []
+    cleaned_entries, row_warning_counts = data_cleaning.COMPILED_COLUMNAR_VALIDATOR(warnings, voided_entries, entries)
+
+    assert compiled_results == recursive_results
+    assert (cleaned_entries, warnings, voided_entries) == recursive_results
+    assert int(row_warning_counts.sum()) == len(warnings)
+
+
+def test_columnar_validator_reports_metadata_dicts_as_incorrect_type():
+    data_cleaning = import_script(DATA_CLEANING_SCRIPT_PATH)
+    entry = copy.deepcopy(VALID_ENTRY)
+    entry["metadata"]["matchNumber"] = {"a": 1}
+
+    warnings, voided_entries = [], []
+    data_cleaning.COMPILED_COLUMNAR_VALIDATOR(warnings, voided_entries, [entry])
+
+    assert warnings == [f"[WARNING] Incorrect type for 'matchNumber'. Expected {(int, float)}, got dict."]
+    assert row_wise_results(data_cleaning.validate_and_clean_entry, [entry])[1] == warnings
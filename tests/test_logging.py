@@ -0,0 +1,33 @@
+import io
+import subprocess
+import sys
+from utils.logging import *
+
+# ===========================
+# TESTS
+# ===========================
+
+def test_importing_the_logging_module_starts_no_thread():
+    completed = subprocess.run(
+        [sys.executable, "-c", "import threading, utils.logging; print(threading.active_count())"],
+        capture_output=True, text=True, check=True
+    )
+    assert completed.stdout.strip() == "1"
+
+
+def test_queued_records_keep_the_arguments_they_were_logged_with(tmp_path):
+    console_stream = io.StringIO()
+    configure_logging(log_file_path=str(tmp_path / "logfile.log"), console_stream=console_stream, aggregate_warnings=False)
+    start_logging()
+    try:
+        values = [1, 2]
+        log_info("Values: %s", values)
+        values.append(3)
+        flush_logs()
+    finally:
+        stop_logging()
+        LOG_STATE["console_stream"] = None
+        configure_logging(log_file_path=LOG_FILE_PATH, aggregate_warnings=LOG_AGGREGATE_WARNINGS)
+
+    assert "Values: [1, 2] - " in console_stream.getvalue()
+    assert "Values: [1, 2]\n" in (tmp_path / "logfile.log").read_text()
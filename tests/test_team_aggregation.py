@@ -0,0 +1,97 @@
+import copy
+import random
+from utils.script_importing import import_script
+from utils.team_columnar_store import build_team_columnar_store
+
+STATISTICS_AGGREGATION_SCRIPT_PATH = "data_analysis_scripts/03_data_analysis_and_statistics_aggregation.py"
+
+# Matches per team, including teams without matches and teams past the 8- and 128-value blocks of NumPy's pairwise sum
+MATCH_COUNTS = [0, 1, 2, 3, 4, 5, 8, 9, 12, 17, 40, 130, 300]
+
+# ===========================
+# HELPER FUNCTIONS
+# ===========================
+
+def random_value(rng, kind):
+    """Returns an int, float or mixed value, None for a missing value, or MISSING for a key the match does not have."""
+    draw = rng.random()
+    if draw < 0.05:
+        return None
+    if draw < 0.08:
+        return "MISSING"
+    if kind == "int":
+        return rng.randint(0, 30)
+    if kind == "float":
+        return rng.gauss(20, 7)
+    return rng.choice([rng.randint(0, 9), rng.random() * 1e3, rng.expovariate(0.1)])
+
+
+def random_team_data(rng, team_count):
+    """Returns team-based match data with int, float and mixed quantitative variables and gaps."""
+    team_data = {}
+    for team in range(team_count):
+        matches = []
+        for _ in range(rng.choice(MATCH_COUNTS)):
+            variables = {}
+            for key, kind in (("var1", "int"), ("var2", "float"), ("var_c.var_a", "mixed")):
+                value = random_value(rng, kind)
+                if value != "MISSING":
+                    variables[key] = value
+            matches.append({"metadata": {"robotTeam": team}, "matchapp_variables": variables, "superapp_variables": {"var_b": "value1"}})
+        team_data[str(team)] = {"matches": matches}
+    return team_data
+
+# ===========================
+# TESTS
+# ===========================
+
+def test_vectorized_engine_is_bit_identical_to_the_per_team_loop():
+    statistics_aggregation = import_script(STATISTICS_AGGREGATION_SCRIPT_PATH)
+    team_data = random_team_data(random.Random(0), 200)
+    team_data["200"] = {"matches": []}     # The last team's slice must not cut into the team before it
+
+    expected = statistics_aggregation.convert_to_serializable(statistics_aggregation.calculate_team_performance_data(team_data))
+    actual = statistics_aggregation.convert_to_serializable(statistics_aggregation.calculate_team_performance_data_vectorized(build_team_columnar_store(team_data)))
+
+    assert list(actual) == list(expected)
+    for team, expected_performance in expected.items():
+        assert list(actual[team]) == list(expected_performance), team
+        for key, expected_value in expected_performance.items():
+            assert repr(actual[team][key]) == repr(expected_value), (team, key)
+
+
+def test_incremental_aggregation_recomputes_only_changed_teams():
+    statistics_aggregation = import_script(STATISTICS_AGGREGATION_SCRIPT_PATH)
+    team_data = random_team_data(random.Random(1), 60)
+    _, aggregation_state, recomputed_teams, _ = statistics_aggregation.calculate_team_performance_data_incremental(build_team_columnar_store(team_data), None)
+    assert recomputed_teams == list(team_data)
+
+    changed_team_data = copy.deepcopy(team_data)
+    changed_team = next(team for team, data in changed_team_data.items() if data["matches"])
+    changed_team_data[changed_team]["matches"][0]["matchapp_variables"]["var1"] = 1000
+    changed_team_data["new"] = copy.deepcopy(team_data[changed_team])
+    team_store = build_team_columnar_store(changed_team_data)
+
+    team_performance_data, _, recomputed_teams, _ = statistics_aggregation.calculate_team_performance_data_incremental(team_store, aggregation_state)
+    assert recomputed_teams == [changed_team, "new"]
+    full_team_performance_data = statistics_aggregation.calculate_team_performance_data_vectorized(team_store, statistics_aggregation.INCLUDE_VALUE_LISTS)
+    assert repr(team_performance_data) == repr(statistics_aggregation.convert_to_serializable(full_team_performance_data))
+
+
+def test_online_statistics_rebuild_teams_whose_counted_matches_changed():
+    statistics_aggregation = import_script(STATISTICS_AGGREGATION_SCRIPT_PATH)
+    team_data = random_team_data(random.Random(2), 40)
+    team_statistics_state, _, _ = statistics_aggregation.update_team_statistics(None, build_team_columnar_store(team_data))
+
+    appended_team, edited_team = [team for team, data in team_data.items() if len(data["matches"]) > 1][:2]
+    changed_team_data = copy.deepcopy(team_data)
+    changed_team_data[appended_team]["matches"].append(copy.deepcopy(team_data[edited_team]["matches"][0]))
+    changed_team_data[edited_team]["matches"][0]["matchapp_variables"]["var2"] = -1.0
+    team_store = build_team_columnar_store(changed_team_data)
+
+    team_statistics_state, updated_teams, rebuilt_teams = statistics_aggregation.update_team_statistics(team_statistics_state, team_store)
+    assert sorted(updated_teams) == sorted([appended_team, edited_team])
+    assert rebuilt_teams == [edited_team]
+
+    rebuilt_state, _, _ = statistics_aggregation.update_team_statistics(None, team_store)
+    assert repr(statistics_aggregation.summarize_team_statistics(team_statistics_state)) == repr(statistics_aggregation.summarize_team_statistics(rebuilt_state))
@@ -0,0 +1,92 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from utils.team_statistics import DISTINCT_VALUE_LIMIT, TDIGEST_BUFFER_SIZE, RunningStatistics
+
+# Maximum error of the t-digest quartiles, as a fraction of each team's value range
+QUANTILE_ERROR_BOUND = 0.05
+EXACT_TOLERANCE = 1e-9      # Relative tolerance of the Welford mean and std dev against pandas
+TEAMS_PER_CASE = 20
+UPDATE_BATCHES = 4
+
+DISTRIBUTIONS = {
+    "normal": lambda rng, size: rng.normal(20, 5, size),
+    "skewed": lambda rng, size: rng.exponential(4, size),
+    "integer counts": lambda rng, size: rng.poisson(6, size).astype(float),
+    "bimodal": lambda rng, size: np.where(rng.random(size) < 0.3, rng.normal(5, 1, size), rng.normal(25, 3, size))
+}
+MATCH_COUNTS = [3, 12, 80, 1_000, 5_000]
+
+# ===========================
+# HELPER FUNCTIONS
+# ===========================
+
+def accumulate_in_batches(values, batches=UPDATE_BATCHES):
+    """Feeds values to a RunningStatistics in batches, with a JSON save/load round trip between batches like live runs."""
+    state = RunningStatistics().to_dict()
+    for batch in np.array_split(values, batches):
+        statistics = RunningStatistics.from_dict(json.loads(json.dumps(state)))
+        statistics.update_many(batch.tolist())
+        state = statistics.to_dict()
+    return RunningStatistics.from_dict(state)
+
+
+def sketches_quartiles(values):
+    """Returns True if the accumulator of these values estimates its quartiles with the t-digest."""
+    return len(values) > TDIGEST_BUFFER_SIZE and len(set(values.tolist())) > DISTINCT_VALUE_LIMIT
+
+# ===========================
+# TESTS
+# ===========================
+
+@pytest.mark.parametrize("match_count", MATCH_COUNTS)
+@pytest.mark.parametrize("distribution_name", list(DISTRIBUTIONS))
+def test_running_statistics_error_bounds_against_pandas(distribution_name, match_count):
+    rng = np.random.default_rng([list(DISTRIBUTIONS).index(distribution_name), match_count])
+
+    for _ in range(TEAMS_PER_CASE):
+        values = DISTRIBUTIONS[distribution_name](rng, match_count)
+        series = pd.Series(values)
+        summary = accumulate_in_batches(values).summary()
+        value_range = values.max() - values.min()
+
+        assert summary["mean"] == pytest.approx(series.mean(), rel=EXACT_TOLERANCE, abs=EXACT_TOLERANCE)
+        assert summary["std_dev"] == pytest.approx(series.std(), rel=EXACT_TOLERANCE, abs=EXACT_TOLERANCE)
+        assert (summary["min"], summary["max"], summary["range"]) == (series.min(), series.max(), value_range)
+
+        expected_quartiles = {"q1": series.quantile(0.25), "median": series.median(), "q3": series.quantile(0.75)}
+        expected_quartiles["iqr"] = expected_quartiles["q3"] - expected_quartiles["q1"]
+        for statistic, expected in expected_quartiles.items():
+            if sketches_quartiles(values):
+                assert abs(summary[statistic] - expected) <= QUANTILE_ERROR_BOUND * value_range, statistic
+            else:
+                assert summary[statistic] == pytest.approx(expected, rel=EXACT_TOLERANCE, abs=EXACT_TOLERANCE), statistic
+
+
+def test_batched_updates_match_a_single_pass():
+    values = DISTRIBUTIONS["bimodal"](np.random.default_rng(0), 2_000)
+    single_pass = RunningStatistics()
+    single_pass.update_many(values.tolist())
+
+    assert accumulate_in_batches(values).summary() == single_pass.summary()
+
+
+def test_missing_values_are_skipped_like_pandas():
+    statistics = RunningStatistics()
+    statistics.update_many([1, None, 4.0, float("nan"), 10])
+    series = pd.Series([1, None, 4.0, float("nan"), 10], dtype=float)
+
+    assert statistics.count == 3
+    assert statistics.summary()["mean"] == pytest.approx(series.mean())
+    assert statistics.summary()["std_dev"] == pytest.approx(series.std())
+
+
+def test_empty_and_single_value_summaries():
+    assert set(RunningStatistics().summary().values()) == {None}
+
+    statistics = RunningStatistics()
+    statistics.update(7)
+    summary = statistics.summary()
+    assert summary["std_dev"] is None
+    assert (summary["mean"], summary["median"], summary["iqr"], summary["range"]) == (7.0, 7.0, 0.0, 0.0)
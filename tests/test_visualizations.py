@@ -0,0 +1,41 @@
+import multiprocessing
+import os
+from utils.script_importing import import_script
+
+VISUALIZATIONS_SCRIPT_PATH = "data_analysis_scripts/04_visualizations.py"
+TEAM_COUNT = 12
+
+# ===========================
+# HELPER FUNCTIONS
+# ===========================
+
+def team_performance_data():
+    """Returns summary statistics of every metric and boxplot variable the charts are configured with."""
+    return {
+        str(team): {
+            "number_of_matches": 3,
+            "var1_mean": team + 0.5, "var2_mean": team * 2.0, "var2_max": team * 3.0, "var3_percent_True": team / TEAM_COUNT,
+            **{f"{variable}_{statistic}": float(team + offset) for variable in ("var1", "var2") for statistic, offset in (("min", 0), ("q1", 1), ("median", 2), ("q3", 3), ("max", 4))}
+        }
+        for team in range(TEAM_COUNT)
+    }
+
+# ===========================
+# TESTS
+# ===========================
+
+def test_rendering_on_spawned_workers_saves_the_same_charts(tmp_path):
+    visualizations = import_script(VISUALIZATIONS_SCRIPT_PATH)
+    serial_paths = visualizations.render_visualizations(team_performance_data(), visualizations_dir=str(tmp_path / "serial"), workers=1)
+
+    start_method = multiprocessing.get_start_method()
+    multiprocessing.set_start_method("spawn", force=True)
+    try:
+        spawned_paths = visualizations.render_visualizations(team_performance_data(), visualizations_dir=str(tmp_path / "spawned"), workers=2)
+    finally:
+        multiprocessing.set_start_method(start_method, force=True)
+
+    assert [os.path.basename(path) for path in spawned_paths] == [os.path.basename(path) for path in serial_paths]
+    for serial_path, spawned_path in zip(serial_paths, spawned_paths):
+        with open(serial_path, "rb") as serial_file, open(spawned_path, "rb") as spawned_file:
+            assert spawned_file.read() == serial_file.read(), os.path.basename(spawned_path)
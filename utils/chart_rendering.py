@@ -0,0 +1,159 @@
+import matplotlib.pyplot as plt
+from matplotlib import cbook
+from pandas.plotting import parallel_coordinates
+
+# ===========================================
+# CHART RENDERING
+# ===========================================
+#
+# The chart renderers of data_analysis_scripts/04_visualizations.py and the process pool's worker functions. They live
+# in an importable module because worker processes started with "spawn" (the default on Windows and macOS) import
+# the functions they run by module name, and scripts loaded with import_script have no importable name.
+#
+# Job:  (chart kind, title, frame key, metric columns or None, save path)
+
+# Order of the summary statistic columns of a summary boxplot job (<variable>_median, _q1, _q3, _min, _max)
+BOXPLOT_SUMMARY_STATISTICS = ["median", "q1", "q3", "min", "max"]
+
+# Frames and save settings of the charts being rendered, in the main process or in a worker (see init_render_worker)
+RENDER_STATE = {"frames": {}, "dpi": "figure", "compress_level": 6}
+
+# ===========================================
+# HELPER FUNCTIONS
+# ===========================================
+
+def save_chart(save_path):
+    """Saves and closes the current figure with the configured DPI and PNG compression."""
+    plt.savefig(save_path, bbox_inches="tight", dpi=RENDER_STATE["dpi"], pil_kwargs={"compress_level": RENDER_STATE["compress_level"]})
+    plt.close()
+
+# ===========================================
+# BAR CHART VISUALIZATION FUNCTIONS
+# ===========================================
+
+def generate_bar_chart(df, title, save_path):
+    """Generates a simple bar chart for a single metric comparison."""
+    metric = df.columns[1]  # Assuming "team" is the first column
+    df.set_index("team")[metric].plot(kind="bar", figsize=(10, 5), color="skyblue", edgecolor="black")
+
+    plt.title(title)
+    plt.xlabel("Teams")
+    plt.ylabel(metric)
+    plt.xticks(rotation=45, ha="right")
+    plt.grid(axis="y", linestyle="--", alpha=0.7)
+
+    save_chart(save_path)
+
+def generate_grouped_bar_chart(df, title, save_path):
+    """Generates a grouped bar chart comparing teams for each variable metric."""
+    df.set_index("team").plot(kind="bar", figsize=(12, 6), colormap="viridis")
+
+    plt.title(title)
+    plt.xlabel("Teams")
+    plt.ylabel("Values")
+    plt.xticks(rotation=45, ha="right")
+    plt.legend(title="Metrics")
+    plt.grid(axis="y", linestyle="--", alpha=0.7)
+
+    save_chart(save_path)
+
+def generate_stacked_bar_chart(df, title, save_path):
+    """Generates a stacked bar chart comparing teams across multiple metrics."""
+    df.set_index("team").plot(kind="bar", stacked=True, figsize=(12, 6), colormap="plasma")
+
+    plt.title(title)
+    plt.xlabel("Teams")
+    plt.ylabel("Values")
+    plt.xticks(rotation=45, ha="right")
+    plt.legend(title="Metrics")
+    plt.grid(axis="y", linestyle="--", alpha=0.7)
+
+    save_chart(save_path)
+
+def generate_parallel_coordinates_plot(df, title, save_path):
+    """Generates a parallel coordinates plot to compare multiple metrics per team."""
+    df_normalized = df.copy()
+    df_normalized[df.columns[1:]] = df_normalized[df.columns[1:]].apply(lambda x: (x - x.min()) / (x.max() - x.min()))
+
+    plt.figure(figsize=(12, 6))
+    parallel_coordinates(df_normalized, class_column="team", colormap=plt.get_cmap("tab10"), linewidth=2)
+
+    plt.title(title)
+    plt.xticks(rotation=45, ha="right")
+    plt.xlabel("Metrics")
+    plt.ylabel("Normalized Values (0-1)")
+    plt.legend(title="Teams", bbox_to_anchor=(1.05, 1), loc="upper left")
+
+    save_chart(save_path)
+
+# ===========================================
+# BOXPLOT VISUALIZATION FUNCTION
+# ===========================================
+
+def boxplot_stats(df, variable):
+    """
+    Returns the Axes.bxp statistics of every team, in team order.
+
+    :param df: Either the team summary columns (team, <variable>_median, _q1, _q3, _min, _max), or a long frame of
+               every match's raw values (columns: team, variable), see extract_match_values.
+    :param variable: Variable name for the boxplot.
+    :return: List of bxp statistics dicts, one per team with values.
+    """
+    if variable in df.columns:
+        return [
+            cbook.boxplot_stats(values.to_numpy(), labels=[str(team)])[0]
+            for team, values in df.groupby("team", sort=True)[variable]
+        ]
+
+    summary = df.set_index("team").dropna().sort_index()
+    columns = [summary[f"{variable}_{statistic}"].tolist() for statistic in BOXPLOT_SUMMARY_STATISTICS]
+    return [
+        {"label": str(team), "med": median, "q1": q1, "q3": q3, "whislo": minimum, "whishi": maximum, "fliers": []}
+        for team, median, q1, q3, minimum, maximum in zip(summary.index, *columns)
+    ]
+
+def generate_boxplot(df, variable, save_path):
+    """
+    Generates a boxplot of a single variable across teams with Axes.bxp.
+
+    :param df: Team summary columns or raw match values, see boxplot_stats.
+    :param variable: Variable name for the boxplot.
+    :param save_path: Path to save the plot.
+    """
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.bxp(boxplot_stats(df, variable))
+
+    whiskers = "whiskers at 1.5 IQR, outliers as points" if variable in df.columns else "whiskers at min and max"
+    ax.set_title(f"Boxplot for {variable} across Teams ({whiskers})")
+    ax.set_xlabel("Teams")
+    ax.set_ylabel(variable.replace("_", " ").title())
+    plt.xticks(rotation=45, ha="right")
+
+    save_chart(save_path)
+
+# ===========================================
+# RENDERING
+# ===========================================
+
+# Chart kind -> (renderer, name in the log)
+CHART_RENDERERS = {
+    "bar_chart": (generate_bar_chart, "Bar Chart"),
+    "grouped_bar_chart": (generate_grouped_bar_chart, "Grouped Bar Chart"),
+    "stacked_bar_chart": (generate_stacked_bar_chart, "Stacked Bar Chart"),
+    "parallel_coordinates_plot": (generate_parallel_coordinates_plot, "Parallel Coordinates Plot"),
+    "boxplot": (generate_boxplot, "Boxplot")
+}
+
+def init_render_worker(frames, dpi, compress_level):
+    """Sets up a rendering process: the Agg backend, every chart frame (sent once per worker) and the save settings."""
+    plt.switch_backend("Agg")
+    RENDER_STATE.update(frames=frames, dpi=dpi, compress_level=compress_level)
+
+def render_chart_job(job):
+    """Renders one chart job from the frames in RENDER_STATE and returns its save path. Bar charts select their metric columns."""
+    kind, title, frame_key, columns, save_path = job
+    df = RENDER_STATE["frames"][frame_key]
+    if columns is not None:
+        df = df[columns].reset_index()
+    CHART_RENDERERS[kind][0](df, title, save_path)
+    return save_path
@@ -0,0 +1,225 @@
+import numpy as np
+import pandas as pd
+from utils.schema_validation import (
+    BINARY_STRING_VALUES,
+    INVALID_VALUE,
+    MISSING_VALUE,
+    compile_structure_validator,
+    compile_value_check,
+    is_unflattened_dict,
+    section_fields,
+    section_void_reason
+)
+
+# ===========================================
+# COLUMNAR VALIDATION CONFIGURATION
+# ===========================================
+
+# Exact types accepted per statistical data type. For JSON-decoded values these match the
+# isinstance checks of the row-wise validators (bool is an int subclass, so it counts as quantitative).
+COLUMN_PYTHON_TYPES = {
+    "quantitative": [int, float, bool],
+    "categorical": [str],
+    "binary": [bool]
+}
+
+# ===========================================
+# HELPER FUNCTIONS
+# ===========================================
+
+def column_python_types(data_type):
+    """Returns the exact Python types accepted for a statistical data type. Defaults to str if unknown."""
+    return COLUMN_PYTHON_TYPES.get(data_type, [str])
+
+
+def field_column_values(column_cache, key_parts):
+    """
+    Returns the values of one flattened key across every entry's section. Missing keys become MISSING_VALUE.
+    Columns are cached, so fields sharing a parent (e.g. 'var4.var1' and 'var4.var2') read the parent once.
+
+    :param column_cache:  Dict of key parts -> column, holding the section dict of every entry under ().
+    :param key_parts:     Flattened key split on '.'.
+    :return:              List of values, one per entry.
+    """
+    if key_parts in column_cache:
+        return column_cache[key_parts]
+
+    parent_column = field_column_values(column_cache, key_parts[:-1])
+    key = key_parts[-1]
+
+    if len(key_parts) > 1:
+        column = [
+            value.get(key, MISSING_VALUE) if value.__class__ is dict and "statistical_data_type" not in value else MISSING_VALUE
+            for value in parent_column
+        ]
+    else:
+        column = [data.get(key, MISSING_VALUE) for data in parent_column]
+
+    column_cache[key_parts] = column
+    return column
+
+
+def extract_field_column(column_cache, key_parts, flattened=True):
+    """
+    Reads one field out of every entry's section into (values, types) object arrays.
+
+    :param column_cache:  Dict of key parts -> column, holding the section dict of every entry under ().
+    :param key_parts:     Flattened key split on '.'.
+    :param flattened:     The section is validated as flattened variables. False for metadata, whose dict values are
+                          values of their key (and get the type warning) rather than missing keys.
+    :return:              (values, types) object arrays.
+    """
+    column = field_column_values(column_cache, key_parts)
+    values = pd.Series(column, dtype=object).to_numpy(copy=True)
+    types = np.fromiter(map(type, column), dtype=object, count=len(column))
+
+    if not flattened:
+        return values, types
+
+    # A dict that would be flattened further is not a value for this key
+    for row in np.flatnonzero(pd.Series(types).isin([dict]).to_numpy()).tolist():
+        if is_unflattened_dict(values[row]):
+            values[row] = MISSING_VALUE
+            types[row] = type(MISSING_VALUE)
+
+    return values, types
+
+
+def fast_valid_mask(values, types, expected_info):
+    """
+    Validates a whole column with vectorized masks, converting binary 'true'/'false' strings in place.
+    Values outside the mask are not necessarily invalid; they are re-checked one by one.
+
+    :return:  Boolean array of rows whose value is valid as is (or after binary string normalization).
+    """
+    data_type = expected_info.get("statistical_data_type")
+    type_series = pd.Series(types)
+
+    if data_type == "binary":
+        valid = type_series.isin([bool]).to_numpy(copy=True)
+        string_rows = np.flatnonzero(type_series.isin([str]).to_numpy())
+        if len(string_rows):
+            binary_values = pd.Series(values[string_rows], dtype=object).str.lower().map(BINARY_STRING_VALUES)
+            converted = binary_values.notna().to_numpy()
+            converted_rows = string_rows[converted]
+            values[converted_rows] = binary_values[converted].to_numpy(dtype=object)
+            valid[converted_rows] = True
+        return valid
+
+    valid = type_series.isin(column_python_types(data_type)).to_numpy(copy=True)
+    if data_type == "categorical" and "values" in expected_info:
+        string_rows = np.flatnonzero(valid)
+        valid[string_rows] = pd.Series(values[string_rows], dtype=object).isin(expected_info["values"]).to_numpy()
+    return valid
+
+# ===========================================
+# COMPILER
+# ===========================================
+
+def compile_columnar_validator(expected_data_structure, void_missing_entries=True):
+    """
+    Compiles expected_data_structure.json into a validator that checks a whole list of entries column by column.
+    Every field is pulled out of all entries once, validated with NumPy/pandas masks, and the masks are combined
+    into the same cleaned entries, voided entries and warnings the row-wise validators produce, in the same order.
+
+    :param expected_data_structure:  The expected data structure config.
+    :param void_missing_entries:     Void the entry if any key in any section is missing or invalid.
+    :return:                         validate_entries(warnings, voided_entries, entries) returning
+                                     (cleaned entries, number of warnings per entry).
+    """
+    section_plan = []
+    field_order = 0
+
+    for section, expected_structure in expected_data_structure.items():
+        field_plan = []
+        for key, key_parts, expected_info in section_fields(section, expected_structure):
+            if isinstance(expected_info, dict) and "statistical_data_type" not in expected_info:
+                check = compile_structure_validator(expected_info, void_missing_entries, key)
+                is_nested = True
+            else:
+                check = compile_value_check(key, expected_info)
+                is_nested = False
+            field_plan.append((field_order, key, key_parts, expected_info, check, is_nested, f"[WARNING] Missing key '{key}'."))
+            field_order += 1
+        section_plan.append((section, tuple(field_plan), section_void_reason(section)))
+
+    section_plan = tuple(section_plan)
+
+    def validate_entries(warnings, voided_entries, entries):
+        entry_count = len(entries)
+        alive = np.ones(entry_count, dtype=bool)
+        void_reasons = [None] * entry_count
+        row_warnings = []       # (row, field order, message), sorted into row-wise order at the end
+        section_columns = []
+
+        for section, field_plan, void_reason in section_plan:
+            column_cache = {(): [entry.get(section, {}) for entry in entries]}
+            present = np.fromiter((section in entry for entry in entries), dtype=bool, count=entry_count)
+            reached = alive & present
+            section_invalid = np.zeros(entry_count, dtype=bool)
+            columns = []
+
+            for order, key, key_parts, expected_info, check, is_nested, missing_key_message in field_plan:
+                values, types = extract_field_column(column_cache, key_parts, flattened=section != "metadata")
+                field_present = ~pd.Series(types).isin([type(MISSING_VALUE)]).to_numpy()
+
+                for row in np.flatnonzero(reached & ~field_present).tolist():
+                    row_warnings.append((row, order, missing_key_message))
+
+                if is_nested:
+                    valid = field_present.copy()
+                    for row in np.flatnonzero(reached & field_present).tolist():
+                        nested_warnings = []
+                        values[row] = check(values[row], nested_warnings)
+                        row_warnings.extend((row, order, message) for message in nested_warnings)
+                else:
+                    valid = field_present & fast_valid_mask(values, types, expected_info)
+
+                    # Rows the masks rejected get the row-wise check, which converts them or adds the warning
+                    for row in np.flatnonzero(reached & field_present & ~valid).tolist():
+                        value_warnings = []
+                        value = check(values[row], value_warnings)
+                        row_warnings.extend((row, order, message) for message in value_warnings)
+                        if value is not INVALID_VALUE:
+                            values[row] = value
+                            valid[row] = True
+
+                section_invalid |= reached & ~valid
+                columns.append((key, values, valid))
+
+            if void_missing_entries:
+                for row in np.flatnonzero(section_invalid).tolist():
+                    void_reasons[row] = void_reason
+                alive &= ~section_invalid
+            section_columns.append((section, present, columns))
+
+        # Assemble the cleaned entries from the columns of every surviving entry
+        alive_rows = np.flatnonzero(alive)
+        cleaned_entries = [{} for _ in range(len(alive_rows))]
+
+        for section, present, columns in section_columns:
+            positions = np.flatnonzero(present[alive_rows])
+            rows = alive_rows[positions]
+            keys = [key for key, _, _ in columns]
+            value_rows = zip(*[values[rows].tolist() for _, values, _ in columns]) if columns else ([] for _ in rows)
+
+            if void_missing_entries:
+                section_dicts = [dict(zip(keys, value_row)) for value_row in value_rows]
+            else:
+                valid_rows = zip(*[valid[rows].tolist() for _, _, valid in columns]) if columns else ([] for _ in rows)
+                section_dicts = [
+                    {key: value for key, value, is_valid in zip(keys, value_row, valid_row) if is_valid}
+                    for value_row, valid_row in zip(value_rows, valid_rows)
+                ]
+
+            for position, section_dict in zip(positions.tolist(), section_dicts):
+                cleaned_entries[position][section] = section_dict
+
+        row_warnings.sort(key=lambda row_warning: (row_warning[0], row_warning[1]))
+        warnings.extend(message for _, _, message in row_warnings)
+        voided_entries.extend({"entry": entries[row], "reason": void_reasons[row]} for row in range(entry_count) if void_reasons[row] is not None)
+
+        row_warning_counts = np.bincount([row for row, _, _ in row_warnings], minlength=entry_count)
+        return cleaned_entries, row_warning_counts
+
+    return validate_entries
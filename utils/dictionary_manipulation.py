@@ -1,27 +1,353 @@
+import os
+import re
+import gzip
 import json
+import lzma
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# JSON backend used by retrieve_json, save_json and the NDJSON helpers: "orjson" (if installed) or "json" (stdlib).
+# Both write the same layout and the files load back the same; orjson only differs in writing non-ASCII characters as UTF-8
+# instead of \u escapes, exponents without padding (1e16, not 1e+16) and NaN/Infinity as null.
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+JSON_BACKENDS = ["orjson", "json"] if orjson is not None else ["json"]
+
+# Files ending in these extensions are transparently compressed
+COMPRESSION_OPENERS = {".gz": gzip.open, ".xz": lzma.open}
+
+# Threads used by load_many
+LOAD_MANY_MAX_WORKERS = 8
+
+# Characters read per step by iterate_json_entries. The buffer grows past this only while a single entry is larger.
+JSON_STREAM_CHUNK_SIZE = 1 << 20
+
+JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+JSON_MAX_INDENT = 1024   # Longest indentation kept in front of a pending entry to resynchronize after a malformed one
+JSON_NEXT_INLINE_ENTRY = re.compile(r"\}[ \t\n\r]*,?[ \t\n\r]*(?=\{)")   # Next '{' after a '}' for entries that do not start a line
 
 # JSON Handling Functions
 def dump_json_with_path(json_path, indent=4):
     """Prints JSON content from a file in a pretty format. More for quick testing and not as much for polished script logging."""
-    with open(json_path) as json_file:
-        print(json.dumps(json.load(json_file), indent=indent))
+    print(json.dumps(retrieve_json(json_path), indent=indent))
 
 def dump_json(json_input, indent=4):
     """Prints a JSON object in a readable format. More for quick testing and not as much for polished script logging."""
     print(json.dumps(json_input, indent=indent)) 
 
-def retrieve_json(json_path, dump_json=False, indent=4):
-    """Loads JSON from a file. Prints it if dump_json=True."""
-    with open(json_path) as json_file:
-        return_json = json.load(json_file)
-        if dump_json:
-            print(json.dumps(return_json, indent=indent))
-        return return_json
-
-def save_json(json_path, data, indent=4):
-    """Saves a JSON object to a file."""
-    with open(json_path, "w") as json_file:
-        json.dump(data, json_file, indent=indent)
+def compression_extension(json_path):
+    """Returns the compression extension of a path ('.gz' or '.xz'), or None for an uncompressed file."""
+    extension = os.path.splitext(json_path)[1]
+    return extension if extension in COMPRESSION_OPENERS else None
+
+def open_json_file(json_path, mode="r", newline=None):
+    """Opens a JSON/NDJSON file, transparently using gzip for '.gz' and lzma for '.xz' paths. Text mode unless mode contains 'b'."""
+    opener = COMPRESSION_OPENERS.get(compression_extension(json_path))
+    if "b" in mode:
+        return opener(json_path, mode) if opener else open(json_path, mode)
+    if opener:
+        return opener(json_path, mode + "t", encoding="utf-8", newline=newline)
+    return open(json_path, mode, newline=newline)
+
+def is_ndjson_path(json_path):
+    """Returns True if a path points to an NDJSON file ('.ndjson' or '.jsonl', optionally compressed)."""
+    if compression_extension(json_path):
+        json_path = os.path.splitext(json_path)[0]
+    return json_path.endswith((".ndjson", ".jsonl"))
+
+@contextmanager
+def atomic_write_path(json_path):
+    """
+    Yields a temporary path next to json_path and renames it over json_path once the block completes, so readers
+    never see a partially written file. The temporary file is removed if the block fails.
+    The temporary name keeps the file's extensions, so compression is chosen the same way.
+    """
+    directory, file_name = os.path.split(json_path)
+    temporary_path = os.path.join(directory, f".tmp-{os.getpid()}-{file_name}")
+    try:
+        yield temporary_path
+        os.replace(temporary_path, json_path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+def double_indentation(dumped):
+    """
+    Turns orjson's 2-space indentation into 4 spaces. JSON strings cannot contain raw newlines or NUL bytes, so every
+    newline is followed by indentation only; the deepest levels are replaced first (through NUL placeholders, so
+    shallower levels no longer match them), one bytes.replace per level.
+    """
+    depth = 0
+    while b"\n" + b"  " * (depth + 1) in dumped:
+        depth += 1
+    for level in range(depth, 0, -1):
+        dumped = dumped.replace(b"\n" + b"  " * level, b"\n" + b"\0" * (4 * level))
+    return dumped.replace(b"\0", b" ")
+
+def json_dumps(data, indent=4, backend=None):
+    """
+    Serializes data to UTF-8 JSON bytes.
+
+    :param data:     JSON-serializable object.
+    :param indent:   Spaces per indentation level, or None for compact output (no whitespace) for machine-only files.
+    :param backend:  "orjson" or "json", or None for JSON_BACKEND. orjson falls back to json for objects it cannot serialize.
+    """
+    if (backend or JSON_BACKEND) == "orjson" and indent in (None, 2, 4):
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        try:
+            if indent is None:
+                return orjson.dumps(data, option=options)
+            dumped = orjson.dumps(data, option=options | orjson.OPT_INDENT_2)
+        except TypeError:
+            pass
+        else:
+            return dumped if indent == 2 else double_indentation(dumped)
+
+    if indent is None:
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
+    return json.dumps(data, indent=indent).encode("utf-8")
+
+def json_loads(text, backend=None):
+    """
+    Deserializes JSON text or bytes. orjson falls back to json for input only the stdlib accepts (e.g. NaN).
+
+    :param text:     JSON str or bytes.
+    :param backend:  "orjson" or "json", or None for JSON_BACKEND.
+    """
+    if (backend or JSON_BACKEND) == "orjson":
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text)
+
+def retrieve_json(json_path, dump_json=False, indent=4, backend=None):
+    """Loads JSON from a file. Prints it if dump_json=True. NDJSON files are loaded as a list of entries."""
+    if is_ndjson_path(json_path):
+        return_json = list(iterate_ndjson(json_path, backend))
+    else:
+        with open_json_file(json_path, "rb") as json_file:
+            return_json = json_loads(json_file.read(), backend)
+    if dump_json:
+        print(json.dumps(return_json, indent=indent))
+    return return_json
+
+def load_many(json_paths, max_workers=LOAD_MANY_MAX_WORKERS, backend=None):
+    """
+    Loads several JSON files concurrently on a thread pool. File reads and gzip decompression release the GIL, so this
+    pays off for compressed files or slow disks; parsing itself does not run in parallel.
+
+    :param json_paths:   Paths to load.
+    :param max_workers:  Maximum number of threads.
+    :param backend:      JSON backend, see json_loads.
+    :return:             List of the loaded objects, in the order of json_paths.
+    """
+    json_paths = list(json_paths)
+    if len(json_paths) <= 1:
+        return [retrieve_json(json_path, backend=backend) for json_path in json_paths]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(json_paths))) as executor:
+        return list(executor.map(lambda json_path: retrieve_json(json_path, backend=backend), json_paths))
+
+def save_json(json_path, data, indent=4, backend=None):
+    """
+    Saves a JSON object to a file, atomically. NDJSON paths are written one entry per line.
+    indent=None writes compact JSON for machine-only files.
+    """
+    if is_ndjson_path(json_path):
+        save_ndjson(json_path, data, backend)
+        return
+    with atomic_write_path(json_path) as temporary_path:
+        with open_json_file(temporary_path, "wb") as json_file:
+            json_file.write(json_dumps(data, indent, backend))
+
+def iterate_ndjson(json_path, backend=None):
+    """Yields entries from an NDJSON file one line at a time, so the file never has to fit in memory."""
+    with open_json_file(json_path, "rb") as json_file:
+        for line in json_file:
+            if line.strip():
+                yield json_loads(line, backend)
+
+def iterate_json_entries(json_path, chunk_size=JSON_STREAM_CHUNK_SIZE, malformed_entries=None):
+    """
+    Yields entries one at a time from a top-level JSON array, an NDJSON file or concatenated JSON objects
+    (objects written back to back without an enclosing list), optionally gzipped. Entries are decoded with
+    json.JSONDecoder.raw_decode over a sliding buffer, so memory stays bounded by the chunk size and the
+    largest single entry, not the file size. A file holding one non-array value yields that value.
+
+    Malformed entries raise json.JSONDecodeError, unless a malformed_entries list is given. Then each one is
+    recorded as {"byte_offset": ..., "error": ...} and skipped, and reading resumes at the next entry that starts
+    on a new line at the same indentation. Byte offsets are into the decompressed stream for gzipped files.
+    """
+    decoder = json.JSONDecoder()
+
+    with open_json_file(json_path, newline="") as json_file:
+        buffer = ""
+        position = 0
+        buffer_char_offset = 0      # Characters dropped from the front of the buffer so far
+        buffer_byte_offset = 0      # Bytes dropped from the front of the buffer so far
+        end_of_file = False
+        in_array = None             # Decided by the first non-whitespace character
+        expect_separator = False
+        entry_count = 0
+        failed_decode_offset = None
+
+        def read_more(minimum_size=0):
+            """
+            Drops decoded text from the front of the buffer and appends the next chunk.
+            The newline before position is kept, so the indentation of the pending entry stays known.
+            """
+            nonlocal buffer, position, buffer_char_offset, buffer_byte_offset, end_of_file
+            more = json_file.read(max(chunk_size, minimum_size))
+            keep_from = buffer.rfind("\n", max(0, position - JSON_MAX_INDENT), position)
+            if keep_from < 0:
+                keep_from = position
+            buffer_char_offset += keep_from
+            buffer_byte_offset += len(buffer[:keep_from].encode("utf-8"))
+            buffer = buffer[keep_from:] + more
+            position -= keep_from
+            end_of_file = not more
+
+        def skip_malformed_entry():
+            """Moves position to the start of the next entry with the same indentation as the malformed one."""
+            nonlocal position
+            newline = buffer.rfind("\n", 0, position)
+            indent = buffer[newline + 1:position]
+            if indent.strip(" \t") or (newline < 0 and buffer_char_offset > 0):
+                # The entry does not start its own line (or its line start is unknown)
+                next_entry = JSON_NEXT_INLINE_ENTRY
+            else:
+                next_entry = re.compile("\n" + re.escape(indent) + r"(?=[{\[])")
+
+            while True:
+                match = next_entry.search(buffer, position + 1)
+                if match:
+                    position = match.end()
+                    return True
+                if end_of_file:
+                    position = len(buffer)
+                    return False
+                # Keep a short tail in case the next entry start straddles the chunk boundary
+                position = max(position, len(buffer) - len(indent) - 2)
+                read_more()
+
+        while True:
+            position = JSON_WHITESPACE.match(buffer, position).end()
+
+            # Refill when the buffer is exhausted, dropping everything already decoded
+            if position == len(buffer):
+                if end_of_file:
+                    break
+                read_more()
+                continue
+
+            if in_array is None:
+                in_array = buffer[position] == "["
+                if in_array:
+                    position += 1
+                continue
+
+            if in_array and expect_separator:
+                if buffer[position] == "]":
+                    return
+                if buffer[position] != ",":
+                    raise json.JSONDecodeError("Expected ',' or ']' between array entries", buffer, position)
+                position += 1
+                expect_separator = False
+                continue
+            if in_array and buffer[position] == "]":
+                if entry_count:
+                    raise json.JSONDecodeError("Trailing ',' before ']'", buffer, position)
+                return
+
+            try:
+                entry, entry_end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as decode_error:
+                # A truncated entry fails differently once more text is read. A malformed one fails at the same spot again.
+                error_offset = buffer_char_offset + decode_error.pos
+                is_malformed = end_of_file or (error_offset == failed_decode_offset and not decode_error.msg.startswith("Unterminated string"))
+                if not is_malformed:
+                    failed_decode_offset = error_offset
+                    read_more(len(buffer) - position)
+                    continue
+
+                failed_decode_offset = None
+                if malformed_entries is None:
+                    raise
+                malformed_entries.append({
+                    "byte_offset": buffer_byte_offset + len(buffer[:position].encode("utf-8")),
+                    "error": decode_error.msg
+                })
+                if not skip_malformed_entry():
+                    return
+                expect_separator = False
+                continue
+
+            # A value ending at the buffer end may continue (e.g. numbers), so read on before accepting it
+            if entry_end == len(buffer) and not end_of_file:
+                read_more(len(buffer) - position)
+                continue
+
+            yield entry
+            entry_count += 1
+            position = entry_end
+            expect_separator = True
+            failed_decode_offset = None
+
+        if in_array:
+            raise json.JSONDecodeError("Unterminated JSON array", buffer, position)
+
+def tee_json_stream(json_path, entries, indent=4, backend=None):
+    """
+    Yields entries unchanged while writing each one to json_path, formatted the same as save_json on a list.
+    NDJSON paths are written one entry per line. The file is renamed into place once the generator is exhausted,
+    so it is either complete or absent.
+    """
+    with atomic_write_path(json_path) as temporary_path, open_json_file(temporary_path, "wb") as json_file:
+        if is_ndjson_path(json_path):
+            for entry in entries:
+                json_file.write(json_dumps(entry, None, backend))
+                json_file.write(b"\n")
+                yield entry
+            return
+
+        entry_prefix = b"\n" + b" " * indent
+        json_file.write(b"[")
+        wrote_entry = False
+        for entry in entries:
+            json_file.write(b"," + entry_prefix if wrote_entry else entry_prefix)
+            json_file.write(json_dumps(entry, indent, backend).replace(b"\n", entry_prefix))
+            wrote_entry = True
+            yield entry
+        json_file.write(b"\n]" if wrote_entry else b"]")
+
+def save_json_stream(json_path, entries, indent=4, backend=None):
+    """
+    Writes entries to a JSON array file as they are produced, formatted the same as save_json on a list.
+    Accepts any iterable, so a generator of entries is written in constant memory. NDJSON paths are written one entry per line.
+    Returns the number of entries written.
+    """
+    entry_count = 0
+    for _ in tee_json_stream(json_path, entries, indent, backend):
+        entry_count += 1
+    return entry_count
+
+def save_ndjson(json_path, entries, backend=None):
+    """
+    Writes entries to an NDJSON file, one compact line per entry, as they are produced, and renames it into place at the end.
+    Accepts any iterable, so a generator of entries is written in constant memory. Returns the number of entries written.
+    """
+    entry_count = 0
+    with atomic_write_path(json_path) as temporary_path, open_json_file(temporary_path, "wb") as json_file:
+        for entry in entries:
+            json_file.write(json_dumps(entry, None, backend))
+            json_file.write(b"\n")
+            entry_count += 1
+    return entry_count
         
 # Dictionary Manipulation
 def single_dict(dictionary):
@@ -49,3 +375,16 @@ def flatten_vars_in_dict(dictionary, return_dict=None, prefix=""):
             return_dict[full_key] = value
 
     return return_dict
+
+def unflatten_vars_in_dict(dictionary):
+    """Rebuilds the nested structure from dot-separated keys created by flatten_vars_in_dict."""
+    return_dict = {}
+
+    for full_key, value in dictionary.items():
+        *parent_keys, key = full_key.split(".")
+        nested_dict = return_dict
+        for parent_key in parent_keys:
+            nested_dict = nested_dict.setdefault(parent_key, {})
+        nested_dict[key] = value
+
+    return return_dict
@@ -1,16 +1,318 @@
-import datetime
+import os
+import re
+import sys
+import time
+import queue
+import atexit
 import logging
+import traceback
+from logging.handlers import QueueHandler, QueueListener
+from utils.dictionary_manipulation import json_dumps
+from utils.profiling import configure_profiling, end_profiling, profile_section, start_profiling, top_functions
+from utils.run_metrics import configure_metrics, count_records, end_run, save_run_metrics, start_run, start_section
 
 # ===========================================
 # LOGGING CONFIGURATION
 # ===========================================
 
-logging.basicConfig(
-    filename="logfile.log",
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S"
-)
+LOG_FILE_PATH = "logfile.log"
+LOG_LEVEL = logging.INFO
+LOG_QUIET = False               # True keeps the file log but prints nothing to the console
+LOG_QUEUE_SIZE = 10_000         # Records waiting for the writer thread before callers pause to let it catch up
+LOG_QUEUE_WAIT = 0.001          # Seconds a caller sleeps while the queue is full
+
+# Warning aggregation: warnings with the same (code, issue_type, location) are printed LOG_WARNING_LIMIT times, then
+# only counted. script_end prints a summary of the counted ones and appends every aggregated key to the script's own
+# LOG_WARNINGS_PATH file, which script_start empties, so running 01 to 04 one after another keeps every script's warnings.
+LOG_AGGREGATE_WARNINGS = True
+LOG_WARNING_LIMIT = 5
+LOG_WARNING_SAMPLES = 3             # Distinct sample values kept per key
+LOG_WARNING_SAMPLE_SCAN = 1_000     # Occurrences of a key searched for distinct samples, so repeated values stop costing anything
+LOG_WARNINGS_PATH = "outputs/warnings_{script}.jsonl"      # {script}: the script name as a file name
+
+FILE_LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Where a record is written. Records from other libraries (e.g. matplotlib) have no channel and only go to the file.
+LOG_CONSOLE = "console"
+LOG_FILE = "file"
+LOG_BOTH = "both"
+
+# Once script_start has started the listener thread, every call only creates a record (formatting its %-style arguments,
+# so later changes to mutable arguments do not show) and puts it on a queue. The listener formats the timestamps and
+# lines and writes them to the console and the log file in order, flushing whenever the queue runs empty, so the caller
+# never waits on I/O and bursts of records are written in large blocks. Before that, and after exit, records are
+# written directly by the calling thread.
+LOG_STATE = {
+    "level": LOG_LEVEL, "quiet": LOG_QUIET, "log_file_path": LOG_FILE_PATH, "console_stream": None,
+    "aggregate_warnings": LOG_AGGREGATE_WARNINGS, "warning_limit": LOG_WARNING_LIMIT,
+    "queue": None, "queue_handler": None, "listener": None, "direct_writers": [], "warnings_path": None
+}
+
+# (code, issue_type, location) -> aggregate dict of the warnings logged since the last script_end
+WARNING_AGGREGATES = {}
+ROOT_LOGGER = logging.getLogger()
+
+# ===========================================
+# QUEUED BACKEND
+# ===========================================
+
+class QueuedRecord(logging.LogRecord):
+    """
+    LogRecord of the functions below. Only the fields the writers use are set per record (a full LogRecord also looks up
+    the caller's thread and process); the other standard fields are class-level defaults, so any handler can format it.
+    """
+
+    pathname = filename = module = ""
+    lineno = 0
+    funcName = thread = threadName = process = processName = taskName = None
+    msecs = relativeCreated = 0.0
+    exc_info = exc_text = stack_info = None
+
+    def __init__(self, level, message, args, label, file_label, channel):
+        self.name = ROOT_LOGGER.name
+        self.levelno = level
+        self.levelname = logging.getLevelName(level)
+        self.msg = message
+        self.args = args
+        self.created = time.time()
+        self.label = label
+        self.file_label = file_label
+        self.channel = channel
+
+
+class TimestampFormatter(logging.Formatter):
+    """Formatter that formats each second's timestamp only once."""
+
+    def __init__(self, fmt=None):
+        super().__init__(fmt, TIMESTAMP_FORMAT)
+        self.cached_second = None
+        self.cached_timestamp = None
+
+    def formatTime(self, record, datefmt=None):
+        second = int(record.created)
+        if second != self.cached_second:
+            self.cached_second = second
+            self.cached_timestamp = time.strftime(TIMESTAMP_FORMAT, self.converter(second))
+        return self.cached_timestamp
+
+
+class ConsoleFormatter(TimestampFormatter):
+    """Formats console lines as '[LABEL] message - timestamp', or the bare message for bars and headers."""
+
+    def format(self, record):
+        message = record.getMessage()
+        label = getattr(record, "label", None)
+        return f"{label} {message} - {self.formatTime(record)}" if label else message
+
+
+class FileFormatter(TimestampFormatter):
+    """Formats log file lines as 'timestamp [LEVEL] message'. Labelled records marked file_label keep their console line as the message."""
+
+    def __init__(self):
+        super().__init__(FILE_LOG_FORMAT)
+
+    def format(self, record):
+        message = record.getMessage()
+        if getattr(record, "file_label", False):
+            message = f"{record.label} {message} - {self.formatTime(record)}"
+        return f"{self.formatTime(record)} [{record.levelname}] {message}"
+
+
+class LogWriter(logging.Handler):
+    """
+    Writes the records of some channels to a stream (or a file opened on the first record). Unless autoflush is set,
+    records are not flushed one by one; the listener flushes the writer whenever the queue runs empty.
+    """
+
+    def __init__(self, formatter, channels, stream=None, file_path=None, autoflush=False):
+        super().__init__()
+        self.setFormatter(formatter)
+        self.channels = channels
+        self.stream = stream
+        self.file_path = file_path
+        self.autoflush = autoflush
+
+    def filter(self, record):
+        return getattr(record, "channel", LOG_FILE) in self.channels
+
+    def emit(self, record):
+        try:
+            if self.stream is None:
+                self.stream = open(self.file_path, "a", encoding="utf-8")
+            self.stream.write(self.format(record) + "\n")
+            if self.autoflush:
+                self.stream.flush()
+        except BrokenPipeError:
+            self.close_broken_pipe()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        try:
+            if self.stream is not None:
+                self.stream.flush()
+        except BrokenPipeError:
+            self.close_broken_pipe()
+
+    def close_broken_pipe(self):
+        """
+        Stops writing once the reader of the stream is gone (e.g. output piped into `head`). The log file is still written.
+        The stream's descriptor is pointed at devnull, so the interpreter's final flush of stdout does not fail either.
+        """
+        self.channels = set()
+        try:
+            os.dup2(os.open(os.devnull, os.O_WRONLY), self.stream.fileno())
+        except (OSError, ValueError):
+            pass
+
+    def close(self):
+        self.flush()
+        if self.file_path is not None and self.stream is not None:
+            self.stream.close()
+            self.stream = None
+        super().close()
+
+
+class LogListener(QueueListener):
+    """QueueListener that flushes its writers whenever the queue runs empty, before waiting for more records."""
+
+    def dequeue(self, block):
+        if block and self.queue.empty():
+            for handler in self.handlers:
+                handler.flush()
+        return self.queue.get(block)
+
+
+def log_writers(autoflush=False):
+    """Returns the handlers that write records: the log file, and the console unless quiet."""
+    writers = [LogWriter(FileFormatter(), {LOG_FILE, LOG_BOTH}, file_path=LOG_STATE["log_file_path"], autoflush=autoflush)]
+    if not LOG_STATE["quiet"]:
+        writers.append(LogWriter(ConsoleFormatter(), {LOG_CONSOLE, LOG_BOTH}, stream=LOG_STATE["console_stream"] or sys.stdout, autoflush=autoflush))
+    return writers
+
+
+def start_direct_logging():
+    """Writes records from the calling thread, flushing each one. Used until the listener starts and after it stops."""
+    writers = log_writers(autoflush=True)
+    for writer in writers:
+        ROOT_LOGGER.addHandler(writer)
+    ROOT_LOGGER.setLevel(LOG_STATE["level"])
+    LOG_STATE["direct_writers"] = writers
+
+
+def stop_direct_logging():
+    """Detaches and closes the direct writers."""
+    for writer in LOG_STATE["direct_writers"]:
+        ROOT_LOGGER.removeHandler(writer)
+        writer.close()
+    LOG_STATE["direct_writers"] = []
+
+
+def start_logging():
+    """
+    Starts the listener thread, unless it is running. Records of the functions below are put on its queue directly;
+    records of other libraries reach it through a QueueHandler on the root logger, which formats their message first.
+    Called by script_start, so importing this module starts no thread.
+    """
+    if LOG_STATE["listener"] is not None:
+        return
+    stop_direct_logging()
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    listener = LogListener(log_queue, *log_writers())
+    ROOT_LOGGER.addHandler(queue_handler)
+    ROOT_LOGGER.setLevel(LOG_STATE["level"])
+    listener.start()
+    LOG_STATE["queue"], LOG_STATE["queue_handler"], LOG_STATE["listener"] = log_queue, queue_handler, listener
+
+
+def stop_logging():
+    """Writes every queued record, stops the listener thread and goes back to writing records directly."""
+    listener = LOG_STATE["listener"]
+    if listener is None:
+        return
+    listener.stop()
+    ROOT_LOGGER.removeHandler(LOG_STATE["queue_handler"])
+    for handler in listener.handlers:
+        handler.close()
+    LOG_STATE["queue"] = LOG_STATE["queue_handler"] = LOG_STATE["listener"] = None
+    start_direct_logging()
+
+
+def flush_logs():
+    """Blocks until every record logged so far has been written to the console and the log file."""
+    listener = LOG_STATE["listener"]
+    if listener is None:
+        return
+    listener.stop()
+    for handler in listener.handlers:
+        handler.flush()
+    listener.start()
+
+
+def configure_logging(level=None, quiet=None, log_file_path=None, console_stream=None, aggregate_warnings=None, warning_limit=None):
+    """
+    Changes the logging settings. Records logged before the change are written with the previous settings.
+    Settings left as None keep their current value.
+
+    :param level:               Lowest level that is logged (e.g. logging.WARNING). Calls below it return before formatting anything.
+    :param quiet:               True to suppress console output while still writing the log file.
+    :param log_file_path:       Log file to write to.
+    :param console_stream:      Stream for console output (sys.stdout by default).
+    :param aggregate_warnings:  False to print every warning instead of aggregating repeated ones.
+    :param warning_limit:       Occurrences of a (code, issue_type, location) key printed before the rest are only counted.
+    """
+    queued = LOG_STATE["listener"] is not None
+    stop_logging()
+    stop_direct_logging()
+    for setting, value in [
+        ("level", level), ("quiet", quiet), ("log_file_path", log_file_path), ("console_stream", console_stream),
+        ("aggregate_warnings", aggregate_warnings), ("warning_limit", warning_limit)
+    ]:
+        if value is not None:
+            LOG_STATE[setting] = value
+    start_direct_logging()
+    if queued:
+        start_logging()
+
+
+def restart_logging_in_child():
+    """A forked child does not inherit the listener thread, so it gets its own queue and listener."""
+    if LOG_STATE["listener"] is not None:
+        ROOT_LOGGER.removeHandler(LOG_STATE["queue_handler"])
+        LOG_STATE["queue"] = LOG_STATE["queue_handler"] = LOG_STATE["listener"] = None
+        start_logging()
+
+
+def emit_record(level, message, args=(), label=None, file_label=False, channel=LOG_BOTH):
+    """
+    Queues one record, or writes it directly if the listener is not running. The message is formatted with args here,
+    so the record does not change if an argument is modified before the listener writes it.
+
+    :param level:       logging level of the record.
+    :param message:     Message, with %-style placeholders if args are given.
+    :param args:        Arguments of the placeholders.
+    :param label:       Console label (e.g. '[INFO]'), or None to print the message as it is.
+    :param file_label:  True to also write the label and a timestamp in the log file message.
+    :param channel:     LOG_CONSOLE, LOG_FILE or LOG_BOTH.
+    """
+    record = QueuedRecord(level, message % args if args else message, (), label, file_label, channel)
+
+    log_queue = LOG_STATE["queue"]
+    if log_queue is None:
+        for writer in LOG_STATE["direct_writers"]:     # Like the queue, bypassing other handlers on the root logger
+            writer.handle(record)
+        return
+    while log_queue.qsize() >= LOG_QUEUE_SIZE:
+        time.sleep(LOG_QUEUE_WAIT)
+    log_queue.put(record)
+
+
+start_direct_logging()
+atexit.register(stop_logging)
+if hasattr(os, "register_at_fork"):     # POSIX only; Windows has no fork, so children never inherit the listener
+    os.register_at_fork(after_in_child=restart_logging_in_child)
 
 # ===========================================
 # SECTIONING AND FORMATTING FUNCTIONS
@@ -18,64 +320,99 @@ logging.basicConfig(
 
 def log_bar(character="=", length=80):
     """Prints a separation bar with customizable characters and length."""
-    print(character * length)
+    if ROOT_LOGGER.isEnabledFor(logging.INFO):
+        emit_record(logging.INFO, character * length, channel=LOG_CONSOLE)
 
 def log_header(title, symbol="-", padding=4):
-    """Prints a formatted section header with a title."""
+    """
+    Prints a formatted section header with a title. Also starts the section's timer and counters (see utils.run_metrics)
+    and, when profiling, its profile (see utils.profiling).
+    """
+    start_section(title)
+    profile_section(title)
+    if not ROOT_LOGGER.isEnabledFor(logging.INFO):
+        return
     title = f" {title} "
-    print(symbol * padding + title + symbol * (80 - len(title) - padding))
-    logging.info(f"[SECTION] {title.strip()}")
+    emit_record(logging.INFO, symbol * padding + title + symbol * (80 - len(title) - padding), channel=LOG_CONSOLE)
+    emit_record(logging.INFO, f"[SECTION] {title.strip()}", channel=LOG_FILE)
 
 def log_subheader(subtitle, symbol="~", padding=2):
     """Logs a formatted sub-heading with a subtitle."""
+    if not ROOT_LOGGER.isEnabledFor(logging.INFO):
+        return
     subtitle = f" {subtitle} "
-    print(symbol * padding + subtitle + symbol * (80 - len(subtitle) - padding))
-    logging.info(f"[SUB-SECTION] {subtitle.strip()}")
+    emit_record(logging.INFO, symbol * padding + subtitle + symbol * (80 - len(subtitle) - padding), channel=LOG_CONSOLE)
+    emit_record(logging.INFO, f"[SUB-SECTION] {subtitle.strip()}", channel=LOG_FILE)
 
 def script_start(script_name="Script Execution Started"):
-    """Logs and displays the script start with a header and timestamp."""
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    """
+    Starts the logging listener thread and, when warnings are aggregated, a new warnings file of the script, logs and
+    displays the script start with a header and timestamp, and starts timing (and, if enabled, profiling) the run.
+    """
+    start_logging()
+    LOG_STATE["warnings_path"] = warnings_file_path(script_name)
+    if LOG_STATE["aggregate_warnings"] and os.path.exists(LOG_STATE["warnings_path"]):
+        os.remove(LOG_STATE["warnings_path"])
+    start_run(script_name)
     log_bar("=")
-    print(f"[START] {script_name} - {timestamp}")
+    emit_record(logging.INFO, script_name, label="[START]", file_label=True)
     log_bar("=")
-    logging.info(f"[START] {script_name} - {timestamp}")
+    start_profiling(script_name)
 
 def script_end(script_name="Script Execution Finished"):
-    """Logs and displays the script end with a header and timestamp."""
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    """
+    Logs and displays the script end with a header and timestamp, then waits until every queued record is written.
+    The run's metrics, hot functions (when profiling) and aggregated warnings are summarized first.
+    """
+    profile = end_profiling()
+    run = end_run()
+    if run is not None:
+        log_run_metrics(run)
+    if profile is not None:
+        log_profile_report(profile)
+    log_warning_summary(script_name)
     log_bar("=")
-    print(f"[END] {script_name} - {timestamp}")
+    emit_record(logging.INFO, script_name, label="[END]", file_label=True)
     log_bar("=")
-    logging.info(f"[END] {script_name} - {timestamp}")
+    flush_logs()
 
 # ===========================================
 # CORE LOGGING FUNCTIONS
 # ===========================================
 
-def log_info(message):
-    """Logs an informational message with a timestamp."""
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_message = f"[INFO] {message} - {timestamp}"
-    print(log_message)
-    logging.info(message)
+def log_info(message, *args):
+    """Logs an informational message with a timestamp. Optional args fill %-style placeholders, only if the message is logged."""
+    if ROOT_LOGGER.isEnabledFor(logging.INFO):
+        emit_record(logging.INFO, message, args, label="[INFO]")
 
 def log_warning(
     message,
+    *args,
     function_name="N/A",
     issue_type="N/A",
     location="N/A",
-    code=None
+    code=None,
+    sample=None
 ):
     """
     Logs a warning message with standardized bracket labels.
+    Unless warning aggregation is off, only the first warnings of each (code, issue_type, location) are printed.
 
-    :param message:        The core description of what’s wrong.
+    :param message:        The core description of what’s wrong, with %-style placeholders if args are given.
+    :param args:           Arguments of the placeholders, only formatted if the warning is logged.
     :param function_name:  Name of the function or context calling the warning.
     :param issue_type:     Short string for the issue category (e.g. 'missing_key').
     :param location:       Data path or field that triggered the warning (e.g. 'metadata.someKey').
     :param code:           Optional short code for reference (e.g. 'W101').
+    :param sample:         Value shown for this occurrence in the warning summary (e.g. the invalid value), or None for the message.
     """
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if not ROOT_LOGGER.isEnabledFor(logging.WARNING):
+        return
+    printed = None
+    if LOG_STATE["aggregate_warnings"]:
+        printed = count_warning(message, args, sample, function_name, issue_type, location, code)
+        if printed is None:
+            return
 
     # Build bracket labels
     log_prefix = "[WARNING"
@@ -90,17 +427,142 @@ def log_warning(
     if location != "N/A":
         log_prefix += f" [location={location}]"
 
-    # Combine everything
-    log_message = f"{log_prefix} {message} - {timestamp}"
-    print(log_message)
-    logging.warning(log_message)
+    emit_record(logging.WARNING, message, args, label=log_prefix, file_label=True)
+    if printed == LOG_STATE["warning_limit"]:
+        emit_record(logging.INFO, "Printed %d warnings with code=%s, issue=%s, location=%s; further ones are counted and summarized at the end", (printed, code, issue_type, location), label="[INFO]")
+
+def log_success(message, *args):
+    """Logs a success message with a timestamp. Optional args fill %-style placeholders, only if the message is logged."""
+    if ROOT_LOGGER.isEnabledFor(logging.INFO):
+        emit_record(logging.INFO, message, args, label="[SUCCESS]")
 
-def log_success(message):
-    """Logs a success message with a timestamp."""
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_message = f"[SUCCESS] {message} - {timestamp}"
-    print(log_message)
-    logging.info(message)
+def log_traceback():
+    """Prints the traceback of the exception being handled, in order with the queued console output."""
+    if ROOT_LOGGER.isEnabledFor(logging.ERROR):
+        emit_record(logging.ERROR, traceback.format_exc().rstrip("\n"), channel=LOG_CONSOLE)
+
+# ===========================================
+# WARNING AGGREGATION
+# ===========================================
+
+def count_warning(message, args, sample, function_name, issue_type, location, code):
+    """
+    Counts one warning under its (code, issue_type, location) key and keeps a few distinct samples.
+
+    :return:  How many warnings of the key have been printed including this one, or None once it has been printed warning_limit times.
+    """
+    key = (code, issue_type, location)
+    aggregate = WARNING_AGGREGATES.get(key)
+    if aggregate is None:
+        aggregate = WARNING_AGGREGATES[key] = {
+            "code": code, "issue_type": issue_type, "location": location, "function_name": function_name,
+            "count": 0, "printed": 0, "samples": []
+        }
+    aggregate["count"] += 1
+
+    samples = aggregate["samples"]
+    if len(samples) < LOG_WARNING_SAMPLES and aggregate["count"] <= LOG_WARNING_SAMPLE_SCAN:
+        if sample is None:
+            sample = message % args if args else message
+        elif not isinstance(sample, (str, int, float, bool)):
+            sample = repr(sample)
+        if sample not in samples:
+            samples.append(sample)
+
+    if aggregate["printed"] >= LOG_STATE["warning_limit"]:
+        return None
+    aggregate["printed"] += 1
+    return aggregate["printed"]
+
+
+def warnings_file_path(script_name):
+    """Returns the warnings file of a script, e.g. 'outputs/warnings_data_analysis_01_data_cleaning_and_preprocessing.jsonl'."""
+    return LOG_WARNINGS_PATH.format(script=re.sub(r"[^a-z0-9]+", "_", script_name.lower()).strip("_"))
+
+
+def log_warning_summary(script_name):
+    """
+    Prints a table of the warnings that were counted without being printed, appends every aggregated key to the
+    script's warnings file as JSONL, and starts a new aggregation.
+
+    :param script_name:  Script the warnings belong to, recorded in the JSONL.
+    """
+    aggregates = sorted(WARNING_AGGREGATES.values(), key=lambda aggregate: -aggregate["count"])
+    WARNING_AGGREGATES.clear()
+    if not aggregates:
+        return
+
+    suppressed = [aggregate for aggregate in aggregates if aggregate["count"] > aggregate["printed"]]
+    if suppressed and ROOT_LOGGER.isEnabledFor(logging.WARNING):
+        log_header("Warning Summary")
+        emit_record(logging.WARNING, f"{'count':>10} {'printed':>8}  {'code':<6} {'issue':<16} {'location':<32} samples", label=None)
+        for aggregate in suppressed:
+            emit_record(
+                logging.WARNING,
+                f"{aggregate['count']:>10,} {aggregate['printed']:>8,}  {str(aggregate['code'] or '-'):<6} {aggregate['issue_type']:<16} "
+                f"{aggregate['location']:<32} {', '.join(repr(sample) for sample in aggregate['samples'])}",
+                label=None
+            )
+
+    timestamp = time.strftime(TIMESTAMP_FORMAT)
+    warnings_path = LOG_STATE["warnings_path"] or warnings_file_path(script_name)
+    if os.path.dirname(warnings_path):
+        os.makedirs(os.path.dirname(warnings_path), exist_ok=True)
+    with open(warnings_path, "ab") as warnings_file:
+        for aggregate in aggregates:
+            warnings_file.write(json_dumps({"script": script_name, "time": timestamp, **aggregate}, indent=None) + b"\n")
+
+# ===========================================
+# RUN METRICS
+# ===========================================
+
+def log_run_metrics(run):
+    """
+    Prints a table of a run's time, throughput and memory per section, and writes the run to metrics.json.
+
+    :param run:  Run metrics dict returned by utils.run_metrics.end_run.
+    """
+    if ROOT_LOGGER.isEnabledFor(logging.INFO):
+        log_header("Run Metrics")
+        emit_record(logging.INFO, f"{'seconds':>9} {'peak RSS MB':>11} {'traced MB':>9}  {'section':<36} records", label=None)
+        for row in run["rows"]:
+            records = ", ".join(
+                f"{count:,} {name}" + (f" ({row['records_per_second'][name]:,.0f}/s)" if row["records_per_second"][name] is not None else "")
+                for name, count in row["records"].items()
+            )
+            peak_rss = f"{row['peak_rss_mb']:.1f}" if row["peak_rss_mb"] is not None else "-"
+            traced_peak = f"{row['traced_peak_mb']:.1f}" if row["traced_peak_mb"] is not None else "-"
+            name = row["name"] if row["kind"] == "section" else "(whole run)"
+            emit_record(logging.INFO, f"{row['seconds']:>9.3f} {peak_rss:>11} {traced_peak:>9}  {name:<36} {records}", label=None)
+
+    try:
+        metrics_path = save_run_metrics(run)
+    except OSError as e:
+        log_warning(f"Could not write the run metrics: {e}", function_name="log_run_metrics", issue_type="write_failed")
+    else:
+        if metrics_path is not None:
+            log_info("Saved run metrics to '%s'", metrics_path)
+
+# ===========================================
+# PROFILING
+# ===========================================
+
+def log_profile_report(profile):
+    """
+    Prints the top functions of a profiled run by cumulative and by self time.
+
+    :param profile:  Profiled run dict returned by utils.profiling.end_profiling.
+    """
+    if not ROOT_LOGGER.isEnabledFor(logging.INFO) or profile["stats"] is None:
+        return
+    time_label = "seconds" if profile["mode"] == "cprofile" else "est. s"
+    calls_label = "calls" if profile["mode"] == "cprofile" else "samples"
+    for title, sort_key in [("Hot Functions (cumulative time)", "cumulative"), ("Hot Functions (self time)", "self")]:
+        log_header(title)
+        emit_record(logging.INFO, f"{'cumulative':>10} {'self':>9} {calls_label:>10}  function", label=None)
+        for name, location, calls, self_seconds, cumulative_seconds in top_functions(profile["stats"], sort_key):
+            emit_record(logging.INFO, f"{cumulative_seconds:>10.3f} {self_seconds:>9.3f} {calls:>10,}  {name}  ({location})", label=None)
+    log_info("%s profiles saved to '%s' (cumulative and self in %s)", profile["mode"], profile["profile_path"], time_label)
 
 # ===========================================
 # HELPER WARNING FUNCTIONS
@@ -115,9 +577,9 @@ def warn_missing_key(
     """
     Warn that a required key is missing.
     """
-    message = f"Missing required key '{key_name}'."
     log_warning(
-        message=message,
+        "Missing required key '%s'.",
+        key_name,
         function_name=function_name,
         issue_type="missing_key",
         location=location,
@@ -137,17 +599,14 @@ def warn_invalid_type(
     Warn that a field has an invalid type compared to the expected type.
     Shows both the type and actual value.
     """
-    actual_type = type(actual_value).__name__
-    message = (
-        f"'{key_or_field}' should be '{expected_type}', "
-        f"but got type '{actual_type}' with value '{actual_value}'."
-    )
     log_warning(
-        message=message,
+        "'%s' should be '%s', but got type '%s' with value '%s'.",
+        key_or_field, expected_type, type(actual_value).__name__, actual_value,
         function_name=function_name,
         issue_type="invalid_type",
         location=location,
-        code=code
+        code=code,
+        sample=actual_value
     )
 
 
@@ -163,17 +622,14 @@ def warn_invalid_value(
     Warn that a field's value is invalid given some expected condition.
     Shows the actual value and its type as well.
     """
-    actual_type = type(actual_value).__name__
-    message = (
-        f"'{key_or_field}' is invalid. Expected {expected_condition}, "
-        f"but got type '{actual_type}' with value '{actual_value}'."
-    )
     log_warning(
-        message=message,
+        "'%s' is invalid. Expected %s, but got type '%s' with value '%s'.",
+        key_or_field, expected_condition, type(actual_value).__name__, actual_value,
         function_name=function_name,
         issue_type="invalid_value",
         location=location,
-        code=code
+        code=code,
+        sample=actual_value
     )
 
 
@@ -188,16 +644,20 @@ def warn_duplicate_value(
     Warn that duplicates were found where uniqueness was required.
     Optionally show the entire list or duplicates.
     """
-    message = f"'{key_or_field}' contains duplicate values."
+    message = "'%s' contains duplicate values."
+    args = (key_or_field,)
     if actual_values is not None:
-        message += f" Received values: {actual_values}"
+        message += " Received values: %s"
+        args += (actual_values,)
 
     log_warning(
-        message=message,
+        message,
+        *args,
         function_name=function_name,
         issue_type="duplicate_value",
         location=location,
-        code=code
+        code=code,
+        sample=actual_values
     )
 
 
@@ -213,15 +673,12 @@ def warn_out_of_range(
     Warn that a numerical field is out of a given range.
     Shows the actual value and its type.
     """
-    actual_type = type(actual_value).__name__
-    message = (
-        f"'{key_or_field}' is out of range. Expected {range_description}, "
-        f"but got type '{actual_type}' with value '{actual_value}'."
-    )
     log_warning(
-        message=message,
+        "'%s' is out of range. Expected %s, but got type '%s' with value '%s'.",
+        key_or_field, range_description, type(actual_value).__name__, actual_value,
         function_name=function_name,
         issue_type="out_of_range",
         location=location,
-        code=code
+        code=code,
+        sample=actual_value
     )
\ No newline at end of file
@@ -0,0 +1,165 @@
+import heapq
+import math
+import numpy as np
+
+# ===========================================
+# SCHEDULING CONFIGURATION
+# ===========================================
+
+DEFAULT_MIN_TURNAROUND = 2           # Minimum number of matches between two matches of the same team
+DEFAULT_PARTNER_PENALTY = 3.0        # Cost for each repeat alliance partner
+DEFAULT_OPPONENT_PENALTY = 1.0       # Cost for each repeat opponent
+DEFAULT_CANDIDATE_POOL_EXTRA = 6     # Extra candidates popped per match to choose pairings from
+PLAYED_PENALTY = 100.0               # Cost for picking a team that has played more than the least-played candidate
+
+# ===========================================
+# HELPER FUNCTIONS
+# ===========================================
+
+def position_alliance(position):
+    """Returns the alliance color of a robot position (e.g. 'red_1' -> 'red')."""
+    return position.split("_")[0]
+
+
+def pairing_penalty(team, alliance, placed_teams, partner_counts, opponent_counts, partner_penalty, opponent_penalty):
+    """
+    Returns the repeat-pairing cost of placing a team on an alliance next to the teams already placed in the match.
+
+    :param team:             Candidate team.
+    :param alliance:         Alliance color of the open position.
+    :param placed_teams:     List of (team, alliance) tuples already placed in the match.
+    :param partner_counts:   Dict of team -> dict of partner team -> times paired together.
+    :param opponent_counts:  Dict of team -> dict of opponent team -> times played against.
+    """
+    penalty = 0.0
+    team_partners = partner_counts[team]
+    team_opponents = opponent_counts[team]
+
+    for placed_team, placed_alliance in placed_teams:
+        if placed_alliance == alliance:
+            penalty += partner_penalty * team_partners.get(placed_team, 0)
+        else:
+            penalty += opponent_penalty * team_opponents.get(placed_team, 0)
+
+    return penalty
+
+
+def record_match_pairings(match_slots, partner_counts, opponent_counts):
+    """Records partner and opponent pairings of a scheduled match."""
+    for team, alliance in match_slots:
+        for other_team, other_alliance in match_slots:
+            if other_team == team:
+                continue
+            counts = partner_counts if other_alliance == alliance else opponent_counts
+            counts[team][other_team] = counts[team].get(other_team, 0) + 1
+
+# ===========================================
+# SCHEDULER
+# ===========================================
+
+def build_balanced_match_schedule(
+    teams,
+    num_matches_per_team,
+    robot_positions,
+    teams_per_match=None,
+    min_turnaround=DEFAULT_MIN_TURNAROUND,
+    partner_penalty=DEFAULT_PARTNER_PENALTY,
+    opponent_penalty=DEFAULT_OPPONENT_PENALTY,
+    candidate_pool_extra=DEFAULT_CANDIDATE_POOL_EXTRA,
+    rng=None
+):
+    """
+    Builds a balanced match schedule using a priority queue keyed by (matches played, last-played round).
+    A round is the number of matches it takes every team to play once, and ties inside a round are
+    broken by a fresh random draw each time a team is scheduled, so alliances are reshuffled every round.
+
+    Every match pops the most starved eligible teams plus a few extra candidates, then fills each robot
+    position with the candidate that adds the fewest repeat partners and opponents. Teams that played
+    within the last `min_turnaround` matches are skipped while enough other teams are available.
+    The final matches are filled with surrogate teams so every team plays at least num_matches_per_team.
+
+    :param teams:                 List of team numbers.
+    :param num_matches_per_team:  Minimum number of matches each team plays.
+    :param robot_positions:       Robot positions in slot order (e.g. 'red_1' ... 'blue_3').
+    :param teams_per_match:       Number of teams per match. Defaults to len(robot_positions).
+    :param min_turnaround:        Minimum number of matches between two matches of the same team.
+    :param partner_penalty:       Cost of each repeat alliance partner.
+    :param opponent_penalty:      Cost of each repeat opponent.
+    :param candidate_pool_extra:  Extra candidates considered per match beyond teams_per_match.
+    :param rng:                   np.random.Generator used to break ties. Defaults to a fresh generator.
+    :return:                      A list of (match number, team, robot position) tuples in match order.
+    """
+    if teams_per_match is None:
+        teams_per_match = len(robot_positions)
+    if teams_per_match > len(robot_positions):
+        raise ValueError(f"teams_per_match ({teams_per_match}) cannot be greater than the number of robot positions ({len(robot_positions)}).")
+    if teams_per_match > len(teams):
+        raise ValueError(f"teams_per_match ({teams_per_match}) cannot be greater than total teams ({len(teams)}).")
+    if rng is None:
+        rng = np.random.default_rng()
+
+    match_positions = [(position, position_alliance(position)) for position in robot_positions[:teams_per_match]]
+    num_matches = math.ceil(len(teams) * num_matches_per_team / teams_per_match)
+    matches_per_round = math.ceil(len(teams) / teams_per_match)
+    pool_size = min(len(teams), teams_per_match + candidate_pool_extra)
+
+    # Heap entries: (matches played, last-played round, random tiebreak, last-played match, team)
+    tiebreaks = iter(rng.random(len(teams) + num_matches * teams_per_match).tolist())
+    team_heap = [(0, -1, next(tiebreaks), -min_turnaround - 1, team) for team in teams]
+    heapq.heapify(team_heap)
+
+    partner_counts = {team: {} for team in teams}
+    opponent_counts = {team: {} for team in teams}
+    schedule = []
+
+    for match_number in range(1, num_matches + 1):
+
+        # Pop the most starved teams that are rested enough, keeping recent teams aside as a fallback
+        candidates = []
+        resting = []
+        while team_heap and len(candidates) < pool_size:
+            heap_entry = heapq.heappop(team_heap)
+            if match_number - heap_entry[3] > min_turnaround:
+                candidates.append(heap_entry)
+            else:
+                resting.append(heap_entry)
+
+        if len(candidates) < teams_per_match:
+            shortfall = teams_per_match - len(candidates)
+            candidates.extend(resting[:shortfall])
+            resting = resting[shortfall:]
+
+        # Fill each position with the cheapest candidate
+        least_played = min(entry[0] for entry in candidates)
+        placed_teams = []
+        chosen_indices = set()
+
+        for position, alliance in match_positions:
+            best_index = None
+            best_cost = None
+            for index, (played, _, _, _, team) in enumerate(candidates):
+                if index in chosen_indices:
+                    continue
+                cost = PLAYED_PENALTY * (played - least_played) + pairing_penalty(
+                    team, alliance, placed_teams, partner_counts, opponent_counts, partner_penalty, opponent_penalty
+                )
+                if best_cost is None or cost < best_cost:
+                    best_index, best_cost = index, cost
+
+            chosen_indices.add(best_index)
+            placed_teams.append((candidates[best_index][4], alliance))
+            schedule.append((match_number, candidates[best_index][4], position))
+
+        record_match_pairings(placed_teams, partner_counts, opponent_counts)
+
+        # Push every popped team back, scheduled teams with their updated priority and a fresh tiebreak
+        match_round = (match_number - 1) // matches_per_round
+        for index, heap_entry in enumerate(candidates):
+            if index in chosen_indices:
+                heapq.heappush(team_heap, (heap_entry[0] + 1, match_round, next(tiebreaks), match_number, heap_entry[4]))
+            else:
+                heapq.heappush(team_heap, heap_entry)
+        for heap_entry in resting:
+            heapq.heappush(team_heap, heap_entry)
+
+    return schedule
@@ -0,0 +1,261 @@
+import os
+from utils.logging import *
+from utils.stage_cache import *
+
+# ===========================================
+# PIPELINE DEFINITION
+# ===========================================
+#
+# A pipeline is a list of stages and a dict of artifacts.
+#
+# Stage:     {"name": str, "inputs": [artifact names], "output": artifact name, "run": callable, "fingerprint": dict}
+#            `run` is called with the input objects in order and returns the output object.
+#            The optional `fingerprint` ({"files": [...], "code": [...], "params": {...}}) lists what else the
+#            result depends on, for the stage cache (see utils.stage_cache).
+#            The optional `records` ((counter name, callable(output) -> count)) counts the records the stage produced,
+#            for the stage's records/sec in the run metrics (see utils.run_metrics).
+# Artifact:  {"path": str, "load": callable(path), "save": callable(path, obj) or None, "write": bool, "files": list or callable(obj)}
+#            Objects are handed from stage to stage in memory. An artifact is only written to `path`
+#            when it is requested (`write`), and only loaded from `path` when its producer is not run.
+#            `files` lists every file the artifact is written to, if that is not just `path`.
+
+# ===========================================
+# HELPER FUNCTIONS
+# ===========================================
+
+def stage_producers(stages):
+    """
+    Maps every artifact to the stage that produces it.
+
+    :param stages:  List of stage dicts.
+    :return:        Dict of artifact name -> stage dict.
+    """
+    producers = {}
+    for stage in stages:
+        if stage["output"] in producers:
+            raise ValueError(f"Artifact '{stage['output']}' is produced by both '{producers[stage['output']]['name']}' and '{stage['name']}'.")
+        producers[stage["output"]] = stage
+    return producers
+
+
+def topological_order(stages):
+    """
+    Orders stages so that every stage runs after the stages producing its inputs.
+    Stages that do not depend on each other keep their declared order.
+
+    :param stages:  List of stage dicts.
+    :return:        List of stage dicts in run order.
+    """
+    producers = stage_producers(stages)
+    ordered = []
+    visiting = set()
+    visited = set()
+
+    def visit(stage):
+        if stage["name"] in visited:
+            return
+        if stage["name"] in visiting:
+            raise ValueError(f"Pipeline has a cycle through stage '{stage['name']}'.")
+        visiting.add(stage["name"])
+        for input_name in stage["inputs"]:
+            if input_name in producers:
+                visit(producers[input_name])
+        visiting.discard(stage["name"])
+        visited.add(stage["name"])
+        ordered.append(stage)
+
+    for stage in stages:
+        visit(stage)
+    return ordered
+
+
+def stage_dependencies(stages, stage_name, downstream=False):
+    """
+    Returns the names of a stage and every stage it depends on (or, if downstream, every stage depending on it).
+
+    :param stages:      List of stage dicts.
+    :param stage_name:  Name of the stage to start from.
+    :param downstream:  Follow consumers instead of producers.
+    """
+    stages_by_name = {stage["name"]: stage for stage in stages}
+    if stage_name not in stages_by_name:
+        raise ValueError(f"Unknown stage '{stage_name}'. Expected one of {list(stages_by_name)}.")
+
+    producers = stage_producers(stages)
+    reached = set()
+    pending = [stages_by_name[stage_name]]
+
+    while pending:
+        stage = pending.pop()
+        if stage["name"] in reached:
+            continue
+        reached.add(stage["name"])
+        if downstream:
+            pending.extend(other for other in stages if stage["output"] in other["inputs"])
+        else:
+            pending.extend(producers[input_name] for input_name in stage["inputs"] if input_name in producers)
+
+    return reached
+
+
+def select_stages(stages, from_stage=None, to_stage=None):
+    """
+    Selects the part of the pipeline between two stages, in run order.
+    `from_stage` keeps that stage and everything downstream of it, `to_stage` keeps that stage and everything it depends on.
+
+    :param stages:      List of stage dicts.
+    :param from_stage:  Name of the first stage to run, or None to start at the sources.
+    :param to_stage:    Name of the last stage to run, or None to run to the end.
+    :return:            List of stage dicts in run order.
+    """
+    selected = {stage["name"] for stage in stages}
+    if from_stage is not None:
+        selected &= stage_dependencies(stages, from_stage, downstream=True)
+    if to_stage is not None:
+        selected &= stage_dependencies(stages, to_stage)
+    if not selected:
+        raise ValueError(f"No stages between '{from_stage}' and '{to_stage}'.")
+    return [stage for stage in topological_order(stages) if stage["name"] in selected]
+
+
+def load_artifact(artifacts, artifact_name):
+    """Loads an artifact that is not produced in this run from its file."""
+    artifact = artifacts[artifact_name]
+    if not os.path.exists(artifact["path"]):
+        raise FileNotFoundError(
+            f"Artifact '{artifact_name}' is not produced by the selected stages and '{artifact['path']}' does not exist. "
+            f"Run its stage with the artifact written first."
+        )
+    log_info(f"Loading '{artifact_name}' from '{artifact['path']}'")
+    return artifact["load"](artifact["path"])
+
+
+def artifact_files(artifacts, artifact_name, value):
+    """Returns the files an artifact is written to."""
+    artifact = artifacts.get(artifact_name, {})
+    files = artifact.get("files", [artifact["path"]] if "path" in artifact else [])
+    return list(files(value) if callable(files) else files)
+
+
+def save_artifact(artifacts, artifact_name, value):
+    """Writes an artifact to its file."""
+    artifact = artifacts[artifact_name]
+    log_info(f"Saving '{artifact_name}' to '{artifact['path']}'")
+    os.makedirs(os.path.dirname(artifact["path"]) or ".", exist_ok=True)
+    artifact["save"](artifact["path"], value)
+
+# ===========================================
+# RUNNER
+# ===========================================
+
+def run_pipeline(stages, artifacts, from_stage=None, to_stage=None, write_artifacts=None, cache_dir=None, force=False, max_cache_size_bytes=DEFAULT_MAX_CACHE_SIZE_BYTES):
+    """
+    Runs the selected stages in one process, passing each stage's output object directly to its consumers.
+    Files are only written for written artifacts and for the outputs of the last selected stages,
+    and an object is released as soon as its last consumer has run.
+
+    With a cache directory, a stage whose fingerprint (inputs, config files, code and parameters) matches a cached
+    run is skipped: its written artifact files are restored and its output object is only unpickled if a stage
+    that does run needs it.
+
+    :param stages:                List of stage dicts.
+    :param artifacts:             Dict of artifact name -> artifact dict.
+    :param from_stage:            Name of the first stage to run, or None to start at the sources.
+    :param to_stage:              Name of the last stage to run, or None to run to the end.
+    :param write_artifacts:       Names of the artifacts to write. Defaults to the artifacts declared with "write": True.
+    :param cache_dir:             Stage cache directory, or None to run every stage.
+    :param force:                 Run every stage even if it is cached, and refresh its cache entry.
+    :param max_cache_size_bytes:  Least recently used cache entries are evicted above this size.
+    :return:                      Dict of artifact name -> output object of the last selected stages.
+    """
+    selected = select_stages(stages, from_stage, to_stage)
+    produced = {stage["output"] for stage in selected}
+    consumed = {input_name for stage in selected for input_name in stage["inputs"]}
+    final_outputs = produced - consumed
+
+    if write_artifacts is None:
+        write_artifacts = {name for name, artifact in artifacts.items() if artifact.get("write")}
+    write_artifacts = (set(write_artifacts) | final_outputs) & produced
+
+    log_info(f"Running stages: {' -> '.join(stage['name'] for stage in selected)}")
+
+    # Number of selected stages still waiting on each object
+    remaining_consumers = {}
+    for stage in selected:
+        for input_name in stage["inputs"]:
+            remaining_consumers[input_name] = remaining_consumers.get(input_name, 0) + 1
+
+    values = {}
+    fingerprints = {}
+    cached_fingerprints = {}    # Outputs restored from the cache that have not been unpickled yet
+    cache_report = []
+
+    def input_value(input_name):
+        if input_name in cached_fingerprints:
+            values[input_name] = load_cached_value(cache_dir, cached_fingerprints.pop(input_name))
+        elif input_name not in values:
+            values[input_name] = load_artifact(artifacts, input_name)
+        return values[input_name]
+
+    for stage in selected:
+        log_header(f"Stage: {stage['name']}")
+        output_name = stage["output"]
+        write_output = output_name in write_artifacts
+
+        cache_hit = False
+        if cache_dir is not None:
+            for input_name in stage["inputs"]:
+                if input_name not in fingerprints:
+                    fingerprints[input_name] = file_fingerprint(artifacts[input_name]["path"])
+            fingerprint = stage_fingerprint(stage, [fingerprints[input_name] for input_name in stage["inputs"]])
+            fingerprints[output_name] = fingerprint
+
+            manifest = None if force else load_cache_manifest(cache_dir, fingerprint)
+            if manifest is not None and (not write_output or manifest["files"] or artifacts.get(output_name, {}).get("save")):
+                cache_hit = True
+
+        if cache_hit:
+            log_info(f"Cache hit for '{stage['name']}' ({fingerprint[:12]}), skipping stage")
+            cached_fingerprints[output_name] = fingerprint
+            if write_output:
+                if manifest["files"]:
+                    log_info(f"Restoring '{output_name}' from the cache")
+                    restore_cached_files(cache_dir, fingerprint, manifest)
+                else:
+                    save_artifact(artifacts, output_name, input_value(output_name))
+            if output_name in final_outputs:
+                input_value(output_name)
+        else:
+            values[output_name] = stage["run"](*[input_value(input_name) for input_name in stage["inputs"]])
+            if "records" in stage:
+                record_name, record_count = stage["records"]
+                count_records(record_count(values[output_name]), record_name)
+
+            if write_output and artifacts.get(output_name, {}).get("save"):
+                save_artifact(artifacts, output_name, values[output_name])
+
+            if cache_dir is not None:
+                stored_files = artifact_files(artifacts, output_name, values[output_name]) if write_output else []
+                store_cache_entry(cache_dir, fingerprint, stage["name"], values[output_name], stored_files)
+
+        if cache_dir is not None:
+            cache_report.append((stage["name"], "hit" if cache_hit else "miss"))
+
+        for input_name in stage["inputs"]:
+            remaining_consumers[input_name] -= 1
+            if remaining_consumers[input_name] == 0 and input_name not in final_outputs:
+                values.pop(input_name, None)
+                cached_fingerprints.pop(input_name, None)
+
+    if cache_dir is not None:
+        log_header("Stage Cache")
+        for stage_name, result in cache_report:
+            log_info(f"{stage_name:<12} {result}")
+        hits = sum(result == "hit" for _, result in cache_report)
+        log_info(f"{hits} hit(s), {len(cache_report) - hits} miss(es)")
+
+        evicted = evict_cache_entries(cache_dir, max_cache_size_bytes)
+        if evicted:
+            log_info(f"Evicted {evicted} least recently used cache entries")
+
+    return {name: values[name] for name in final_outputs}
@@ -0,0 +1,228 @@
+import os
+import re
+import sys
+import time
+import pstats
+import cProfile
+import marshal
+import threading
+
+# ===========================================
+# PROFILING CONFIGURATION
+# ===========================================
+#
+# Opt-in profiling of every script run (script_start .. script_end), one profile per section (log_header .. next
+# log_header), so every pipeline stage gets its own .prof file. Enabled with SCOUTING_PROFILE=cprofile|sample or
+# configure_profiling(mode=...).
+#
+#   cprofile:  Deterministic cProfile of every call. Exact call counts, but Python calls get several times slower.
+#              A call still running when its section ends (e.g. main) is only counted in the section it started in.
+#   sample:    A background thread records the main thread's stack every PROFILE_SAMPLE_INTERVAL seconds. Overhead is
+#              about one stack walk per interval, low enough for live runs. Times are estimates; "calls" are sample counts.
+#
+# Both modes write pstats files (pstats.Stats, snakeviz, ...) to PROFILE_DIR/<script>_<timestamp>/:
+# "<NN>_<section>.prof" per section and "run.prof" with every section added up.
+
+PROFILE_ENV_VAR = "SCOUTING_PROFILE"
+PROFILE_MODES = ["cprofile", "sample"]
+PROFILE_MODE = os.environ.get(PROFILE_ENV_VAR, "").lower() or None     # None turns profiling off
+PROFILE_DIR = "outputs/profiles"
+PROFILE_TOP_N = 15
+PROFILE_SAMPLE_INTERVAL = 0.005
+
+PROFILE_STATE = {
+    "mode": PROFILE_MODE, "top_n": PROFILE_TOP_N, "profile_dir": PROFILE_DIR, "sample_interval": PROFILE_SAMPLE_INTERVAL,
+    "run": None, "section": None
+}
+
+# ===========================================
+# SAMPLING PROFILER
+# ===========================================
+
+class SamplingProfiler:
+    """
+    Statistical profiler with the enable/disable/create_stats interface of cProfile.Profile.
+    A daemon thread samples the stack of the thread that called enable; each sample adds the time since the previous
+    one to the self time of the innermost function and to the cumulative time of every function on the stack.
+    """
+
+    def __init__(self, interval=PROFILE_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.functions = {}     # Function key -> [samples, self seconds, cumulative seconds, {caller key: [samples, self seconds, cumulative seconds]}]
+        self.stats = {}
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    def enable(self):
+        """Starts sampling the calling thread."""
+        thread_id = threading.get_ident()
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.sample_loop, args=(thread_id,), name="SamplingProfiler", daemon=True)
+        self.thread.start()
+
+    def disable(self):
+        """Stops sampling."""
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+
+    def sample_loop(self, thread_id):
+        """Samples a thread's stack every interval until disabled."""
+        previous_time = time.perf_counter()
+        while not self.stop_event.wait(self.interval):
+            now = time.perf_counter()
+            frame = sys._current_frames().get(thread_id)
+            if frame is not None:
+                self.add_sample(frame, now - previous_time)
+            previous_time = now
+
+    def add_sample(self, frame, seconds):
+        """Adds one stack sample worth `seconds`."""
+        seen = set()
+        callee = None
+        depth = 0
+        while frame is not None:
+            code = frame.f_code
+            key = (code.co_filename, code.co_firstlineno, code.co_name)
+            function = self.functions.get(key)
+            if function is None:
+                function = self.functions[key] = [0, 0.0, 0.0, {}]
+            if depth == 0:
+                function[1] += seconds
+            if key not in seen:     # Recursive functions count once per sample
+                seen.add(key)
+                function[0] += 1
+                function[2] += seconds
+            if callee is not None:
+                caller = self.functions[callee][3].get(key)
+                if caller is None:
+                    caller = self.functions[callee][3][key] = [0, 0.0, 0.0]
+                caller[0] += 1
+                caller[1] += seconds if depth == 1 else 0.0
+                caller[2] += seconds
+            callee = key
+            depth += 1
+            frame = frame.f_back
+
+    def create_stats(self):
+        """Sets self.stats to the samples in pstats form: {function: (calls, calls, self s, cumulative s, {caller: (...)})}."""
+        self.disable()
+        self.stats = {}
+        for key, (samples, self_seconds, cumulative_seconds, callers) in self.functions.items():
+            caller_stats = {caller: (count, count, caller_self, caller_cumulative) for caller, (count, caller_self, caller_cumulative) in callers.items()}
+            self.stats[key] = (samples, samples, self_seconds, cumulative_seconds, caller_stats)
+
+# ===========================================
+# HELPER FUNCTIONS
+# ===========================================
+
+def file_name_part(name):
+    """Returns a name reduced to characters that are safe in file names."""
+    return re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_").lower() or "section"
+
+
+def new_profiler():
+    """Returns an enabled profiler of the configured mode."""
+    if PROFILE_STATE["mode"] == "sample":
+        profiler = SamplingProfiler(PROFILE_STATE["sample_interval"])
+    else:
+        profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def save_section_profile(run, section):
+    """Stops a section's profiler and writes its stats, unless nothing was recorded."""
+    profiler = section["profiler"]
+    profiler.disable()
+    profiler.create_stats()
+    if not profiler.stats:
+        return
+    path = os.path.join(run["profile_path"], f"{len(run['files']):02d}_{file_name_part(section['name'])}.prof")
+    with open(path, "wb") as profile_file:
+        marshal.dump(profiler.stats, profile_file)
+    run["files"].append(path)
+
+# ===========================================
+# RUN AND SECTION PROFILES
+# ===========================================
+
+def configure_profiling(mode=None, top_n=None, profile_dir=None, sample_interval=None):
+    """
+    Changes the profiling settings. Settings left as None keep their current value.
+
+    :param mode:             "cprofile", "sample", or "off" (from the next script_start).
+    :param top_n:            Number of functions in each script_end report.
+    :param profile_dir:      Directory the run profile directories are written to.
+    :param sample_interval:  Seconds between stack samples in sample mode.
+    """
+    if mode is not None and mode not in PROFILE_MODES + ["off"]:
+        raise ValueError(f"Unknown profiling mode '{mode}'. Expected one of {PROFILE_MODES + ['off']}.")
+    for setting, value in [("mode", mode), ("top_n", top_n), ("profile_dir", profile_dir), ("sample_interval", sample_interval)]:
+        if value is not None:
+            PROFILE_STATE[setting] = value
+    if PROFILE_STATE["mode"] == "off":
+        PROFILE_STATE["mode"] = None
+
+
+def start_profiling(script_name):
+    """Starts profiling a script run if profiling is on, replacing any run that was not ended."""
+    if PROFILE_STATE["mode"] in (None, "off"):
+        return
+    if PROFILE_STATE["mode"] not in PROFILE_MODES:
+        raise ValueError(f"Unknown profiling mode '{PROFILE_STATE['mode']}' (set with {PROFILE_ENV_VAR}). Expected one of {PROFILE_MODES}.")
+    end_profiling()
+
+    profile_path = os.path.join(PROFILE_STATE["profile_dir"], f"{file_name_part(script_name)}_{time.strftime('%Y%m%d_%H%M%S')}")
+    os.makedirs(profile_path, exist_ok=True)
+    PROFILE_STATE["run"] = {"script": script_name, "mode": PROFILE_STATE["mode"], "profile_path": profile_path, "files": []}
+    PROFILE_STATE["section"] = {"name": "start", "profiler": new_profiler()}
+
+
+def profile_section(title):
+    """Saves the current section's profile and starts profiling a new section. Does nothing outside a profiled run."""
+    run = PROFILE_STATE["run"]
+    if run is None:
+        return
+    save_section_profile(run, PROFILE_STATE["section"])
+    PROFILE_STATE["section"] = {"name": title, "profiler": new_profiler()}
+
+
+def end_profiling():
+    """
+    Saves the last section's profile and the profile of the whole run.
+
+    :return:  {"script", "mode", "profile_path", "files", "stats": pstats.Stats of the whole run or None}, or None if
+              the run was not profiled.
+    """
+    run, section = PROFILE_STATE["run"], PROFILE_STATE["section"]
+    if run is None:
+        return None
+    save_section_profile(run, section)
+    PROFILE_STATE["run"] = PROFILE_STATE["section"] = None
+
+    run["stats"] = None
+    if run["files"]:
+        run["stats"] = pstats.Stats(*run["files"])
+        run["stats"].dump_stats(os.path.join(run["profile_path"], "run.prof"))
+    return run
+
+
+def top_functions(stats, sort_key, top_n=None):
+    """
+    Returns the top functions of a pstats.Stats.
+
+    :param stats:     pstats.Stats.
+    :param sort_key:  "cumulative" or "self".
+    :param top_n:     Number of functions, or None for the configured top_n.
+    :return:          List of (function name, "file:line", calls, self seconds, cumulative seconds).
+    """
+    column = 3 if sort_key == "cumulative" else 2
+    rows = sorted(stats.stats.items(), key=lambda item: -item[1][column])[:top_n or PROFILE_STATE["top_n"]]
+    current_directory = os.getcwd() + os.sep
+    functions = []
+    for (file_name, line, name), (_, calls, self_seconds, cumulative_seconds, _) in rows:
+        location = f"{file_name.replace(current_directory, '')}:{line}" if file_name != "~" else "built-in"
+        functions.append((name, location, calls, self_seconds, cumulative_seconds))
+    return functions
@@ -0,0 +1,168 @@
+import os
+import sys
+import time
+import tracemalloc
+from utils.dictionary_manipulation import save_json
+
+try:
+    import resource
+except ImportError:     # Not available on Windows; peak RSS is reported as None there
+    resource = None
+
+# ===========================================
+# RUN METRICS CONFIGURATION
+# ===========================================
+#
+# Every script run (script_start .. script_end) is timed as a whole and per section (log_header .. next log_header).
+# Stages add to record counters with count_records, so every row also has a throughput.
+#
+# metrics.json: {"script", "started", "seconds", "rows": [row, ...]}, with one "script" row followed by one row per section.
+# Row:          {"kind": "script" | "section", "name", "start" (seconds after script_start), "seconds",
+#                "records": {counter: count}, "records_per_second": {counter: rate},
+#                "peak_rss_mb" (process peak so far), "traced_peak_mb" (peak of Python allocations within the row, or None)}
+
+METRICS_PATH = "outputs/metrics.json"
+WRITE_METRICS = True
+TRACE_MEMORY = False    # tracemalloc peak per section; makes Python allocations several times slower
+
+RUN_STATE = {"write": WRITE_METRICS, "trace_memory": TRACE_MEMORY, "metrics_path": METRICS_PATH, "run": None, "section": None}
+
+# ===========================================
+# HELPER FUNCTIONS
+# ===========================================
+
+def peak_rss_mb():
+    """Returns the peak resident set size of the process so far in MB, or None without the resource module."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3     # Bytes on macOS, kilobytes on Linux
+
+
+def new_row(kind, name):
+    """Returns a row that starts now."""
+    run = RUN_STATE["run"]
+    now = time.perf_counter()
+    return {
+        "kind": kind, "name": name, "start": now - run["start_time"] if run else 0.0, "seconds": None,
+        "records": {}, "records_per_second": {}, "peak_rss_mb": None, "traced_peak_mb": None, "start_time": now
+    }
+
+
+def finish_row(row, traced_peak=None):
+    """Sets a row's duration, throughput and memory as of now."""
+    seconds = time.perf_counter() - row.pop("start_time")
+    row["start"] = round(row["start"], 6)
+    row["seconds"] = round(seconds, 6)
+    row["records_per_second"] = {name: round(count / seconds, 3) if seconds > 0 else None for name, count in row["records"].items()}
+    row["peak_rss_mb"] = round(peak_rss_mb(), 3) if resource is not None else None
+    row["traced_peak_mb"] = round(traced_peak / 1e6, 3) if traced_peak is not None else None
+
+# ===========================================
+# RUN AND SECTION TIMERS
+# ===========================================
+
+def configure_metrics(write=None, trace_memory=None, metrics_path=None):
+    """
+    Changes the run metrics settings. Settings left as None keep their current value.
+
+    :param write:         False to skip writing metrics.json.
+    :param trace_memory:  True to also record the tracemalloc peak of every section (from the next script_start).
+    :param metrics_path:  Path of metrics.json.
+    """
+    for setting, value in [("write", write), ("trace_memory", trace_memory), ("metrics_path", metrics_path)]:
+        if value is not None:
+            RUN_STATE[setting] = value
+
+
+def start_run(script_name):
+    """Starts timing a script run, replacing any run that was not ended."""
+    run = {"script": script_name, "started": time.strftime("%Y-%m-%d %H:%M:%S"), "start_time": time.perf_counter(), "traced_peak": None}
+    RUN_STATE["run"], RUN_STATE["section"] = run, None
+    run["rows"] = [new_row("script", script_name)]
+
+    if RUN_STATE["trace_memory"]:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+
+
+def traced_peak_since_reset():
+    """Returns the tracemalloc peak since the last reset and resets it, or None if memory is not traced."""
+    if not tracemalloc.is_tracing():
+        return None
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.reset_peak()
+    return peak
+
+
+def end_section():
+    """Ends the current section, if any."""
+    run, section = RUN_STATE["run"], RUN_STATE["section"]
+    if run is None or section is None:
+        return
+    traced_peak = traced_peak_since_reset()
+    if traced_peak is not None:
+        run["traced_peak"] = max(run["traced_peak"] or 0, traced_peak)
+    finish_row(section, traced_peak)
+    RUN_STATE["section"] = None
+
+
+def start_section(title):
+    """Ends the current section and starts timing a new one. Does nothing outside a run."""
+    run = RUN_STATE["run"]
+    if run is None:
+        return
+    if RUN_STATE["section"] is None:
+        traced_peak = traced_peak_since_reset()     # Allocations before the first section only count for the whole run
+        if traced_peak is not None:
+            run["traced_peak"] = max(run["traced_peak"] or 0, traced_peak)
+    end_section()
+    RUN_STATE["section"] = new_row("section", title)
+    run["rows"].append(RUN_STATE["section"])
+
+
+def count_records(count=1, name="records"):
+    """
+    Adds to a record counter of the current section and of the whole run, e.g. count_records(len(entries), "entries").
+
+    :param count:  Number of records processed.
+    :param name:   Counter name; every counter gets its own records/sec.
+    """
+    run = RUN_STATE["run"]
+    if run is None:
+        return
+    rows = [run["rows"][0]] if RUN_STATE["section"] is None else [run["rows"][0], RUN_STATE["section"]]
+    for row in rows:
+        row["records"][name] = row["records"].get(name, 0) + count
+
+
+def end_run():
+    """
+    Ends the current section and the run.
+
+    :return:  The run metrics dict (see the format above), or None if no run was started.
+    """
+    run = RUN_STATE["run"]
+    if run is None:
+        return None
+    end_section()
+    script_row = run["rows"][0]
+    traced_peak = traced_peak_since_reset()
+    if traced_peak is not None or run["traced_peak"] is not None:
+        traced_peak = max(traced_peak or 0, run["traced_peak"] or 0)
+    finish_row(script_row, traced_peak)
+
+    RUN_STATE["run"] = None
+    return {"script": run["script"], "started": run["started"], "seconds": script_row["seconds"], "rows": run["rows"]}
+
+
+def save_run_metrics(run):
+    """Writes a run's metrics to the configured metrics.json, unless writing is off. Returns the path, or None."""
+    if not RUN_STATE["write"]:
+        return None
+    metrics_path = RUN_STATE["metrics_path"]
+    if os.path.dirname(metrics_path):
+        os.makedirs(os.path.dirname(metrics_path), exist_ok=True)
+    save_json(metrics_path, run)
+    return metrics_path
@@ -0,0 +1,291 @@
+from utils.dictionary_manipulation import flatten_vars_in_dict
+
+# ===========================================
+# VALIDATION CONFIGURATION
+# ===========================================
+
+STATISTICAL_DATA_TYPE_PYTHON_TYPES = {
+    "quantitative": (int, float),
+    "categorical": str,
+    "binary": bool
+}
+
+BINARY_STRING_VALUES = {"true": True, "false": False}
+
+INVALID_VALUE = object()    # Returned by a compiled value check when the value fails validation
+MISSING_VALUE = object()    # Returned by lookup_flattened_value when the flattened key does not exist
+
+# ===========================================
+# HELPER FUNCTIONS
+# ===========================================
+
+def expected_python_type(data_type):
+    """Returns the corresponding Python type for a given statistical data type. Defaults to str if unknown."""
+    return STATISTICAL_DATA_TYPE_PYTHON_TYPES.get(data_type, str)
+
+
+def section_void_reason(section):
+    """Returns the voided entry reason for a section (e.g. 'matchapp_variables' -> 'Matchapp variables contained ...')."""
+    return f"{section.replace('_', ' ').capitalize()} contained missing or incorrect keys."
+
+
+def is_unflattened_dict(value):
+    """Returns True if flatten_vars_in_dict would keep flattening into this value."""
+    return isinstance(value, dict) and "statistical_data_type" not in value
+
+
+def lookup_flattened_value(data, key_parts):
+    """
+    Returns the value flatten_vars_in_dict(data) would store under '.'.join(key_parts), without flattening the data.
+    Returns MISSING_VALUE if the flattened key would not exist.
+    """
+    if key_parts[0] not in data:
+        return MISSING_VALUE
+    value = data[key_parts[0]]
+
+    for key_part in key_parts[1:]:
+        if not is_unflattened_dict(value) or key_part not in value:
+            return MISSING_VALUE
+        value = value[key_part]
+
+    if is_unflattened_dict(value):
+        return MISSING_VALUE
+    return value
+
+
+def section_fields(section, expected_structure):
+    """
+    Returns the (key, key parts, expected info) fields validated for a section of the expected data structure.
+    Metadata keeps its nested structure, every other section is validated as flattened variables.
+    """
+    if section == "metadata":
+        return [(key, (key,), expected_info) for key, expected_info in expected_structure.items()]
+    return [(full_key, tuple(full_key.split(".")), expected_info) for full_key, expected_info in flatten_vars_in_dict(expected_structure).items()]
+
+# ===========================================
+# COMPILERS
+# ===========================================
+
+def compile_value_check(full_key_path, expected_info):
+    """
+    Compiles the checks for a single expected variable into one closure.
+    Type lookups, categorical value sets and warning prefixes are resolved once here instead of once per value.
+
+    :param full_key_path:  Dot-separated path of the variable, used in warning messages.
+    :param expected_info:  Expected variable info (e.g. {'statistical_data_type': 'categorical', 'values': [...]}).
+    :return:               check(value, warnings) returning the cleaned value, or INVALID_VALUE after appending a warning.
+    """
+    data_type = expected_info.get("statistical_data_type")
+    python_type = expected_python_type(data_type)
+    incorrect_type_message = f"[WARNING] Incorrect type for '{full_key_path}'. Expected {python_type}, got "
+
+    if data_type == "binary":
+        def check_binary(value, warnings):
+            if isinstance(value, bool):
+                return value
+            if isinstance(value, str):
+                binary_value = BINARY_STRING_VALUES.get(value.lower())
+                if binary_value is None:
+                    warnings.append(f"[WARNING] Invalid binary value '{value}' for '{full_key_path}'. Expected 'true' or 'false'.")
+                    return INVALID_VALUE
+                return binary_value
+            warnings.append(f"[WARNING] Incorrect type for '{full_key_path}'. Expected binary (True/False), got {type(value).__name__}.")
+            return INVALID_VALUE
+        return check_binary
+
+    if data_type == "categorical" and "values" in expected_info:
+        allowed_values = frozenset(expected_info["values"])
+        invalid_value_suffix = f"' for '{full_key_path}'. Expected one of {expected_info['values']}."
+
+        def check_categorical(value, warnings):
+            try:
+                is_allowed = value in allowed_values
+            except TypeError:  # Unhashable values can never be one of the allowed values
+                is_allowed = False
+            if not is_allowed:
+                warnings.append(f"[WARNING] Invalid value '{value}" + invalid_value_suffix)
+                return INVALID_VALUE
+            if not isinstance(value, str):
+                warnings.append(f"{incorrect_type_message}{type(value).__name__}.")
+                return INVALID_VALUE
+            return value
+        return check_categorical
+
+    def check_type(value, warnings):
+        if isinstance(value, python_type):
+            return value
+        warnings.append(f"{incorrect_type_message}{type(value).__name__}.")
+        return INVALID_VALUE
+    return check_type
+
+
+def compile_structure_validator(expected_structure, void_missing_entries=True, path=""):
+    """
+    Compiles a (possibly nested) expected structure into a flat tuple of per-field checks.
+
+    :param expected_structure:    Expected structure dict (e.g. the 'metadata' section of expected_data_structure.json).
+    :param void_missing_entries:  Return None if any key is missing or invalid.
+    :param path:                  Dot-separated path of the structure, used in warning messages.
+    :return:                      validate(data, warnings) returning the validated dict, or None if voided.
+    """
+    field_plan = []
+
+    for key, expected_info in expected_structure.items():
+        full_key_path = f"{path}.{key}" if path else key
+
+        if isinstance(expected_info, dict) and "statistical_data_type" not in expected_info:
+            check = compile_structure_validator(expected_info, void_missing_entries, full_key_path)
+        else:
+            check = compile_value_check(full_key_path, expected_info)
+        field_plan.append((key, check, f"[WARNING] Missing key '{full_key_path}'."))
+
+    field_plan = tuple(field_plan)
+
+    def validate(data, warnings):
+        validated = {}
+        missing_or_invalid_keys = False
+
+        for key, check, missing_key_message in field_plan:
+            if key not in data:
+                warnings.append(missing_key_message)
+                missing_or_invalid_keys = True
+                continue
+
+            value = check(data[key], warnings)
+            if value is INVALID_VALUE:
+                missing_or_invalid_keys = True
+            else:
+                validated[key] = value
+
+        if void_missing_entries and missing_or_invalid_keys:
+            return None
+        return validated
+
+    return validate
+
+
+def generate_fast_check_condition(check_name, expected_info):
+    """
+    Returns a Python expression for the common valid case of a variable, used inline in generated validators.
+    Values that fail the expression fall back to the compiled value check, which converts them or adds the warning.
+    """
+    data_type = expected_info.get("statistical_data_type")
+
+    if data_type == "binary":
+        return "value.__class__ is bool"
+    if data_type == "categorical" and "values" in expected_info:
+        return f"value.__class__ is str and value in {check_name}_values"
+    return f"isinstance(value, {check_name}_type)"
+
+
+def generate_entry_validator_source(expected_data_structure, void_missing_entries=True):
+    """
+    Generates the Python source of a validate_entry function specialized to the expected data structure.
+    Every field check is unrolled into straight-line code, so validating an entry makes no per-field
+    function calls unless a value has to be converted or warned about.
+
+    :param expected_data_structure:  The expected data structure config.
+    :param void_missing_entries:     Void the entry if any key in any section is missing or invalid.
+    :return:                         (source, namespace) to exec the generated validate_entry in.
+    """
+    namespace = {
+        "INVALID_VALUE": INVALID_VALUE,
+        "MISSING_VALUE": MISSING_VALUE,
+        "BINARY_STRING_VALUES": BINARY_STRING_VALUES,
+        "lookup_flattened_value": lookup_flattened_value
+    }
+    lines = [
+        "def validate_entry(warnings, voided_entries, entry):",
+        "    validated_entry = {}"
+    ]
+
+    for section_index, (section, expected_structure) in enumerate(expected_data_structure.items()):
+        section_name = f"section_{section_index}"
+        namespace[f"{section_name}_reason"] = section_void_reason(section)
+        lines += [
+            f"    if {section!r} in entry:",
+            f"        data = entry[{section!r}]",
+            "        validated = {}",
+            "        invalid = False"
+        ]
+
+        for field_index, (key, key_parts, expected_info) in enumerate(section_fields(section, expected_structure)):
+            check_name = f"{section_name}_field_{field_index}"
+            namespace[f"{check_name}_missing"] = f"[WARNING] Missing key '{key}'."
+
+            if section != "metadata" and len(key_parts) > 1:
+                namespace[f"{check_name}_key_parts"] = key_parts
+                lines.append(f"        value = lookup_flattened_value(data, {check_name}_key_parts)")
+            elif section != "metadata":
+                lines += [
+                    f"        value = data.get({key!r}, MISSING_VALUE)",
+                    "        if isinstance(value, dict) and 'statistical_data_type' not in value:",
+                    "            value = MISSING_VALUE"
+                ]
+            else:
+                lines.append(f"        value = data.get({key!r}, MISSING_VALUE)")
+
+            lines += [
+                "        if value is MISSING_VALUE:",
+                f"            warnings.append({check_name}_missing)",
+                "            invalid = True"
+            ]
+
+            # Nested metadata structures keep the recursive behaviour: they never invalidate their parent
+            if isinstance(expected_info, dict) and "statistical_data_type" not in expected_info:
+                namespace[check_name] = compile_structure_validator(expected_info, void_missing_entries, key)
+                lines += [
+                    "        else:",
+                    f"            validated[{key!r}] = {check_name}(value, warnings)"
+                ]
+                continue
+
+            namespace[check_name] = compile_value_check(key, expected_info)
+            namespace[f"{check_name}_type"] = expected_python_type(expected_info.get("statistical_data_type"))
+            if "values" in expected_info:
+                namespace[f"{check_name}_values"] = frozenset(expected_info["values"])
+            lines += [
+                f"        elif {generate_fast_check_condition(check_name, expected_info)}:",
+                f"            validated[{key!r}] = value"
+            ]
+            if expected_info.get("statistical_data_type") == "binary":
+                lines += [
+                    "        elif value.__class__ is str and value in BINARY_STRING_VALUES:",
+                    f"            validated[{key!r}] = BINARY_STRING_VALUES[value]"
+                ]
+            lines += [
+                "        else:",
+                f"            value = {check_name}(value, warnings)",
+                "            if value is INVALID_VALUE:",
+                "                invalid = True",
+                "            else:",
+                f"                validated[{key!r}] = value"
+            ]
+
+        if void_missing_entries:
+            lines += [
+                "        if invalid:",
+                f"            voided_entries.append({{'entry': entry, 'reason': {section_name}_reason}})",
+                "            return None"
+            ]
+        lines.append(f"        validated_entry[{section!r}] = validated")
+
+    lines.append("    return validated_entry")
+    return "\n".join(lines) + "\n", namespace
+
+
+def compile_entry_validator(expected_data_structure, void_missing_entries=True):
+    """
+    Compiles expected_data_structure.json once into a validator for whole entries.
+    'metadata' is validated as a nested structure and every other section as flattened variables,
+    read straight from the nested entry so entries never have to be flattened.
+
+    :param expected_data_structure:  The expected data structure config.
+    :param void_missing_entries:     Void the entry if any key in any section is missing or invalid.
+    :return:                         validate_entry(warnings, voided_entries, entry) returning the cleaned entry, or None if voided.
+    """
+    source, namespace = generate_entry_validator_source(expected_data_structure, void_missing_entries)
+    exec(compile(source, "<compiled entry validator>", "exec"), namespace)
+    validate_entry = namespace["validate_entry"]
+    validate_entry.source = source
+    return validate_entry
@@ -0,0 +1,26 @@
+import os
+import sys
+import importlib.util
+
+# Script Importing Functions
+def import_script(script_path, module_name=None):
+    """
+    Imports a pipeline script (e.g. 'data_generation_scripts/02_data_generation.py') as a module.
+    Numbered script names are not valid identifiers, so they cannot be imported with a normal import statement.
+    """
+    if module_name is None:
+        module_name = os.path.splitext(os.path.basename(script_path))[0]
+        module_name = "script_" + module_name.replace("-", "_")
+
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    spec = importlib.util.spec_from_file_location(module_name, script_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except Exception:
+        del sys.modules[module_name]
+        raise
+    return module
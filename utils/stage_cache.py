@@ -0,0 +1,178 @@
+import os
+import json
+import time
+import pickle
+import shutil
+import hashlib
+from utils.dictionary_manipulation import retrieve_json, save_json
+
+# ===========================================
+# STAGE CACHE CONFIGURATION
+# ===========================================
+
+DEFAULT_CACHE_DIR = "data/cache/stages"
+DEFAULT_MAX_CACHE_SIZE_BYTES = 2 * 1024 ** 3    # Least recently used entries are evicted above this size
+CACHE_FORMAT_VERSION = 1                        # Bump to invalidate every existing entry
+HASH_CHUNK_SIZE = 1 << 20
+
+CACHE_VALUE_FILE = "value.pkl"
+CACHE_MANIFEST_FILE = "manifest.json"
+CACHE_FILES_DIR = "files"
+
+# ===========================================
+# FINGERPRINTING
+# ===========================================
+
+def update_hash_with_file(hasher, path):
+    """
+    Feeds a file's path and bytes into a hasher. A missing file hashes as missing rather than failing,
+    and a directory (e.g. a columnar store) hashes as every file under it, in sorted order.
+    """
+    hasher.update(f"file:{path}\0".encode())
+    if not os.path.exists(path):
+        hasher.update(b"<missing>\0")
+        return
+    if os.path.isdir(path):
+        for directory, directory_names, file_names in os.walk(path):
+            directory_names.sort()
+            for file_name in sorted(file_names):
+                update_hash_with_file(hasher, os.path.join(directory, file_name))
+        return
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    hasher.update(b"\0")
+
+
+def file_fingerprint(path):
+    """Returns the SHA-256 hex digest of a file's path and bytes."""
+    hasher = hashlib.sha256()
+    update_hash_with_file(hasher, path)
+    return hasher.hexdigest()
+
+
+def stage_fingerprint(stage, input_fingerprints):
+    """
+    Fingerprints everything a stage's result depends on.
+
+    :param stage:               Stage dict. Its optional "fingerprint" dict lists the input "files" (data and config JSON),
+                                the "code" files of the stage and any JSON-serializable "params" (e.g. chart configs).
+    :param input_fingerprints:  Fingerprints of the stage's input objects, in input order.
+    :return:                    SHA-256 hex digest.
+    """
+    spec = stage.get("fingerprint", {})
+    hasher = hashlib.sha256()
+    hasher.update(f"format:{CACHE_FORMAT_VERSION}\0stage:{stage['name']}\0".encode())
+
+    for input_fingerprint in input_fingerprints:
+        hasher.update(f"input:{input_fingerprint}\0".encode())
+    for path in spec.get("files", []):
+        update_hash_with_file(hasher, path)
+    for path in spec.get("code", []):
+        update_hash_with_file(hasher, path)
+
+    hasher.update(json.dumps(spec.get("params", {}), sort_keys=True, default=repr).encode())
+    return hasher.hexdigest()
+
+# ===========================================
+# CACHE ENTRIES
+# ===========================================
+
+def cache_entry_path(cache_dir, fingerprint):
+    """Returns the directory of a cache entry."""
+    return os.path.join(cache_dir, fingerprint)
+
+
+def load_cache_manifest(cache_dir, fingerprint):
+    """
+    Returns the manifest of a cache entry, or None if there is no complete entry for the fingerprint.
+    Marks the entry as recently used.
+    """
+    manifest_path = os.path.join(cache_entry_path(cache_dir, fingerprint), CACHE_MANIFEST_FILE)
+    try:
+        manifest = retrieve_json(manifest_path)
+    except (OSError, ValueError):
+        return None
+    os.utime(manifest_path)
+    return manifest
+
+
+def load_cached_value(cache_dir, fingerprint):
+    """Unpickles the output object stored in a cache entry."""
+    with open(os.path.join(cache_entry_path(cache_dir, fingerprint), CACHE_VALUE_FILE), "rb") as value_file:
+        return pickle.load(value_file)
+
+
+def restore_cached_files(cache_dir, fingerprint, manifest):
+    """Copies the artifact files stored in a cache entry back to their original paths."""
+    entry_path = cache_entry_path(cache_dir, fingerprint)
+    for original_path, stored_name in manifest["files"]:
+        os.makedirs(os.path.dirname(original_path) or ".", exist_ok=True)
+        shutil.copyfile(os.path.join(entry_path, CACHE_FILES_DIR, stored_name), original_path)
+
+
+def store_cache_entry(cache_dir, fingerprint, stage_name, value, file_paths):
+    """
+    Stores a stage's output object and the artifact files it wrote.
+    The entry is built in a temporary directory and renamed into place, so a cache entry is either complete or absent.
+
+    :param cache_dir:    Cache directory.
+    :param fingerprint:  Stage fingerprint.
+    :param stage_name:   Name of the stage, kept in the manifest for reference.
+    :param value:        The stage's output object. Must be picklable.
+    :param file_paths:   Artifact files the stage wrote.
+    """
+    entry_path = cache_entry_path(cache_dir, fingerprint)
+    temporary_path = f"{entry_path}.tmp-{os.getpid()}"
+    shutil.rmtree(temporary_path, ignore_errors=True)
+    os.makedirs(os.path.join(temporary_path, CACHE_FILES_DIR))
+
+    with open(os.path.join(temporary_path, CACHE_VALUE_FILE), "wb") as value_file:
+        pickle.dump(value, value_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    stored_files = []
+    for index, path in enumerate(file_paths):
+        stored_name = f"{index}_{os.path.basename(path)}"
+        shutil.copyfile(path, os.path.join(temporary_path, CACHE_FILES_DIR, stored_name))
+        stored_files.append([path, stored_name])
+
+    save_json(os.path.join(temporary_path, CACHE_MANIFEST_FILE), {"stage": stage_name, "created": time.time(), "files": stored_files}, indent=None)
+
+    shutil.rmtree(entry_path, ignore_errors=True)
+    os.replace(temporary_path, entry_path)
+
+
+def directory_size(path):
+    """Returns the total size in bytes of the files under a directory."""
+    return sum(
+        os.path.getsize(os.path.join(directory, file_name))
+        for directory, _, file_names in os.walk(path)
+        for file_name in file_names
+    )
+
+
+def evict_cache_entries(cache_dir, max_size_bytes=DEFAULT_MAX_CACHE_SIZE_BYTES):
+    """
+    Deletes the least recently used cache entries until the cache fits in max_size_bytes.
+
+    :return:  Number of evicted entries.
+    """
+    if not os.path.isdir(cache_dir):
+        return 0
+
+    entries = []
+    for name in os.listdir(cache_dir):
+        manifest_path = os.path.join(cache_dir, name, CACHE_MANIFEST_FILE)
+        if os.path.exists(manifest_path):
+            entries.append((os.path.getmtime(manifest_path), directory_size(os.path.join(cache_dir, name)), name))
+
+    total_size = sum(size for _, size, _ in entries)
+    evicted = 0
+    for _, size, name in sorted(entries):
+        if total_size <= max_size_bytes:
+            break
+        shutil.rmtree(os.path.join(cache_dir, name), ignore_errors=True)
+        total_size -= size
+        evicted += 1
+
+    return evicted
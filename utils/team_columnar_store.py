@@ -0,0 +1,333 @@
+import os
+import json
+import shutil
+import hashlib
+import numpy as np
+from utils.dictionary_manipulation import retrieve_json, save_json
+
+# ===========================================
+# TEAM COLUMNAR STORE
+# ===========================================
+#
+# Team-indexed match data in ragged columnar (CSR) form. Every match section variable (metadata included) is one flat
+# array with a row per match; rows are sorted by team, and team i's matches are rows team_offsets[i]:team_offsets[i + 1]
+# in their original order.
+#
+# Store:   {"teams": [team ids], "team_offsets": int64 array, "columns": [column dicts]}
+# Column:  {"section": str, "key": str, "kind": "number" | "bool" | "json", "values": array,
+#           "missing": bool array or None, "integer": bool array or None, "categories": [JSON strings] (json kind only)}
+#
+#   number:  float64 values, NaN where the value is None or the key is missing. `integer` marks the values that were ints.
+#   bool:    bool values. Only used when every present value is a bool.
+#   json:    int32 codes into `categories`, the JSON encoding of every distinct value (strings, mixed types, None).
+#   missing: Rows whose match does not have the key at all, or None if every match has it.
+#
+# On disk a store is a directory holding a manifest and one .npy file per array, which are memory-mapped on load.
+
+STORE_MANIFEST_FILE = "manifest.json"
+STORE_FORMAT_VERSION = 1
+
+# ===========================================
+# HELPER FUNCTIONS
+# ===========================================
+
+def column_kind(values):
+    """Returns the storage kind of a column from its present values."""
+    if all(type(value) in (int, float) or value is None for value in values):
+        return "number"
+    if all(type(value) is bool for value in values):
+        return "bool"
+    return "json"
+
+
+def encode_column(section, key, rows):
+    """
+    Encodes one variable of every match.
+
+    :param section:  Match section of the variable (e.g. 'metadata', 'matchapp_variables').
+    :param key:      Variable name within the section.
+    :param rows:     The section dict of every match, in store row order.
+    :return:         Column dict.
+    """
+    missing = np.fromiter((key not in row for row in rows), dtype=bool, count=len(rows))
+    values = [row.get(key) for row in rows]
+    present_values = [value for value, is_missing in zip(values, missing.tolist()) if not is_missing]
+    kind = column_kind(present_values)
+
+    column = {"section": section, "key": key, "kind": kind, "missing": missing if missing.any() else None, "integer": None}
+
+    if kind == "number":
+        column["values"] = np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+        integer = np.fromiter((type(value) is int for value in values), dtype=bool, count=len(values))
+        column["integer"] = integer if integer.any() else None
+    elif kind == "bool":
+        column["values"] = np.array([bool(value) for value in values], dtype=bool)
+    else:
+        encoded_values = [json.dumps(value) for value in values]
+        categories = list(dict.fromkeys(encoded for encoded, is_missing in zip(encoded_values, missing.tolist()) if not is_missing))
+        codes = {encoded: code for code, encoded in enumerate(categories)}
+        column["values"] = np.array([codes.get(encoded, -1) if not is_missing else -1 for encoded, is_missing in zip(encoded_values, missing.tolist())], dtype=np.int32)
+        column["categories"] = categories
+
+    return column
+
+
+def decode_column(column, start=0, end=None):
+    """
+    Returns the Python values of rows start:end of a column, with None for missing keys.
+
+    :param column:  Column dict.
+    :param start:   First row.
+    :param end:     End row (exclusive), or None for the last row.
+    """
+    values = column["values"][start:end]
+    if column["kind"] == "number":
+        integer = column["integer"][start:end].tolist() if column["integer"] is not None else None
+        decoded = [None if value != value else value for value in values.tolist()]
+        if integer is not None:
+            decoded = [int(value) if is_integer else value for value, is_integer in zip(decoded, integer)]
+        return decoded
+    if column["kind"] == "bool":
+        return values.tolist()
+    categories = [json.loads(category) for category in column["categories"]]
+    return [categories[code] if code >= 0 else None for code in values.tolist()]
+
+# ===========================================
+# BUILDING AND CONVERTING
+# ===========================================
+
+def build_team_columnar_store(team_data):
+    """
+    Builds a store from team-based match data.
+
+    :param team_data:  Dict of team -> {"matches": [match dicts]}, as returned by group_matches_by_team.
+    :return:           Store dict.
+    """
+    teams = list(team_data)
+    match_counts = [len(team_data[team].get("matches", [])) for team in teams]
+    matches = [match for team in teams for match in team_data[team].get("matches", [])]
+
+    # Sections and keys in order of first appearance
+    section_keys = {}
+    for match in matches:
+        for section, variables in match.items():
+            keys = section_keys.setdefault(section, {})
+            for key in variables:
+                keys[key] = None
+
+    columns = []
+    for section, keys in section_keys.items():
+        rows = [match.get(section, {}) for match in matches]
+        columns.extend(encode_column(section, key, rows) for key in keys)
+
+    return {
+        "teams": teams,
+        "team_offsets": np.concatenate(([0], np.cumsum(match_counts, dtype=np.int64))).astype(np.int64),
+        "columns": columns
+    }
+
+
+def team_data_from_store(store):
+    """
+    Rebuilds team-based match data from a store, with the same teams, matches and values.
+    Keys missing from a match are left out of it again; within a section, keys follow the store's column order.
+
+    :param store:  Store dict.
+    :return:       Dict of team -> {"matches": [match dicts]}.
+    """
+    offsets = store["team_offsets"].tolist()
+    row_count = offsets[-1]
+    matches = [{} for _ in range(row_count)]
+
+    for column in store["columns"]:
+        section, key = column["section"], column["key"]
+        missing = column["missing"].tolist() if column["missing"] is not None else None
+        for row, value in enumerate(decode_column(column)):
+            if missing is None or not missing[row]:
+                matches[row].setdefault(section, {})[key] = value
+
+    return {
+        team: {"matches": matches[start:end]}
+        for team, start, end in zip(store["teams"], offsets[:-1], offsets[1:])
+    }
+
+# ===========================================
+# TEAM LOOKUPS AND REDUCTIONS
+# ===========================================
+
+def find_column(store, key, section=None):
+    """
+    Returns the column dict of a variable. Raises KeyError if the store has no such column.
+
+    :param store:    Store dict.
+    :param key:      Variable name (flattened, e.g. 'var4.var1').
+    :param section:  Section to look in, or None for the first section that has the variable.
+    """
+    for column in store["columns"]:
+        if column["key"] == key and section in (None, column["section"]):
+            return column
+    raise KeyError(f"No column '{key}'" + (f" in section '{section}'." if section else "."))
+
+
+def team_match_counts(store):
+    """Returns the number of matches of every team."""
+    return np.diff(store["team_offsets"])
+
+
+def team_reduce(ufunc, values, team_offsets, empty_value=0):
+    """
+    Reduces every team's slice of a per-match array with a ufunc (e.g. np.add, np.maximum) in one call.
+
+    :param ufunc:         NumPy ufunc to reduce with.
+    :param values:        Per-match array, in store row order.
+    :param team_offsets:  The store's team offsets.
+    :param empty_value:   Result for teams without matches.
+    :return:              Array with one result per team.
+    """
+    team_offsets = np.asarray(team_offsets, dtype=np.int64)
+    counts = np.diff(team_offsets)
+    result = np.full(len(counts), empty_value, dtype=np.result_type(values.dtype, type(empty_value)))
+    if len(values):
+        # Only teams with matches are reduced: each one's slice then ends where the next one's starts
+        result[counts > 0] = ufunc.reduceat(values, team_offsets[:-1][counts > 0])
+    return result
+
+
+def select_teams(store, team_indices):
+    """
+    Returns a store of only some of the teams, with copies of their rows.
+
+    :param store:         Store dict.
+    :param team_indices:  Positions of the teams to keep, in the order to keep them.
+    """
+    offsets = np.asarray(store["team_offsets"], dtype=np.int64)
+    team_indices = np.asarray(team_indices, dtype=np.int64)
+    rows = np.concatenate([np.arange(offsets[index], offsets[index + 1]) for index in team_indices.tolist()] or [np.empty(0, dtype=np.int64)])
+
+    columns = []
+    for column in store["columns"]:
+        selected = {**column, "values": np.asarray(column["values"])[rows]}
+        for part in ("missing", "integer"):
+            if column[part] is not None:
+                part_rows = np.asarray(column[part])[rows]
+                selected[part] = part_rows if part_rows.any() else None
+        columns.append(selected)
+
+    match_counts = offsets[team_indices + 1] - offsets[team_indices]
+    return {
+        "teams": [store["teams"][index] for index in team_indices.tolist()],
+        "team_offsets": np.concatenate(([0], np.cumsum(match_counts, dtype=np.int64))).astype(np.int64),
+        "columns": columns
+    }
+
+
+def team_digests(store, row_counts=None):
+    """
+    Returns a SHA-256 digest of every team's matches, used to find the teams whose matches changed between runs.
+    Values are digested as JSON, so a digest depends neither on the column kinds nor on the other teams in the store.
+
+    :param store:       Store dict.
+    :param row_counts:  Number of leading matches of every team to digest, or None for all of them.
+    :return:            List with one hex digest per team.
+    """
+    offsets = np.asarray(store["team_offsets"], dtype=np.int64)
+    starts = offsets[:-1].tolist()
+    ends = offsets[1:].tolist() if row_counts is None else (offsets[:-1] + np.asarray(row_counts, dtype=np.int64)).tolist()
+    columns = sorted(store["columns"], key=lambda column: (column["section"], column["key"]))
+
+    digests = []
+    for start, end in zip(starts, ends):
+        digest = hashlib.sha256()
+        for column in columns:
+            missing = np.asarray(column["missing"][start:end]) if column["missing"] is not None else np.zeros(end - start, dtype=bool)
+            if missing.all():
+                continue  # The team's matches do not have the variable
+            digest.update(json.dumps([column["section"], column["key"]]).encode())
+            digest.update(missing.tobytes())
+            if column["kind"] == "json":
+                categories = column["categories"]
+                digest.update(("[" + ", ".join(categories[code] if code >= 0 else "null" for code in column["values"][start:end].tolist()) + "]").encode())
+            else:
+                digest.update(json.dumps(decode_column(column, start, end)).encode())
+        digests.append(digest.hexdigest())
+    return digests
+
+# ===========================================
+# SAVING AND LOADING
+# ===========================================
+
+def column_array_names(index, column):
+    """Returns the array names of a column, as stored in its .npy file names."""
+    names = {"values": f"column_{index}_values"}
+    for part in ("missing", "integer"):
+        if column[part] is not None:
+            names[part] = f"column_{index}_{part}"
+    return names
+
+
+def store_files(store_path):
+    """Returns every file of a saved store."""
+    return sorted(os.path.join(store_path, file_name) for file_name in os.listdir(store_path))
+
+
+def save_team_columnar_store(store_path, store):
+    """
+    Saves a store as a directory of .npy files and a manifest.
+    The directory is written next to the target and renamed into place, so a store is either complete or absent.
+
+    :param store_path:  Directory to save the store to.
+    :param store:       Store dict.
+    """
+    temporary_path = f"{store_path}.tmp-{os.getpid()}"
+    shutil.rmtree(temporary_path, ignore_errors=True)
+    os.makedirs(temporary_path)
+
+    np.save(os.path.join(temporary_path, "team_offsets.npy"), np.asarray(store["team_offsets"], dtype=np.int64))
+
+    manifest_columns = []
+    for index, column in enumerate(store["columns"]):
+        array_names = column_array_names(index, column)
+        for part, array_name in array_names.items():
+            np.save(os.path.join(temporary_path, f"{array_name}.npy"), np.asarray(column[part]))
+        manifest_column = {"section": column["section"], "key": column["key"], "kind": column["kind"], "arrays": array_names}
+        if column["kind"] == "json":
+            manifest_column["categories"] = column["categories"]
+        manifest_columns.append(manifest_column)
+
+    save_json(os.path.join(temporary_path, STORE_MANIFEST_FILE), {"format_version": STORE_FORMAT_VERSION, "teams": store["teams"], "columns": manifest_columns})
+
+    shutil.rmtree(store_path, ignore_errors=True)
+    os.replace(temporary_path, store_path)
+
+
+def load_team_columnar_store(store_path, mmap_mode="r"):
+    """
+    Loads a store saved with save_team_columnar_store. Arrays are memory-mapped, so only the rows that are used are read.
+
+    :param store_path:  Directory of the store.
+    :param mmap_mode:   np.load memory-map mode, or None to read every array into memory.
+    :return:            Store dict.
+    """
+    manifest = retrieve_json(os.path.join(store_path, STORE_MANIFEST_FILE))
+    if manifest.get("format_version") != STORE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported team columnar store format {manifest.get('format_version')} in '{store_path}'.")
+
+    def load_array(array_name):
+        return np.load(os.path.join(store_path, f"{array_name}.npy"), mmap_mode=mmap_mode)
+
+    columns = []
+    for manifest_column in manifest["columns"]:
+        arrays = manifest_column["arrays"]
+        column = {
+            "section": manifest_column["section"],
+            "key": manifest_column["key"],
+            "kind": manifest_column["kind"],
+            "values": load_array(arrays["values"]),
+            "missing": load_array(arrays["missing"]) if "missing" in arrays else None,
+            "integer": load_array(arrays["integer"]) if "integer" in arrays else None
+        }
+        if column["kind"] == "json":
+            column["categories"] = manifest_column["categories"]
+        columns.append(column)
+
+    return {"teams": manifest["teams"], "team_offsets": load_array("team_offsets"), "columns": columns}
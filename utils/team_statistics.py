@@ -0,0 +1,269 @@
+import math
+
+# ===========================================
+# TEAM STATISTICS CONFIGURATION
+# ===========================================
+
+# t-digest size. Values are buffered as they are until TDIGEST_BUFFER_SIZE of them have arrived, so quantiles of
+# up to that many values are exact; beyond that they are merged into at most ~TDIGEST_COMPRESSION * pi / 2 centroids.
+TDIGEST_COMPRESSION = 100
+TDIGEST_BUFFER_SIZE = 500
+
+# Exact value counts are kept while a variable has at most this many distinct values (e.g. scoring counts),
+# so quartiles of discrete data stay exact however many matches there are
+DISTINCT_VALUE_LIMIT = 256
+
+# ===========================================
+# HELPER FUNCTIONS
+# ===========================================
+
+def exact_quantile(sorted_values, probability):
+    """
+    Returns a quantile of sorted values with linear interpolation, like pandas' Series.quantile.
+
+    :param sorted_values:  Sorted list of numbers.
+    :param probability:    Quantile to compute, between 0 and 1.
+    """
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * probability
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def counted_quantile(value_counts, probability):
+    """
+    Returns a quantile of counted values with linear interpolation, like exact_quantile on the expanded values.
+
+    :param value_counts:  Dict of value -> number of occurrences.
+    :param probability:   Quantile to compute, between 0 and 1.
+    """
+    if not value_counts:
+        return None
+    total = sum(value_counts.values())
+    position = (total - 1) * probability
+    lower = math.floor(position)
+    upper = min(lower + 1, total - 1)
+
+    lower_value = upper_value = None
+    seen = 0
+    for value in sorted(value_counts):
+        seen += value_counts[value]
+        if lower_value is None and lower < seen:
+            lower_value = value
+        if upper < seen:
+            upper_value = value
+            break
+    return lower_value + (upper_value - lower_value) * (position - lower)
+
+
+def tdigest_scale(quantile, compression):
+    """The t-digest k1 scale function. Centroids may only span one unit of it, so they stay small near the tails."""
+    return compression / (2 * math.pi) * math.asin(min(1.0, max(-1.0, 2 * quantile - 1)))
+
+
+def merge_centroids(centroids, compression):
+    """
+    Merges sorted [mean, weight] centroids as far as the scale function allows.
+
+    :param centroids:    List of [mean, weight] pairs sorted by mean.
+    :param compression:  t-digest compression.
+    :return:             The merged list of [mean, weight] pairs.
+    """
+    total_weight = sum(weight for _, weight in centroids)
+    merged = []
+    weight_before = 0
+    current_mean, current_weight = centroids[0]
+
+    for mean, weight in centroids[1:]:
+        if tdigest_scale((weight_before + current_weight + weight) / total_weight, compression) - tdigest_scale(weight_before / total_weight, compression) <= 1:
+            current_weight += weight
+            current_mean += (mean - current_mean) * weight / current_weight
+        else:
+            merged.append([current_mean, current_weight])
+            weight_before += current_weight
+            current_mean, current_weight = mean, weight
+
+    merged.append([current_mean, current_weight])
+    return merged
+
+# ===========================================
+# ACCUMULATORS
+# ===========================================
+
+class TDigest:
+    """
+    Bounded-memory quantile sketch (merging t-digest, Dunning & Ertl).
+    New values are buffered and merged into the centroids once the buffer is full, so an update is amortized O(1),
+    and quantiles are exact until the first merge.
+    """
+
+    def __init__(self, compression=TDIGEST_COMPRESSION, buffer_size=TDIGEST_BUFFER_SIZE):
+        self.compression = compression
+        self.buffer_size = buffer_size
+        self.centroids = []     # [mean, weight] pairs sorted by mean
+        self.buffer = []
+        self.minimum = None
+        self.maximum = None
+
+    def update(self, value):
+        """Adds one observation."""
+        self.buffer.append(value)
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+        if len(self.buffer) >= self.buffer_size:
+            self.centroids = self.merged_centroids()
+            self.buffer = []
+
+    def merged_centroids(self):
+        """Returns the centroids with the buffered values merged in, without changing the digest."""
+        centroids = sorted(self.centroids + [[value, 1] for value in self.buffer])
+        return merge_centroids(centroids, self.compression) if centroids else []
+
+    def quantile(self, probability):
+        """Returns a quantile estimate, or None if there are no observations. Exact until the first merge."""
+        if not self.centroids:
+            return exact_quantile(sorted(self.buffer), probability)
+
+        centroids = self.merged_centroids()
+        total_weight = sum(weight for _, weight in centroids)
+        target = probability * total_weight
+
+        # Interpolate between centroid centers, and between the outer centers and the minimum/maximum
+        previous_mean = self.minimum
+        previous_center = 0.0
+        weight_before = 0
+        for mean, weight in centroids:
+            center = weight_before + weight / 2
+            if target < center:
+                return previous_mean + (mean - previous_mean) * (target - previous_center) / (center - previous_center)
+            previous_mean = mean
+            previous_center = center
+            weight_before += weight
+
+        if total_weight == previous_center:
+            return self.maximum
+        return previous_mean + (self.maximum - previous_mean) * (target - previous_center) / (total_weight - previous_center)
+
+    def to_dict(self):
+        """Returns the digest state as a JSON-serializable dict."""
+        return {
+            "compression": self.compression,
+            "buffer_size": self.buffer_size,
+            "centroids": self.centroids,
+            "buffer": self.buffer,
+            "minimum": self.minimum,
+            "maximum": self.maximum
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        """Restores a digest saved with to_dict."""
+        digest = cls(state["compression"], state["buffer_size"])
+        digest.centroids = [list(centroid) for centroid in state["centroids"]]
+        digest.buffer = list(state["buffer"])
+        digest.minimum = state["minimum"]
+        digest.maximum = state["maximum"]
+        return digest
+
+
+class RunningStatistics:
+    """
+    Online statistics of one quantitative variable: count, Welford mean and variance, min/max and quartiles.
+    Quartiles come from exact value counts while there are few distinct values, and from a t-digest otherwise.
+    Every update is amortized O(1) and the state has a bounded size, so it can be saved and updated with new values only.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0           # Sum of squared differences from the mean
+        self.minimum = None
+        self.maximum = None
+        self.digest = TDigest()
+        self.value_counts = {}  # None once there are more than DISTINCT_VALUE_LIMIT distinct values
+
+    def update(self, value):
+        """Adds one observation. None and NaN are skipped, like pandas skips missing values."""
+        if value is None:
+            return
+        value = float(value)
+        if math.isnan(value):
+            return
+
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+
+        self.digest.update(value)
+
+        if self.value_counts is not None:
+            self.value_counts[value] = self.value_counts.get(value, 0) + 1
+            if len(self.value_counts) > DISTINCT_VALUE_LIMIT:
+                self.value_counts = None
+
+    def update_many(self, values):
+        """Adds every observation of an iterable."""
+        for value in values:
+            self.update(value)
+
+    def variance(self):
+        """Returns the sample variance (ddof=1, like pandas), or None for fewer than two observations."""
+        return self.m2 / (self.count - 1) if self.count > 1 else None
+
+    def quantile(self, probability):
+        """Returns a quantile estimate, or None if there are no observations."""
+        if self.value_counts is not None:
+            return counted_quantile(self.value_counts, probability)
+        return self.digest.quantile(probability)
+
+    def summary(self):
+        """
+        Returns the statistics computed by the aggregation stage.
+
+        :return:  Dict with mean, std_dev, range, median, q1, q3, iqr, min and max (None where undefined).
+        """
+        variance = self.variance()
+        q1 = self.quantile(0.25)
+        q3 = self.quantile(0.75)
+        return {
+            "mean": self.mean if self.count else None,
+            "std_dev": math.sqrt(variance) if variance is not None else None,
+            "range": self.maximum - self.minimum if self.count else None,
+            "median": self.quantile(0.5),
+            "q1": q1,
+            "q3": q3,
+            "iqr": q3 - q1 if self.count else None,
+            "min": self.minimum,
+            "max": self.maximum
+        }
+
+    def to_dict(self):
+        """Returns the accumulator state as a JSON-serializable dict."""
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "minimum": self.minimum,
+            "maximum": self.maximum,
+            "digest": self.digest.to_dict(),
+            "value_counts": list(self.value_counts.items()) if self.value_counts is not None else None
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        """Restores an accumulator saved with to_dict."""
+        statistics = cls()
+        statistics.count = state["count"]
+        statistics.mean = state["mean"]
+        statistics.m2 = state["m2"]
+        statistics.minimum = state["minimum"]
+        statistics.maximum = state["maximum"]
+        statistics.digest = TDigest.from_dict(state["digest"])
+        statistics.value_counts = dict(state["value_counts"]) if state["value_counts"] is not None else None
+        return statistics